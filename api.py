@@ -0,0 +1,216 @@
+"""
+Read-only JSON query API served from the Dash app's Flask server.
+
+Exposes the same data as the dashboard (sessions, filter options, word
+frequencies and word details) for downstream tools, plus Parquet/Arrow
+exports of the cleaned occurrences and counts (see export.py). Every response carries
+an ETag derived from the session data version, so conditional requests are
+answered with 304 before any data is computed, and bodies are gzip-compressed
+when the client accepts it.
+"""
+import gzip
+import hashlib
+import json
+
+from flask import Blueprint, Response, request, send_file
+
+from config import API_PREFIX, API_DEFAULT_TOP_N, API_MAX_TOP_N, API_GZIP_MIN_BYTES, FILTER_COLUMNS
+from export import EXPORT_FORMATS, EXPORT_TABLES, cached_export
+from utterances import WEIGHTING_MODES
+from word_forms import GROUPING_MODES
+
+
+def parse_filters(args) -> dict:
+    """
+    Build a filters dict from query parameters.
+
+    Each filter column may be repeated (?role=a&role=b) or comma-separated
+    (?role=a,b). Empty filters are dropped.
+    """
+    filters = {}
+    for col in FILTER_COLUMNS:
+        values = []
+        for raw in args.getlist(col):
+            values.extend(v.strip() for v in raw.split(",") if v.strip())
+        if values:
+            filters[col] = values
+    return filters
+
+
+def compute_etag(data_version: str) -> str:
+    """Derive an ETag from the data version and the full request (path + query)."""
+    query = sorted(request.args.items(multi=True))
+    key = json.dumps([data_version, request.path, query])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def json_response(payload, etag: str = None, status: int = 200) -> Response:
+    """Serialize payload to JSON, gzip-compressing it if the client allows."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+
+    if len(body) >= API_GZIP_MIN_BYTES and "gzip" in request.accept_encodings:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+
+    response = Response(body, status=status, mimetype="application/json", headers=headers)
+    if etag:
+        response.set_etag(etag)
+        # Clients may cache but must revalidate, which is cheap with the ETag
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def create_api_blueprint(session_manager) -> Blueprint:
+    """Create the API blueprint bound to a SessionManager."""
+    api = Blueprint("api", __name__, url_prefix=API_PREFIX)
+
+    def not_modified(etag: str):
+        """A 304 response if the client's ETag is current, else None."""
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return None
+
+    def conditional(build_payload):
+        """Answer 304 if the client's ETag is current, otherwise build the payload."""
+        etag = compute_etag(session_manager.data_version)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        try:
+            payload = build_payload()
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=404)
+        except LookupError:  # NLTK data for the grouping mode is missing
+            return json_response({"error": "Grouping data unavailable"}, status=503)
+        return json_response(payload, etag=etag)
+
+    def get_session_value() -> str:
+        return request.args.get("session", "all") or "all"
+
+    def get_grouping() -> str:
+        grouping = request.args.get("grouping", "").lower()
+        return grouping if grouping in GROUPING_MODES else None
+
+    def get_weighting() -> str:
+        weighting = request.args.get("weighting", "").lower()
+        return weighting if weighting in WEIGHTING_MODES else "mentions"
+
+    def get_top_n() -> int:
+        try:
+            top_n = int(request.args.get("top_n", API_DEFAULT_TOP_N))
+        except ValueError:
+            top_n = API_DEFAULT_TOP_N
+        return max(1, min(top_n, API_MAX_TOP_N))
+
+    @api.route("/sessions")
+    def sessions():
+        """List available sessions."""
+        return conditional(lambda: {
+            "data_version": session_manager.data_version,
+            "sessions": session_manager.get_session_list(),
+        })
+
+    @api.route("/filters")
+    def filter_options():
+        """Filter options for one session, or merged across all sessions."""
+        session_value = get_session_value()
+
+        def build():
+            if session_value == "all":
+                options = session_manager.get_merged_filter_options()
+            else:
+                options = session_manager.get_session(session_value).get_filter_options()
+            return {"session": session_value, "filters": options}
+
+        return conditional(build)
+
+    @api.route("/frequencies")
+    def frequencies():
+        """Top-N word frequencies under the requested filters."""
+        session_value = get_session_value()
+        filters = parse_filters(request.args)
+        top_n = get_top_n()
+        grouping = get_grouping()
+        weighting = get_weighting()
+
+        def build():
+            if session_value == "all":
+                freqs = session_manager.get_merged_frequencies(filters=filters, top_n=top_n, grouping=grouping,
+                                                               weighting=weighting)
+            else:
+                session = session_manager.get_session(session_value)
+                freqs = session.get_filtered_frequencies(filters=filters, top_n=top_n, grouping=grouping,
+                                                         weighting=weighting)
+            return {
+                "session": session_value,
+                "filters": filters,
+                "top_n": top_n,
+                "grouping": grouping,
+                "weighting": weighting,
+                "frequencies": [{"word": w, "count": c} for w, c in freqs.items()],
+                "count_error": session_manager.get_count_error(session_value, filters),
+            }
+
+        return conditional(build)
+
+    @api.route("/words/<word>")
+    def word_details(word):
+        """Detailed statistics for a single word under the requested filters."""
+        session_value = get_session_value()
+        filters = parse_filters(request.args)
+        grouping = get_grouping()
+
+        def build():
+            if session_value == "all":
+                details = session_manager.get_merged_word_details(word, filters=filters, grouping=grouping)
+            else:
+                session = session_manager.get_session(session_value)
+                details = session.get_word_details(word, filters=filters, grouping=grouping)
+            return {
+                "session": session_value,
+                "filters": filters,
+                "grouping": grouping,
+                "word": word.lower(),
+                "details": details,
+                "count_error": session_manager.get_count_error(session_value, filters),
+            }
+
+        return conditional(build)
+
+    @api.route("/export/<table>")
+    def export_table(table):
+        """Download the occurrences or counts table as a Parquet or Arrow IPC file."""
+        session_value = get_session_value()
+        fmt = request.args.get("format", "parquet").lower()
+        if table not in EXPORT_TABLES or fmt not in EXPORT_FORMATS:
+            return json_response({"error": f"Unknown export: {table} ({fmt})"}, status=404)
+
+        etag = compute_etag(session_manager.data_version)
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
+        try:
+            paths = cached_export(session_manager, session_value, fmt)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=404)
+        except RuntimeError as e:  # pyarrow is not installed
+            return json_response({"error": str(e)}, status=501)
+
+        response = send_file(
+            paths[table],
+            mimetype="application/vnd.apache.parquet" if fmt == "parquet" else "application/vnd.apache.arrow.file",
+            as_attachment=True,
+            download_name=f"{session_value}-{table}{EXPORT_FORMATS[fmt]}",
+            etag=False,
+        )
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return api
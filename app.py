@@ -4,16 +4,43 @@ Interactive Word Cloud Dashboard - Main Dash Application
 A web application for visualizing word frequencies from consultation session
 transcripts, with filtering by speaker metadata and detailed statistics.
 """
+import functools
+import json
+from collections import Counter
+
 import dash
-from dash import dcc, html, Input, Output, State
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
+import plotly
 
-from config import DEBUG, HOST, PORT
+from config import (
+    DEBUG, HOST, PORT, SHARED_STORE_DIR, PROFILE_MODE, SHARD_COUNT, COOCCURRENCE_TOP_N, GROUPING_MODE,
+    FILTER_COLUMNS, PARTICIPATION_TOP_SPEAKERS, WARMUP_FILTER_LIMIT, CLOUD_TOP_N, CLIENT_FILTER_MAX_KB,
+    CLOUD_DEBOUNCE_MS, COALESCE_MAX_CLIENTS, WEIGHTING_MODE, APPROX_MODE, LIVE_FALLBACK_POLL_MS,
+)
+from data_processor import load_speakerlist
 from session_loader import SessionManager
+from sharding import ShardedSessionManager
+from api import create_api_blueprint
+from client_filter import get_client_data
+from coalescing import LatestRequests, Superseded
+from live_stream import LiveFeed, create_live_blueprint
+from metrics import observe_callback, register_session_gauges, metrics_view
+from profiling import profile_callback, create_profiling_blueprint
+from telemetry import RenderTelemetry, create_telemetry_blueprint
+from warmup import Warmup, ready_view
+from word_forms import get_form_mapper
 from wordcloud_generator import generate_wordcloud_svg, get_wordcloud_dimensions
 
-# Initialize the session manager
-session_manager = SessionManager()
+# Initialize the session manager (optionally spread across shard processes)
+session_manager = ShardedSessionManager(shards=SHARD_COUNT) if SHARD_COUNT else SessionManager()
+
+# With a shared store, compile and map every session before gunicorn forks
+if SHARED_STORE_DIR and not SHARD_COUNT:
+    session_manager.preload()
+
+# Newest word cloud request per browser tab, so superseded ones can stop early
+cloud_requests = LatestRequests(COALESCE_MAX_CLIENTS)
 
 # Brand colors
 BRAND_PURPLE = "#4F3D63"
@@ -275,6 +302,20 @@ app.index_string = '''
 # Expose server for gunicorn (Railway deployment)
 server = app.server
 
+# Read-only JSON API for downstream tools
+server.register_blueprint(create_api_blueprint(session_manager))
+
+# Prometheus-style metrics for callback and data-layer latency
+register_session_gauges(session_manager)
+server.add_url_rule("/metrics", "metrics", metrics_view())
+
+# Render timings reported by the cloud documents in the browser
+server.register_blueprint(create_telemetry_blueprint(RenderTelemetry()))
+
+# Opt-in request profiling (WORDCLOUD_PROFILE=all|header)
+if PROFILE_MODE:
+    server.register_blueprint(create_profiling_blueprint())
+
 
 def create_filter_controls():
     """Create filter controls dynamically based on available sessions and metadata."""
@@ -300,6 +341,43 @@ def create_filter_controls():
             ], className="mb-3")
         )
 
+    # Grouping of inflected forms ("build"/"building"/"builds")
+    controls.append(
+        dbc.Card([
+            dbc.CardHeader("Word Forms"),
+            dbc.CardBody([
+                dcc.RadioItems(
+                    id="grouping-mode",
+                    options=[
+                        {"label": "Keep separate", "value": "off"},
+                        {"label": "Group by stem", "value": "stem"},
+                        {"label": "Group by lemma", "value": "lemma"},
+                    ],
+                    value=GROUPING_MODE or "off",
+                    labelStyle={"display": "block", "marginBottom": "5px"},
+                )
+            ])
+        ], className="mb-3")
+    )
+
+    # What a word's size counts: every mention, or each utterance once
+    controls.append(
+        dbc.Card([
+            dbc.CardHeader("Weight Words By"),
+            dbc.CardBody([
+                dcc.RadioItems(
+                    id="weighting-mode",
+                    options=[
+                        {"label": "Mentions", "value": "mentions"},
+                        {"label": "Utterances", "value": "utterances"},
+                    ],
+                    value=WEIGHTING_MODE,
+                    labelStyle={"display": "block", "marginBottom": "5px"},
+                )
+            ])
+        ], className="mb-3")
+    )
+
     # Dynamic filters based on metadata columns
     for col, values in filter_options.items():
         if col in ["description"]:  # Skip non-filterable columns
@@ -322,6 +400,91 @@ def create_filter_controls():
     return controls
 
 
+def resolve_grouping(mode_value):
+    """
+    Grouping mode for the data layer, plus a note if it had to change.
+
+    Lemma mode needs the WordNet corpus; without it, stems are used.
+    """
+    if not mode_value or mode_value == "off":
+        return None, None
+    try:
+        get_form_mapper(mode_value)
+    except LookupError:
+        return "stem", "WordNet data is unavailable, so forms are grouped by stem."
+    return mode_value, None
+
+
+def resolve_weighting(mode_value):
+    """
+    Weighting for the data layer ("utterances" or None for mentions), plus a note if it had to change.
+
+    Approximate mode keeps no utterance counts, so words are weighted by mentions.
+    """
+    if mode_value != "utterances":
+        return None, None
+    if APPROX_MODE:
+        return None, "Utterance counts are not kept in approximate mode, so words are weighted by mentions."
+    return "utterances", None
+
+
+def approximate_note(count_error: int) -> str:
+    """Summary line stating the error bound of approximate counts."""
+    if not count_error:
+        return "Approximate counting: no words were dropped, so these counts are exact."
+    return f"Approximate counts: each may be up to {count_error:,} below the exact count."
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as m:ss or h:mm:ss."""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def create_participation_table(label: str, entries: list):
+    """Compact table of participation entries as (name, stats) pairs."""
+    header = html.Thead(html.Tr([
+        html.Th(label), html.Th("Time"), html.Th("Words"), html.Th("WPM"), html.Th("Turns"), html.Th("Share"),
+    ]))
+    body = html.Tbody([
+        html.Tr([
+            html.Td(name),
+            html.Td(format_duration(stats["talk_time"])),
+            html.Td(f"{stats['words']:,}"),
+            html.Td(f"{stats['wpm']:.0f}"),
+            html.Td(f"{stats['turns']:,}"),
+            html.Td(f"{stats['share']:.0%}"),
+        ]) for name, stats in entries
+    ])
+    return dbc.Table([header, body], size="sm", borderless=True, className="small mb-2")
+
+
+def create_participation_summary(participation: dict) -> list:
+    """Summary panel section: who spoke, for how long, and by metadata group."""
+    if not participation["speakers"]:
+        return []
+
+    total = participation["total"]
+    content = [
+        html.H6("Participation", className="mt-3"),
+        html.P([
+            html.Strong("Talk time: "),
+            f"{format_duration(total['talk_time'])} ({total['share']:.0%} of session)",
+        ]),
+    ]
+
+    speakers = participation["speakers"][:PARTICIPATION_TOP_SPEAKERS]
+    content.append(create_participation_table("Speaker", [(row["speaker"], row) for row in speakers]))
+
+    for key in FILTER_COLUMNS + ["session"]:
+        values = participation["groups"].get(key)
+        if values:
+            entries = sorted(values.items(), key=lambda x: x[1]["talk_time"], reverse=True)
+            content.append(create_participation_table(key.title(), entries))
+    return content
+
+
 def create_stats_panel():
     """Create the statistics panel for word details."""
     return dbc.Card([
@@ -343,6 +506,12 @@ app.layout = dbc.Container([
     # Store for clicked word
     dcc.Store(id="clicked-word-store", data=""),
 
+    # Session count table for client-side filtering, and requests for the server path
+    dcc.Store(id="client-data-store"),
+    dcc.Store(id="cloud-request-store"),
+    # Event stream followed while a live session is shown
+    dcc.Store(id="live-stream-store"),
+
     # Store for filter collapse state
     dcc.Store(id="filters-collapsed-store", data=False),
 
@@ -417,9 +586,12 @@ app.layout = dbc.Container([
                     id="word-lookup-input",
                     placeholder="Type a word to see details...",
                     type="text",
+                    list="word-suggestions",  # As-you-type suggestions
+                    autocomplete="off",
                 ),
                 dbc.Button("Look Up", id="word-lookup-btn", color="primary"),
             ], className="mt-3"),
+            html.Datalist(id="word-suggestions"),
         ], id="wordcloud-column", md=6),
 
         # Right sidebar - Stats
@@ -468,17 +640,105 @@ app.clientside_callback(
 )
 
 
+def compute_cloud_data(session_value, filters: dict, grouping: str = None, checkpoint=None,
+                       weighting: str = None) -> tuple:
+    """
+    Word frequencies and participation behind the word cloud and summary.
+
+    checkpoint, if given, is called between stages and may raise to stop.
+    """
+    checkpoint = checkpoint or (lambda: None)
+    checkpoint()
+    if session_value == "all" or session_value is None:
+        frequencies = session_manager.get_merged_frequencies(filters=filters, top_n=CLOUD_TOP_N, grouping=grouping,
+                                                             checkpoint=checkpoint, weighting=weighting)
+        checkpoint()
+        participation = session_manager.get_merged_participation(filters=filters)
+    else:
+        session = session_manager.get_session(session_value)
+        frequencies = session.get_filtered_frequencies(filters=filters, top_n=CLOUD_TOP_N, grouping=grouping,
+                                                       weighting=weighting)
+        checkpoint()
+        participation = session.get_participation(filters=filters)
+    checkpoint()
+    return frequencies, participation
+
+
 @app.callback(
+    Output("client-data-store", "data"),
+    Input("session-dropdown", "value"),
+)
+@observe_callback("update_client_data")
+def update_client_data(session_value):
+    """Send the session's count table for client-side filtering (or None to use the server)."""
+    data = get_client_data(session_manager, session_value or "all", CLIENT_FILTER_MAX_KB * 1024)
+    live = bool(session_manager.get_live_sessions(session_value or "all"))
+    return {**data, "debounce_ms": CLOUD_DEBOUNCE_MS, "live_url": "/live/events" if live else None,
+            "live_poll_ms": LIVE_FALLBACK_POLL_MS}
+
+
+# While a live session is shown, the cloud and summary follow its event
+# stream (see live_stream.py) instead of the callbacks above
+app.clientside_callback(
+    ClientsideFunction(namespace="live", function_name="follow"),
+    Output("live-stream-store", "data"),
+    Input("client-data-store", "data"),
+    Input("filter-role", "value"),
+    Input("filter-zone", "value"),
+    Input("filter-region", "value"),
+    Input("grouping-mode", "value"),
+    Input("weighting-mode", "value"),
+    State("session-dropdown", "value"),
+)
+
+
+# Filters in the browser when the session's table was sent; otherwise
+# (large collections, grouped word forms, utterance weighting) it fills cloud-request-store,
+# once the filters have been still for CLOUD_DEBOUNCE_MS
+app.clientside_callback(
+    ClientsideFunction(namespace="wordcloud", function_name="filterCloud"),
     Output("wordcloud-container", "children"),
     Output("summary-stats", "children"),
-    Input("session-dropdown", "value"),
+    Output("cloud-request-store", "data"),
+    Input("client-data-store", "data"),
     Input("filter-role", "value"),
     Input("filter-zone", "value"),
     Input("filter-region", "value"),
-    prevent_initial_call=False,
+    Input("grouping-mode", "value"),
+    Input("weighting-mode", "value"),
+    State("session-dropdown", "value"),
 )
-def update_wordcloud(session_value, role_filter, zone_filter, region_filter):
+
+
+@app.callback(
+    Output("wordcloud-container", "children", allow_duplicate=True),
+    Output("summary-stats", "children", allow_duplicate=True),
+    Input("cloud-request-store", "data"),
+    prevent_initial_call=True,
+)
+@observe_callback("update_wordcloud")
+@profile_callback("update_wordcloud")
+def update_wordcloud_on_server(request):
+    """
+    Server path of the word cloud, for views not filtered in the browser.
+
+    A newer request from the same browser tab supersedes this one: it then
+    stops at its next stage and leaves the page as it is.
+    """
+    ticket = cloud_requests.claim(request.get("client"), request.get("seq"))
+    try:
+        return update_wordcloud(request["session"], request["role"], request["zone"], request["region"],
+                                request["grouping"], request.get("weighting"), checkpoint=ticket.check)
+    except Superseded:
+        return dash.no_update, dash.no_update
+
+
+def update_wordcloud(session_value, role_filter, zone_filter, region_filter, grouping_mode=None,
+                     weighting_mode=None, checkpoint=None):
     """Update the word cloud based on selected filters."""
+    grouping, grouping_note = resolve_grouping(grouping_mode)
+    weighting, weighting_note = resolve_weighting(weighting_mode)
+
     # Build filters dict
     filters = {}
     if role_filter:
@@ -489,15 +749,10 @@ def update_wordcloud(session_value, role_filter, zone_filter, region_filter):
         filters["region"] = region_filter
 
     # Get word frequencies
-    if session_value == "all" or session_value is None:
-        frequencies = session_manager.get_merged_frequencies(filters=filters)
-        total_words = sum(frequencies.values()) if frequencies else 0
-        unique_words = len(frequencies)
-    else:
-        session = session_manager.get_session(session_value)
-        frequencies = session.get_filtered_frequencies(filters=filters)
-        total_words = sum(frequencies.values()) if frequencies else 0
-        unique_words = len(frequencies)
+    frequencies, participation = compute_cloud_data(session_value, filters, grouping, checkpoint, weighting)
+    count_error = session_manager.get_count_error(session_value, filters)
+    total_words = sum(frequencies.values()) if frequencies else 0
+    unique_words = len(frequencies)
 
     # Generate SVG word cloud
     svg_content = generate_wordcloud_svg(frequencies)
@@ -517,7 +772,8 @@ def update_wordcloud(session_value, role_filter, zone_filter, region_filter):
 
     # Generate summary stats
     summary = [
-        html.P([html.Strong("Total words: "), f"{total_words:,}"]),
+        # Under utterance weighting each word counts once per utterance it is in
+        html.P([html.Strong("Total word utterances: " if weighting else "Total words: "), f"{total_words:,}"]),
         html.P([html.Strong("Unique words: "), f"{unique_words:,}"]),
     ]
 
@@ -527,9 +783,54 @@ def update_wordcloud(session_value, role_filter, zone_filter, region_filter):
         ])
         summary.append(html.P([html.Strong("Active filters: "), active_filters]))
 
+    if grouping:
+        summary.append(html.P([html.Strong("Word forms: "), f"grouped by {grouping}"]))
+    if weighting:
+        utterances = session_manager.get_utterance_total(session_value, filters)
+        summary.append(html.P([html.Strong("Weighted by: "), f"utterances ({utterances:,} in view)"]))
+    if count_error is not None:
+        summary.append(html.P(approximate_note(count_error), className="text-warning"))
+    if grouping_note:
+        summary.append(html.P(grouping_note, className="text-warning"))
+    if weighting_note:
+        summary.append(html.P(weighting_note, className="text-warning"))
+
+    summary.extend(create_participation_summary(participation))
+
     return wordcloud_element, summary
 
 
+@app.callback(
+    Output("word-suggestions", "children"),
+    Input("word-lookup-input", "value"),
+    State("session-dropdown", "value"),
+    State("filter-role", "value"),
+    State("filter-zone", "value"),
+    State("filter-region", "value"),
+    prevent_initial_call=True,
+)
+@observe_callback("update_word_suggestions")
+@profile_callback("update_word_suggestions")
+def update_word_suggestions(lookup_input, session_value, role_filter, zone_filter, region_filter):
+    """Suggest words as the user types, most frequent under the current filters first."""
+    if not lookup_input or not lookup_input.strip():
+        return []
+
+    filters = {}
+    if role_filter:
+        filters["role"] = role_filter
+    if zone_filter:
+        filters["zone"] = zone_filter
+    if region_filter:
+        filters["region"] = region_filter
+
+    suggestions = session_manager.get_word_suggestions(lookup_input, session_value, filters=filters)
+    return [
+        html.Option(value=s["word"], label=f"{s['count']:,} mentions" + (" (did you mean?)" if s["distance"] else ""))
+        for s in suggestions
+    ]
+
+
 @app.callback(
     Output("word-stats-content", "children"),
     Input("clicked-word-store", "data"),
@@ -539,9 +840,13 @@ def update_wordcloud(session_value, role_filter, zone_filter, region_filter):
     State("filter-role", "value"),
     State("filter-zone", "value"),
     State("filter-region", "value"),
+    State("grouping-mode", "value"),
     prevent_initial_call=True,
 )
-def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value, role_filter, zone_filter, region_filter):
+@observe_callback("update_word_details")
+@profile_callback("update_word_details")
+def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value, role_filter, zone_filter, region_filter,
+                        grouping_mode=None):
     """Update word details from click or manual lookup."""
     ctx = dash.callback_context
     if not ctx.triggered:
@@ -552,8 +857,8 @@ def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value
     # Get the word to look up
     if trigger_id == "clicked-word-store" and clicked_word:
         word = clicked_word
-    elif trigger_id == "word-lookup-btn" and lookup_input:
-        word = lookup_input
+    elif trigger_id == "word-lookup-btn" and lookup_input and lookup_input.strip():
+        word = lookup_input.strip().lower()
     else:
         return html.P("Click a word or type below to see details.", className="text-muted")
 
@@ -566,15 +871,31 @@ def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value
     if region_filter:
         filters["region"] = region_filter
 
+    grouping, _ = resolve_grouping(grouping_mode)
+
     # Get word details
     if session_value == "all" or session_value is None:
-        details = session_manager.get_merged_word_details(word, filters=filters)
+        details = session_manager.get_merged_word_details(word, filters=filters, grouping=grouping)
+        associations = session_manager.get_merged_associations(word, filters=filters, top_n=COOCCURRENCE_TOP_N)
     else:
         session = session_manager.get_session(session_value)
-        details = session.get_word_details(word, filters=filters)
+        details = session.get_word_details(word, filters=filters, grouping=grouping)
+        associations = session.get_associations(word, filters=filters, top_n=COOCCURRENCE_TOP_N)
 
     if not details or details["total_count"] == 0:
-        return html.P(f"Word '{word}' not found in the current selection.", className="text-warning")
+        # Offer close spellings that do appear under the current filters
+        typos = [
+            s["word"] for s in session_manager.get_word_suggestions(word, session_value, filters=filters)
+            if s["distance"]
+        ]
+        message = [html.P(f"Word '{word}' not found in the current selection.", className="text-warning")]
+        count_error = session_manager.get_count_error(session_value, filters)
+        if count_error:
+            message.append(html.P(f"Counts are approximate: it may have been said up to {count_error:,} times.",
+                                  className="text-muted"))
+        if typos:
+            message.append(html.P([html.Strong("Did you mean: "), ", ".join(typos[:5])]))
+        return message
 
     # Build stats display - start with word title
     content = [
@@ -607,8 +928,24 @@ def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value
         content.append(html.Hr())
 
     # Stats section
-    content.append(html.P([html.Strong("Total mentions: "), f"{details['total_count']:,}"]))
-    content.append(html.P([html.Strong("Unique speakers: "), f"{details['speaker_count']}"]))
+    count_error = session_manager.get_count_error(session_value, filters)
+    if count_error is None:
+        content.append(html.P([html.Strong("Total mentions: "), f"{details['total_count']:,}"]))
+        content.append(html.P([html.Strong("Unique speakers: "), f"{details['speaker_count']}"]))
+    else:
+        # Approximate mode keeps no per-speaker counts
+        content.append(html.P([
+            html.Strong("Total mentions: "),
+            f"{details['total_count']:,} to {details['total_count'] + count_error:,}",
+        ]))
+        content.append(html.P(approximate_note(count_error), className="text-warning"))
+
+    # Surface forms counted together in a grouping mode
+    if len(details.get("forms", {})) > 1:
+        content.append(html.P([
+            html.Strong("Forms merged: "),
+            ", ".join(f"{form} ({count:,})" for form, count in details["forms"].items()),
+        ]))
 
     # Metadata breakdowns (skip description)
     for meta_key, meta_values in details.get("metadata", {}).items():
@@ -619,6 +956,16 @@ def update_word_details(clicked_word, lookup_clicks, lookup_input, session_value
                 html.Li(f"{val}: {count}") for val, count in sorted_meta
             ]))
 
+    # Words said near this one (PMI over the filtered transcript)
+    if associations:
+        content.append(html.H6("Said together with:", className="mt-3"))
+        content.append(html.Ul([
+            html.Li([
+                f"{a['word']} ",
+                html.Small(f"(PMI {a['pmi']:.1f}, {a['count']}x)", className="text-muted"),
+            ]) for a in associations
+        ]))
+
     return content
 
 
@@ -667,5 +1014,75 @@ app.clientside_callback(
 )
 
 
+def common_filters(limit: int) -> list:
+    """The limit single-value filters covering the most speakers, e.g. {"role": ["Builder"]}."""
+    # Read from the speaker lists directly, so no session has to be loaded yet
+    counts = Counter(
+        (col, meta.get(col))
+        for info in session_manager.get_session_info()
+        for meta in load_speakerlist(info["csv_path"])[0].values()
+        for col in FILTER_COLUMNS
+        if meta.get(col)
+    )
+    return [{col: [value]} for (col, value), _ in counts.most_common(limit)]
+
+
+def warmup_steps() -> list:
+    """
+    Warm-up steps for the dashboard's hot paths, in order.
+
+    Loads every session, then computes the initial view (the default
+    session, no filters, the default grouping and weighting) through the same code as
+    update_wordcloud, builds the word lookup indexes, and precomputes the
+    most common single filters.
+    """
+    sessions = session_manager.get_session_list()
+    default_session = "all" if len(sessions) > 1 else (sessions[0] if sessions else None)
+    grouping, _ = resolve_grouping(GROUPING_MODE or "off")
+    weighting, _ = resolve_weighting(WEIGHTING_MODE)
+
+    def warm_cloud(filters):
+        def step():
+            frequencies, _ = compute_cloud_data(default_session, filters, grouping, weighting=weighting)
+            generate_wordcloud_svg(frequencies)
+        return step
+
+    def load(name):
+        session_manager.get_session(name).get_filter_options()
+
+    steps = [(f"load {name}", functools.partial(load, name)) for name in sessions]
+    if default_session is None:
+        return steps
+    steps.append((f"cloud {default_session}", warm_cloud({})))
+    steps.append(("client data", functools.partial(
+        get_client_data, session_manager, default_session, CLIENT_FILTER_MAX_KB * 1024)))
+    # Nothing starts with this text, so the typo index is built as well
+    steps.append(("word index", functools.partial(session_manager.get_word_suggestions, "qxzqxz", default_session)))
+    for filters in common_filters(WARMUP_FILTER_LIMIT):
+        label = ", ".join(f"{col}={values[0]}" for col, values in filters.items())
+        steps.append((f"cloud {default_session} {label}", warm_cloud(filters)))
+    return steps
+
+
+def render_live_event(session_value, filters: dict, grouping_mode: str, weighting_mode: str) -> str:
+    """One live stream event: the cloud and summary as update_wordcloud draws them."""
+    cloud, summary = update_wordcloud(session_value, filters.get("role"), filters.get("zone"),
+                                      filters.get("region"), grouping_mode, weighting_mode)
+    return json.dumps({"cloud": cloud, "summary": summary}, cls=plotly.utils.PlotlyJSONEncoder)
+
+
+# Live sessions are polled in the background and pushed to dashboards
+live_feed = LiveFeed(session_manager, render_live_event)
+server.register_blueprint(create_live_blueprint(live_feed))
+server.before_request(live_feed.start)
+
+# Background warm-up of the hot paths; /ready answers 200 once it has finished
+warmup = Warmup(warmup_steps)
+server.add_url_rule("/ready", "ready", ready_view(warmup))
+server.before_request(warmup.start)
+
+
 if __name__ == "__main__":
+    warmup.start()
+    live_feed.start()
     app.run(debug=DEBUG, host=HOST, port=PORT)
@@ -0,0 +1,276 @@
+"""
+Approximate (bounded-memory) word counts for very large collections.
+
+compute_word_stats keeps a count per (word, speaker) for every word ever
+said, which stops fitting in memory when the dashboard is pointed at an
+entire program's archive. In approximate mode (APPROX_MODE) a session
+instead keeps one heavy-hitters summary per speaker group, where a group is
+the speakers sharing the same FILTER_COLUMNS values (role, zone, region);
+speakers missing from the speaker list form one more group. Since filters
+only select on those columns, every filter selects whole groups, and a
+filtered view is the sum of the selected groups' summaries.
+
+Each summary is a Misra-Gries summary with `capacity` counters, the
+mergeable form of SpaceSaving: a count is never overestimated, and is
+undercounted by at most the summary's `error`, which itself is at most
+total / (capacity + 1). Summaries merge by adding counts and errors, so
+filtered views and "All Sessions" keep a bound: the sum of the errors of
+the groups involved. With capacity = ceil(1 / APPROX_ERROR) the bound is
+APPROX_ERROR x the number of words counted; APPROX_MAX_COUNTERS caps the
+counters a session keeps in total, lowering the capacity (and loosening the
+bound) for sessions with many groups.
+
+Per-speaker counts, the co-occurrence index, utterance counts and the raw
+word list are not kept: word details show totals and metadata breakdowns
+but no speaker counts, "said together with" is empty, and the cloud can
+only be weighted by mentions in this mode.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from config import APPROX_ERROR, APPROX_MAX_COUNTERS, FILTER_COLUMNS
+from data_processor import (
+    SessionData, RankedCounts, combine_word_details, counted_words, empty_word_details,
+    estimate_footprint, iter_transcript, load_speakerlist,
+)
+from metrics import timed_stage
+from participation import ParticipationTally
+
+# Words counted exactly before each summary update while loading
+CHUNK_WORDS = 100_000
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary of word counts with at most `capacity` counters.
+
+    counts holds lower bounds: each true count is between counts.get(word, 0)
+    and that plus error. total is the exact number of words summarized.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0
+        self.total = 0
+
+    def update(self, counts: dict):
+        """Add exact counts for a batch of words."""
+        for word, count in counts.items():
+            self.counts[word] = self.counts.get(word, 0) + count
+            self.total += count
+        self._prune()
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        """A summary of both inputs (with the larger capacity)."""
+        merged = HeavyHitters(max(self.capacity, other.capacity))
+        merged.counts = dict(self.counts)
+        for word, count in other.counts.items():
+            merged.counts[word] = merged.counts.get(word, 0) + count
+        merged.total = self.total + other.total
+        merged.error = self.error + other.error
+        merged._prune()
+        return merged
+
+    def _prune(self):
+        # Subtracting the (capacity + 1)-th largest count from every counter
+        # removes at least (capacity + 1) x that much, so the decrements sum
+        # to at most total / (capacity + 1)
+        if len(self.counts) <= self.capacity:
+            return
+        cut = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = {word: count - cut for word, count in self.counts.items() if count > cut}
+        self.error += cut
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+def speaker_group(speakers: dict, speaker: str):
+    """A speaker's group: their FILTER_COLUMNS values, or None if not in the speaker list."""
+    meta = speakers.get(speaker)
+    if meta is None:
+        return None
+    return tuple(meta.get(col, "") for col in FILTER_COLUMNS)
+
+
+def group_capacity(groups: int, error: float, max_counters: int) -> int:
+    """Counters per group summary for an error bound, within max_counters for the session (0 = no ceiling)."""
+    capacity = math.ceil(1 / error)
+    if max_counters:
+        capacity = min(capacity, max_counters // max(groups, 1))
+    return max(capacity, 1)
+
+
+def summarize_word_groups(words, speakers: dict, error: float = None, max_counters: int = None) -> dict:
+    """
+    One HeavyHitters summary per speaker group that said anything.
+
+    words may be any iterable (such as a stream of transcript batches).
+    error and max_counters default to APPROX_ERROR and APPROX_MAX_COUNTERS.
+    Words are counted exactly CHUNK_WORDS at a time and folded into the
+    summaries, so memory stays within the summaries plus one chunk.
+    """
+    if error is None:
+        error = APPROX_ERROR
+    if max_counters is None:
+        max_counters = APPROX_MAX_COUNTERS
+    groups = {speaker_group(speakers, name) for name in speakers} | {None}
+    capacity = group_capacity(len(groups), error, max_counters)
+    summaries = {}
+    chunk = defaultdict(Counter)
+    pending = 0
+
+    def flush():
+        for group, counts in chunk.items():
+            summaries.setdefault(group, HeavyHitters(capacity)).update(counts)
+        chunk.clear()
+
+    for word, speaker, _ in counted_words(words):
+        chunk[speaker_group(speakers, speaker)][word] += 1
+        pending += 1
+        if pending >= CHUNK_WORDS:
+            flush()
+            pending = 0
+    flush()
+    return summaries
+
+
+class ApproximateSessionData(SessionData):
+    """
+    SessionData with per-group heavy-hitters summaries instead of word_stats.
+
+    Offers the same query methods; counts are lower bounds within
+    count_error(filters) of the exact ones.
+    """
+
+    def __init__(self, session_name: str, json_path: str, csv_path: str, error: float = None,
+                 max_counters: int = None):
+        self.session_name = session_name
+        self.json_path = json_path
+        self.csv_path = csv_path
+
+        self.speakers, self.columns = load_speakerlist(csv_path)
+        # The transcript is streamed: participation is tallied and words are
+        # summarized a batch at a time, so the word list is never held whole
+        tally = ParticipationTally()
+
+        def words():
+            for batch in iter_transcript(json_path):
+                tally.add(batch)
+                yield from batch
+
+        self.summaries = summarize_word_groups(words(), self.speakers, error, max_counters)
+        self.participation = tally.stats()
+
+        # Group -> its speakers, and the metadata it stands for in word details
+        self.group_speakers = defaultdict(set)
+        for name in self.speakers:
+            self.group_speakers[speaker_group(self.speakers, name)].add(name)
+        self.group_metadata = {
+            group: {col: value for col, value in zip(FILTER_COLUMNS, group) if value}
+            for group in self.summaries if group is not None
+        }
+
+        # Word order (for ties and word_rank): unfiltered estimate, then alphabetical
+        totals = defaultdict(int)
+        for summary in self.summaries.values():
+            for word, count in summary.counts.items():
+                totals[word] += count
+        self._order = sorted(totals, key=lambda w: (-totals[w], w))
+        self._init_query_caches()
+
+    @property
+    def word_stats(self) -> dict:
+        """Estimated entries (without speaker counts) for callers needing the full dict."""
+        return {word: self.get_word_details(word) for word in self._order}
+
+    def vocabulary_size(self) -> int:
+        """Number of distinct words kept in the summaries."""
+        return len(self._order)
+
+    def vocabulary(self) -> list:
+        """Distinct words kept in the summaries."""
+        return list(self._order)
+
+    def data_footprint(self) -> int:
+        """Estimated memory held by the summaries and speaker metadata, in bytes."""
+        summaries = [summary.counts for summary in self.summaries.values()]
+        return sum(estimate_footprint(obj) for obj in summaries + [self.speakers, self._order])
+
+    def word_rank(self, word: str):
+        """Position of word in the session's word order (None if absent)."""
+        if self._word_ranks is None:
+            self._word_ranks = {w: i for i, w in enumerate(self._order)}
+        return self._word_ranks.get(word)
+
+    def word_at(self, rank: int) -> str:
+        """Word at a position in the session's word order."""
+        return self._order[rank]
+
+    def selected_groups(self, matching) -> list:
+        """(group, summary) for the groups with a speaker in matching (all of them if None)."""
+        if matching is None:
+            return list(self.summaries.items())
+        return [
+            (group, summary) for group, summary in self.summaries.items()
+            if group is not None and not self.group_speakers[group].isdisjoint(matching)
+        ]
+
+    def count_error(self, filters: dict = None) -> int:
+        """Most any count under filters can be below the exact count."""
+        return sum(summary.error for _, summary in self.selected_groups(self.resolve_speakers(filters)))
+
+    @timed_stage("filter")
+    def _compute_ranked_counts(self, matching) -> RankedCounts:
+        totals = defaultdict(int)
+        for _, summary in self.selected_groups(matching):
+            for word, count in summary.counts.items():
+                totals[word] += count
+
+        order = sorted(totals, key=lambda w: (-totals[w], self.word_rank(w)))
+        totals = dict(totals)
+        return RankedCounts(order, [totals[w] for w in order], lambda word: totals.get(word, 0))
+
+    def _compute_utterance_counts(self, matching) -> RankedCounts:
+        raise ValueError("Utterance counts are not kept in approximate mode")
+
+    def get_utterance_total(self, filters: dict = None) -> int:
+        raise ValueError("Utterance counts are not kept in approximate mode")
+
+    def get_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
+        """
+        Estimated total and metadata breakdown for a word.
+
+        Speakers are not tracked, so "speakers" is empty and "speaker_count" 0.
+        """
+        if grouping:
+            members = self.group_members(word, grouping)
+            return combine_word_details({m: self.get_word_details(m, filters) for m in members})
+
+        word = word.lower()
+        total = 0
+        metadata = defaultdict(lambda: defaultdict(int))
+        for group, summary in self.selected_groups(self.resolve_speakers(filters)):
+            count = summary.counts.get(word, 0)
+            if not count:
+                continue
+            total += count
+            for key, value in self.group_metadata.get(group, {}).items():
+                metadata[key][value] += count
+
+        if not total:
+            return empty_word_details()
+        return {
+            "total_count": total,
+            "speaker_count": 0,
+            "speakers": {},
+            "metadata": {k: dict(v) for k, v in metadata.items()}
+        }
+
+    def get_association_counts(self, word: str, filters: dict = None) -> dict:
+        """No co-occurrence index is kept in approximate mode."""
+        ranked = self.get_ranked_counts(filters)
+        return {"pairs": {}, "word_count": ranked.count(word.lower()), "total_tokens": ranked.total,
+                "total_pairs": 0}
@@ -0,0 +1,310 @@
+/*
+ * Client-side filtering of the word cloud (see client_filter.py).
+ *
+ * window.dash_clientside.wordcloud.filterCloud recomputes the word cloud
+ * and summary panel from the session's count table in the client-data
+ * store. It mirrors the server path (update_wordcloud): the same speaker
+ * matching, top-N tie order, font sizes and number formatting, including
+ * Python's round-half-even rounding. When the store has no table for the
+ * session, word forms are grouped or words are weighted by utterances, it
+ * hands the request to the server through the cloud-request store instead,
+ * once the filters have been still for the store's debounce_ms. Each server
+ * request carries this page's client id and a sequence number, so the
+ * server can drop requests that a newer one superseded (see coalescing.py).
+ * Views with a live session are left to assets/live.js.
+ */
+(function () {
+    "use strict";
+
+    function decode(base64, ArrayType) {
+        var binary = atob(base64);
+        var bytes = new Uint8Array(binary.length);
+        for (var i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return new ArrayType(bytes.buffer);
+    }
+
+    function decodeMatrix(matrix) {
+        if (!matrix._decoded) {
+            matrix._decoded = {
+                indptr: decode(matrix.indptr, Int32Array),
+                speakerIndex: decode(matrix.speaker_index,
+                    matrix.speaker_index_type === "uint16" ? Uint16Array : Uint32Array),
+                counts: decode(matrix.counts, Uint32Array)
+            };
+        }
+        return matrix._decoded;
+    }
+
+    // Python's round(x, digits): round half to even on the exact binary value
+    function pyRound(x, digits) {
+        if (!isFinite(x)) {
+            return x;
+        }
+        var negative = x < 0;
+        var text = Math.abs(x).toFixed(100);
+        var point = text.indexOf(".");
+        var kept = text.slice(0, point) + text.slice(point + 1, point + 1 + digits);
+        var next = text.charAt(point + 1 + digits);
+        var rest = text.slice(point + 2 + digits);
+        var up = next > "5" || (next === "5" && (/[1-9]/.test(rest) ||
+            parseInt(kept.charAt(kept.length - 1), 10) % 2 === 1));
+        var scaled = BigInt(kept) + (up ? 1n : 0n);
+        var digitsText = scaled.toString().padStart(digits + 1, "0");
+        var value = parseFloat(digitsText.slice(0, digitsText.length - digits) + "." +
+            digitsText.slice(digitsText.length - digits));
+        return negative ? -value : value;
+    }
+
+    function formatInt(n) {
+        return n.toLocaleString("en-US");
+    }
+
+    function formatDuration(seconds) {
+        var total = pyRound(seconds, 0);
+        var minutes = Math.floor(total / 60);
+        var secs = total % 60;
+        var hours = Math.floor(minutes / 60);
+        minutes = minutes % 60;
+        var pad = function (n) { return (n < 10 ? "0" : "") + n; };
+        return hours ? hours + ":" + pad(minutes) + ":" + pad(secs) : minutes + ":" + pad(secs);
+    }
+
+    function el(namespace, type, props, children) {
+        var allProps = Object.assign({}, props || {});
+        if (children !== undefined) {
+            allProps.children = children;
+        }
+        return {namespace: namespace, type: type, props: allProps};
+    }
+
+    function h(type, props, children) {
+        return el("dash_html_components", type, props, children);
+    }
+
+    // Indices of speakers matching filters, as a mask (null = everyone)
+    function matchSpeakers(matrix, filters) {
+        var fields = Object.keys(filters);
+        if (!fields.length) {
+            return null;
+        }
+        var n = matrix.speakers.length;
+        var mask = new Uint8Array(n);
+        for (var s = 0; s < n; s++) {
+            if (!matrix.known[s]) {
+                continue;
+            }
+            var matches = true;
+            for (var f = 0; f < fields.length && matches; f++) {
+                var column = matrix.columns[fields[f]];
+                var code = column ? column.codes[s] : -1;
+                matches = code >= 0 && filters[fields[f]].indexOf(column.values[code]) >= 0;
+            }
+            mask[s] = matches ? 1 : 0;
+        }
+        return mask;
+    }
+
+    function topWords(matrix, mask) {
+        var data = decodeMatrix(matrix);
+        var totals = [];
+        for (var w = 0; w < matrix.words.length; w++) {
+            var total = 0;
+            for (var j = data.indptr[w]; j < data.indptr[w + 1]; j++) {
+                if (mask === null || mask[data.speakerIndex[j]]) {
+                    total += data.counts[j];
+                }
+            }
+            if (total) {
+                totals.push([w, total]);
+            }
+        }
+        totals.sort(function (a, b) { return b[1] - a[1] || a[0] - b[0]; });
+        return totals.slice(0, matrix.top_n).map(function (t) { return [matrix.words[t[0]], t[1]]; });
+    }
+
+    // wordcloud_generator.wordcloud_words_data
+    function cloudDocument(cloud, frequencies) {
+        var sorted = frequencies.slice(0, cloud.max_words);
+        if (!sorted.length) {
+            return cloud.empty;
+        }
+        var maxFreq = sorted[0][1];
+        var minFreq = sorted.length > 1 ? sorted[sorted.length - 1][1] : maxFreq;
+        var range = maxFreq !== minFreq ? maxFreq - minFreq : 1;
+        var words = sorted.map(function (entry) {
+            var normalized = (entry[1] - minFreq) / range;
+            var size = cloud.min_font_size + normalized * (cloud.max_font_size - cloud.min_font_size);
+            return {text: entry[0], size: pyRound(size, 1), freq: entry[1]};
+        });
+        return cloud.template.replace(cloud.placeholder, JSON.stringify(words));
+    }
+
+    // participation.add_rates
+    function addRates(entry, sessionTalkTime) {
+        var minutes = entry.talk_time / 60;
+        entry.wpm = minutes ? pyRound(entry.words / minutes, 1) : 0.0;
+        entry.share = sessionTalkTime ? pyRound(entry.talk_time / sessionTalkTime, 4) : 0.0;
+        entry.talk_time = pyRound(entry.talk_time, 2);
+        return entry;
+    }
+
+    // participation.summarize_participation over the matching speakers' rows
+    function summarizeParticipation(matrix, mask) {
+        var p = matrix.participation;
+        var total = {talk_time: 0.0, words: 0, turns: 0, speakers: 0};
+        var groups = {};
+        var rows = [];
+        for (var s = 0; s < p.rows; s++) {
+            if (mask !== null && !mask[s]) {
+                continue;
+            }
+            var row = {speaker: matrix.speakers[s], talk_time: p.talk_time[s], words: p.words[s], turns: p.turns[s]};
+            rows.push(row);
+            var entries = [total];
+            Object.keys(matrix.columns).forEach(function (col) {
+                var column = matrix.columns[col];
+                var code = column.codes[s];
+                if (code >= 0) {
+                    groups[col] = groups[col] || {};
+                    var value = column.values[code];
+                    groups[col][value] = groups[col][value] || {talk_time: 0.0, words: 0, turns: 0, speakers: 0};
+                    entries.push(groups[col][value]);
+                }
+            });
+            entries.forEach(function (entry) {
+                entry.talk_time += row.talk_time;
+                entry.words += row.words;
+                entry.turns += row.turns;
+                entry.speakers += 1;
+            });
+        }
+        var speakers = rows.map(function (row) { return addRates(Object.assign({}, row), p.session_talk_time); });
+        speakers.sort(function (a, b) { return b.talk_time - a.talk_time; });
+        Object.keys(groups).forEach(function (col) {
+            Object.keys(groups[col]).forEach(function (value) { addRates(groups[col][value], p.session_talk_time); });
+        });
+        return {speakers: speakers, groups: groups, total: addRates(total, p.session_talk_time)};
+    }
+
+    // app.create_participation_table
+    function participationTable(label, entries) {
+        var header = h("Thead", {}, h("Tr", {}, ["Time", "Words", "WPM", "Turns", "Share"].reduce(
+            function (cells, name) { cells.push(h("Th", {}, name)); return cells; }, [h("Th", {}, label)])));
+        var body = h("Tbody", {}, entries.map(function (entry) {
+            var stats = entry[1];
+            return h("Tr", {}, [
+                h("Td", {}, entry[0]),
+                h("Td", {}, formatDuration(stats.talk_time)),
+                h("Td", {}, formatInt(stats.words)),
+                h("Td", {}, String(pyRound(stats.wpm, 0))),
+                h("Td", {}, formatInt(stats.turns)),
+                h("Td", {}, pyRound(stats.share * 100, 0) + "%")
+            ]);
+        }));
+        return el("dash_bootstrap_components", "Table", {size: "sm", borderless: true, className: "small mb-2"},
+            [header, body]);
+    }
+
+    // app.create_participation_summary
+    function participationSummary(matrix, participation) {
+        if (!participation.speakers.length) {
+            return [];
+        }
+        var total = participation.total;
+        var content = [
+            h("H6", {className: "mt-3"}, "Participation"),
+            h("P", {}, [h("Strong", {}, "Talk time: "),
+                formatDuration(total.talk_time) + " (" + pyRound(total.share * 100, 0) + "% of session)"])
+        ];
+        content.push(participationTable("Speaker", participation.speakers.slice(0, matrix.top_speakers).map(
+            function (row) { return [row.speaker, row]; })));
+        matrix.filter_columns.concat(["session"]).forEach(function (key) {
+            var values = participation.groups[key];
+            if (values) {
+                var entries = Object.keys(values).sort().map(function (value) { return [value, values[value]]; });
+                entries.sort(function (a, b) { return b[1].talk_time - a[1].talk_time; });
+                content.push(participationTable(key.charAt(0).toUpperCase() + key.slice(1), entries));
+            }
+        });
+        return content;
+    }
+
+    var clientId = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    var requestSeq = 0;
+    var pendingRequest = null;  // Timer of a server request still waiting for input to settle
+
+    function cancelPendingRequest() {
+        if (pendingRequest !== null) {
+            clearTimeout(pendingRequest);
+            pendingRequest = null;
+        }
+    }
+
+    function filterCloud(clientData, roleFilter, zoneFilter, regionFilter, groupingMode, weightingMode, sessionValue) {
+        var noUpdate = window.dash_clientside.no_update;
+        var session = sessionValue || "all";
+        // Any newer input replaces a server request that has not been sent yet
+        cancelPendingRequest();
+        if (!clientData || clientData.session !== session) {
+            return [noUpdate, noUpdate, noUpdate];  // The store for this session is still loading
+        }
+        if (clientData.live_url) {
+            return [noUpdate, noUpdate, noUpdate];  // A live session: the event stream draws it (live.js)
+        }
+
+        var selections = {role: roleFilter, zone: zoneFilter, region: regionFilter};
+        var matrix = clientData.matrix;
+        if (!matrix || (groupingMode && groupingMode !== "off") || weightingMode === "utterances") {
+            requestSeq += 1;
+            var request = Object.assign({session: session, grouping: groupingMode, weighting: weightingMode,
+                client: clientId, seq: requestSeq}, selections);
+            if (!clientData.debounce_ms) {
+                return [noUpdate, noUpdate, request];
+            }
+            pendingRequest = setTimeout(function () {
+                pendingRequest = null;
+                window.dash_clientside.set_props("cloud-request-store", {data: request});
+            }, clientData.debounce_ms);
+            return [noUpdate, noUpdate, noUpdate];
+        }
+
+        var filters = {};
+        matrix.filter_columns.forEach(function (col) {
+            if (selections[col] && selections[col].length) {
+                filters[col] = selections[col];
+            }
+        });
+        var mask = matchSpeakers(matrix, filters);
+        var frequencies = topWords(matrix, mask);
+        var totalWords = frequencies.reduce(function (sum, entry) { return sum + entry[1]; }, 0);
+
+        var cloud = h("Iframe", {
+            srcDoc: cloudDocument(matrix.cloud, frequencies),
+            style: {width: "100%", height: "100%", border: "none", display: "block", overflow: "hidden"},
+            id: "wordcloud-iframe"
+        });
+
+        var summary = [
+            h("P", {}, [h("Strong", {}, "Total words: "), formatInt(totalWords)]),
+            h("P", {}, [h("Strong", {}, "Unique words: "), formatInt(frequencies.length)])
+        ];
+        var active = Object.keys(filters).map(function (col) { return col + ": " + filters[col].join(", "); });
+        if (active.length) {
+            summary.push(h("P", {}, [h("Strong", {}, "Active filters: "), active.join(", ")]));
+        }
+        summary = summary.concat(participationSummary(matrix, summarizeParticipation(matrix, mask)));
+
+        return [cloud, summary, noUpdate];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        wordcloud: {
+            filterCloud: filterCloud,
+            // Exposed for checking against the server path
+            _internals: {pyRound: pyRound, matchSpeakers: matchSpeakers, topWords: topWords,
+                cloudDocument: cloudDocument, summarizeParticipation: summarizeParticipation}
+        }
+    });
+})();
@@ -0,0 +1,103 @@
+/*
+ * Live sessions (see live_stream.py).
+ *
+ * window.dash_clientside.live.follow keeps one EventSource open while the
+ * selected view includes a live session, for the current filters,
+ * grouping and weighting. Each event carries the cloud and summary panel as the server
+ * callback renders them, and replaces both. Changing the view or filters
+ * reopens the stream, whose first event is the current state; the browser
+ * reconnects by itself if the stream drops.
+ *
+ * If the server refuses the stream (all its stream slots are taken), the
+ * EventSource closes instead of reconnecting, and the same view is polled
+ * every live_poll_ms with once=1 until the view changes. Polls only redraw
+ * when the view's version (the ETag) changed.
+ */
+(function () {
+    "use strict";
+
+    var source = null;
+    var sourceUrl = null;
+    var pollTimer = null;
+
+    function show(update) {
+        window.dash_clientside.set_props("wordcloud-container", {children: update.cloud});
+        window.dash_clientside.set_props("summary-stats", {children: update.summary});
+    }
+
+    function poll(url, interval) {
+        var version = null;
+        function fetchView() {
+            fetch(url + "&once=1", {cache: "no-cache"}).then(function (response) {
+                var etag = response.headers.get("ETag");
+                if (!response.ok || url !== sourceUrl || etag === version) {
+                    return;
+                }
+                version = etag;
+                return response.json().then(function (update) {
+                    if (url === sourceUrl) {
+                        show(update);
+                    }
+                });
+            }).catch(function () {
+                // Try again on the next tick
+            });
+        }
+        fetchView();
+        pollTimer = window.setInterval(fetchView, interval);
+    }
+
+    function streamUrl(clientData, selections, groupingMode, weightingMode) {
+        var params = new URLSearchParams({session: clientData.session});
+        Object.keys(selections).forEach(function (col) {
+            (selections[col] || []).forEach(function (value) { params.append(col, value); });
+        });
+        if (groupingMode && groupingMode !== "off") {
+            params.append("grouping", groupingMode);
+        }
+        if (weightingMode && weightingMode !== "mentions") {
+            params.append("weighting", weightingMode);
+        }
+        return clientData.live_url + "?" + params.toString();
+    }
+
+    function follow(clientData, roleFilter, zoneFilter, regionFilter, groupingMode, weightingMode, sessionValue) {
+        var url = null;
+        if (clientData && clientData.live_url && clientData.session === (sessionValue || "all")) {
+            url = streamUrl(clientData, {role: roleFilter, zone: zoneFilter, region: regionFilter}, groupingMode,
+                weightingMode);
+        }
+        if (url === sourceUrl) {
+            return window.dash_clientside.no_update;
+        }
+
+        if (source !== null) {
+            source.close();
+            source = null;
+        }
+        if (pollTimer !== null) {
+            window.clearInterval(pollTimer);
+            pollTimer = null;
+        }
+        sourceUrl = url;
+        if (url !== null) {
+            var opened = new EventSource(url);
+            opened.onmessage = function (event) {
+                show(JSON.parse(event.data));
+            };
+            opened.onerror = function () {
+                // Dropped streams reconnect by themselves; a refused one is closed
+                if (opened.readyState === EventSource.CLOSED && opened === source) {
+                    source = null;
+                    poll(url, clientData.live_poll_ms || 3000);
+                }
+            };
+            source = opened;
+        }
+        return url;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {follow: follow}
+    });
+})();
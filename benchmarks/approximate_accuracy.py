@@ -0,0 +1,146 @@
+"""
+Accuracy of approximate counting against exact counts.
+
+Loads every session both exactly (SessionData) and approximately
+(ApproximateSessionData, see approximate.py), then for each view (each
+session and "All Sessions", unfiltered and under single-role filters)
+reports:
+- the largest undercount over the exact vocabulary, next to the stated
+  bound (count_error); any word undercounted by more, or overcounted at
+  all, is a violation and makes the script exit non-zero
+- how many of the exact top-N words the approximate top-N finds
+- memory held by the two kinds of session
+
+"All Sessions" sums the per-session summaries as the dashboard does; the
+last row also merges every group summary into one (HeavyHitters.merge).
+
+Usage:
+    python benchmarks/approximate_accuracy.py --hours 5 --error 0.001 0.01
+    python benchmarks/approximate_accuracy.py --data-dir /path/to/data
+"""
+import argparse
+import functools
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import generate_dataset, add_dataset_arguments  # noqa: E402
+from approximate import ApproximateSessionData  # noqa: E402
+from config import APPROX_MAX_COUNTERS, CLOUD_TOP_N  # noqa: E402
+from data_processor import SessionData, top_k_merge  # noqa: E402
+from session_loader import discover_sessions  # noqa: E402
+
+
+def compare_view(exact: list, approx: list, filters: dict, top_n: int) -> dict:
+    """Compare one view (the sum over sessions) under filters."""
+    exact_ranked = [s.get_ranked_counts(filters) for s in exact]
+    approx_ranked = [s.get_ranked_counts(filters) for s in approx]
+    bound = sum(s.count_error(filters) for s in approx)
+
+    worst, violations = 0, 0
+    words = set().union(*(r.words for r in exact_ranked))
+    for word in words:
+        true = sum(r.count(word) for r in exact_ranked)
+        estimate = sum(r.count(word) for r in approx_ranked)
+        worst = max(worst, true - estimate)
+        if estimate > true or true - estimate > bound:
+            violations += 1
+
+    def tiebreak(sessions, word):
+        for i, session in enumerate(sessions):
+            rank = session.word_rank(word)
+            if rank is not None:
+                return (i, rank)
+        return (len(sessions), 0)
+
+    exact_top = top_k_merge(exact_ranked, top_n, functools.partial(tiebreak, exact))
+    approx_top = top_k_merge(approx_ranked, top_n, functools.partial(tiebreak, approx))
+    return {
+        "tokens": sum(r.total for r in exact_ranked),
+        "bound": bound,
+        "worst": worst,
+        "violations": violations,
+        "recall": len(set(exact_top) & set(approx_top)) / max(len(exact_top), 1),
+    }
+
+
+def compare_merged_summary(exact: list, approx: list) -> dict:
+    """Merge every group summary of every session into one and check it."""
+    summaries = [summary for session in approx for summary in session.summaries.values()]
+    merged = functools.reduce(lambda a, b: a.merge(b), summaries)
+    exact_ranked = [s.get_ranked_counts() for s in exact]
+    words = set().union(*(r.words for r in exact_ranked))
+    worst, violations = 0, 0
+    for word in words:
+        true = sum(r.count(word) for r in exact_ranked)
+        estimate = merged.counts.get(word, 0)
+        worst = max(worst, true - estimate)
+        if estimate > true or true - estimate > merged.error:
+            violations += 1
+    return {"tokens": merged.total, "bound": merged.error, "worst": worst, "violations": violations,
+            "counters": len(merged)}
+
+
+def run(data_dir: str, errors: list, max_counters: int, top_n: int) -> int:
+    """Print the comparison for each error setting; returns the number of violations."""
+    info = discover_sessions(data_dir)
+    exact = [SessionData(s["name"], s["json_path"], s["csv_path"]) for s in info]
+    roles = sorted({meta.get("role") for s in exact for meta in s.speakers.values() if meta.get("role")})
+    filter_sets = [{}] + [{"role": [role]} for role in roles]
+    exact_bytes = sum(s.memory_footprint() for s in exact)
+
+    total_violations = 0
+    for error in errors:
+        approx = [ApproximateSessionData(s["name"], s["json_path"], s["csv_path"], error, max_counters)
+                  for s in info]
+        approx_bytes = sum(s.memory_footprint() for s in approx)
+        print(f"\nerror {error}: approximate sessions hold {approx_bytes / 2**20:.2f} MB "
+              f"(exact: {exact_bytes / 2**20:.2f} MB)")
+        print(f"{'view':<14s} {'filter':<28s} {'tokens':>9s} {'bound':>7s} {'worst':>7s} "
+              f"{'violations':>10s} {'top-N recall':>12s}")
+
+        views = [(s.session_name, [s], [a]) for s, a in zip(exact, approx)] + [("All Sessions", exact, approx)]
+        for name, exact_sessions, approx_sessions in views:
+            for filters in filter_sets:
+                result = compare_view(exact_sessions, approx_sessions, filters, top_n)
+                total_violations += result["violations"]
+                label = ", ".join(v[0] for v in filters.values()) or "(none)"
+                print(f"{name:<14.14s} {label:<28.28s} {result['tokens']:9,d} {result['bound']:7,d} "
+                      f"{result['worst']:7,d} {result['violations']:10d} {result['recall']:12.1%}")
+
+        result = compare_merged_summary(exact, approx)
+        total_violations += result["violations"]
+        print(f"{'one summary':<14s} {'(none)':<28s} {result['tokens']:9,d} {result['bound']:7,d} "
+              f"{result['worst']:7,d} {result['violations']:10d} {'':>12s}")
+
+    return total_violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check approximate counts against exact counts.")
+    parser.add_argument("--data-dir", help="Existing data directory (skips generation)")
+    add_dataset_arguments(parser)
+    parser.add_argument("--error", type=float, nargs="+", default=[0.001, 0.01],
+                        help="Error bounds to try (fraction of the words counted)")
+    parser.add_argument("--max-counters", type=int, default=APPROX_MAX_COUNTERS,
+                        help="Counter ceiling per session (0 = none)")
+    parser.add_argument("--top-n", type=int, default=CLOUD_TOP_N, help="Words compared for top-N recall")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        violations = run(args.data_dir, args.error, args.max_counters, args.top_n)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, sessions=args.sessions, hours=args.hours, speakers=args.speakers,
+                             vocab=args.vocab, zipf=args.zipf, seed=args.seed)
+            violations = run(tmp, args.error, args.max_counters, args.top_n)
+
+    print(f"\n{violations} count(s) outside the stated bound")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Word click latency as the vocabulary grows.
+
+Clicking a word in the cloud calls get_word_details (one session) or
+get_merged_word_details ("All Sessions"). For each vocabulary size this
+generates a synthetic dataset and reports the median time per click, with
+and without a role filter, next to the previous approach of filtering the
+whole vocabulary and picking out the clicked word. The point lookup should
+stay flat while the full filter grows with the vocabulary.
+
+Usage:
+    python benchmarks/click_latency.py --vocab-sizes 2000 20000 200000 --hours 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import generate_dataset  # noqa: E402
+from data_processor import filter_word_stats  # noqa: E402
+from session_loader import SessionManager  # noqa: E402
+
+
+def per_click_ms(click, words: list, repeats: int) -> float:
+    """Median over repeats of the mean time to click every word in words (ms)."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for word in words:
+            click(word)
+        durations.append((time.perf_counter() - start) * 1000 / len(words))
+    return statistics.median(durations)
+
+
+def full_filter_click(word_stats: dict, speakers: dict, filters: dict):
+    """The previous approach: filter the whole vocabulary, then pick the word."""
+    def click(word):
+        return filter_word_stats(word_stats, speakers, filters).get(word)
+    return click
+
+
+def measure(data_dir: str, clicks: int, repeats: int, seed: int) -> dict:
+    manager = SessionManager(data_dir)
+    session = manager.get_session(manager.get_session_list()[0])
+    roles = manager.get_merged_filter_options().get("role", [])
+    filters = {"role": roles[:2]} if roles else {}
+
+    # Clicked words are spread over the whole frequency range
+    merged_stats = manager.get_merged_word_stats()
+    rng = np.random.default_rng(seed)
+    words = [str(w) for w in rng.choice(list(merged_stats), size=min(clicks, len(merged_stats)), replace=False)]
+    merged_speakers = manager.get_merged_speakers()
+
+    return {
+        "vocabulary": len(session.word_stats),
+        "merged_vocabulary": len(merged_stats),
+        "session": per_click_ms(lambda w: session.get_word_details(w), words, repeats),
+        "session_filtered": per_click_ms(lambda w: session.get_word_details(w, filters), words, repeats),
+        "merged_filtered": per_click_ms(lambda w: manager.get_merged_word_details(w, filters), words, repeats),
+        "full_filter": per_click_ms(full_filter_click(merged_stats, merged_speakers, filters), words[:5], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure word click latency against vocabulary size.")
+    parser.add_argument("--vocab-sizes", type=int, nargs="+", default=[2000, 20000, 200000],
+                        help="Content vocabulary sizes to generate")
+    parser.add_argument("--sessions", type=int, default=2, help="Number of sessions")
+    parser.add_argument("--hours", type=float, default=5.0, help="Hours of speech per session")
+    parser.add_argument("--speakers", type=int, default=20, help="Speakers per session")
+    parser.add_argument("--zipf", type=float, default=0.8,
+                        help="Zipf exponent (low values use more of the vocabulary)")
+    parser.add_argument("--clicks", type=int, default=200, help="Distinct words clicked per run")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    print(f"{'vocab':>8s} {'merged':>8s} {'session ms':>11s} {'filtered ms':>12s} "
+          f"{'all ms':>9s} {'full filter ms':>15s}")
+    for size in args.vocab_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, sessions=args.sessions, hours=args.hours, speakers=args.speakers,
+                             vocab=size, zipf=args.zipf, seed=args.seed)
+            result = measure(tmp, args.clicks, args.repeats, args.seed)
+        print(f"{result['vocabulary']:8d} {result['merged_vocabulary']:8d} {result['session']:11.4f} "
+              f"{result['session_filtered']:12.4f} {result['merged_filtered']:9.4f} {result['full_filter']:15.2f}")
+    print("\nPer-click medians. \"all\" is All Sessions with the role filter; \"full filter\" is the "
+          "previous approach of filtering the merged vocabulary for each click.")
+
+
+if __name__ == "__main__":
+    main()
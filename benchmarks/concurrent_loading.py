@@ -0,0 +1,134 @@
+"""
+Stress test of SessionManager's single-flight session loading.
+
+Starts many threads at once against a cold SessionManager, so they all ask
+for sessions that are not loaded yet, while other threads call refresh()
+in a loop. Each thread asks for sessions in its own random order, and some
+ask for the merged "All Sessions" frequencies, which load every session.
+Repeated for --rounds fresh managers. Checks that:
+- each session is parsed exactly once per manager
+- every thread gets the same SessionData object for a session
+- no thread raises
+
+Any violation is printed and makes the script exit non-zero.
+
+Usage:
+    python benchmarks/concurrent_loading.py --threads 64 --rounds 5 --sessions 4
+    python benchmarks/concurrent_loading.py --data-dir /path/to/data --delay-ms 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import generate_dataset, add_dataset_arguments  # noqa: E402
+from session_loader import SessionManager  # noqa: E402
+
+
+class CountingSessionManager(SessionManager):
+    """SessionManager that counts (and optionally slows down) its session parses."""
+
+    def __init__(self, data_dir: str, delay: float):
+        self.delay = delay
+        self.loads = Counter()
+        self._loads_lock = threading.Lock()
+        super().__init__(data_dir, memory_budget_mb=0, approximate=False, live_sessions=[])
+
+    def _load_session(self, info: dict):
+        with self._loads_lock:
+            self.loads[info["name"]] += 1
+        # Widens the window in which other threads find the load in progress
+        time.sleep(self.delay)
+        return super()._load_session(info)
+
+
+def run_round(data_dir: str, threads: int, refreshers: int, delay: float, rng: random.Random) -> list:
+    """One cold manager hit by `threads` threads at once; returns the violations found."""
+    manager = CountingSessionManager(data_dir, delay)
+    names = manager.get_session_list()
+    seen = defaultdict(set)  # Session name -> ids of the objects threads got
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + refreshers)
+    done = threading.Event()
+
+    def reader(seed: int):
+        local = random.Random(seed)
+        try:
+            barrier.wait()
+            if local.random() < 0.25:
+                manager.get_merged_frequencies(top_n=50)
+            order = names[:]
+            local.shuffle(order)
+            for name in order:
+                session = manager.get_session(name)
+                with lock:
+                    seen[name].add(id(session))
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    def refresher():
+        barrier.wait()
+        while not done.is_set():
+            manager.refresh()
+
+    workers = [threading.Thread(target=reader, args=(rng.random(),)) for _ in range(threads)]
+    background = [threading.Thread(target=refresher) for _ in range(refreshers)]
+    for thread in workers + background:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    done.set()
+    for thread in background:
+        thread.join()
+
+    violations = list(errors)
+    for name in names:
+        if manager.loads[name] != 1:
+            violations.append(f"{name} parsed {manager.loads[name]} times")
+        if len(seen[name]) != 1:
+            violations.append(f"{name}: threads got {len(seen[name])} different objects")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress-test concurrent loading of cold sessions.")
+    parser.add_argument("--data-dir", help="Existing data directory (skips generation)")
+    parser.add_argument("--threads", type=int, default=64, help="Threads asking for sessions at once")
+    parser.add_argument("--refreshers", type=int, default=2, help="Threads calling refresh() meanwhile")
+    parser.add_argument("--rounds", type=int, default=5, help="Fresh (cold) managers to test")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Extra time added to every session parse")
+    add_dataset_arguments(parser)
+    parser.set_defaults(sessions=4, hours=0.5)
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ["sessions", "hours", "speakers", "vocab", "zipf", "seed"]}
+    rng = random.Random(args.seed)
+    violations = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir
+        if not data_dir:
+            data_dir = tmp
+            generate_dataset(data_dir, **params)
+        for round_index in range(args.rounds):
+            start = time.perf_counter()
+            found = run_round(data_dir, args.threads, args.refreshers, args.delay_ms / 1000, rng)
+            print(f"round {round_index + 1}: {args.threads} threads, "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms, {len(found)} violations")
+            violations.extend(f"round {round_index + 1}: {v}" for v in found)
+
+    for violation in violations:
+        print(violation)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
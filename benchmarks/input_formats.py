@@ -0,0 +1,105 @@
+"""
+Load time and I/O comparison of the transcript input formats.
+
+Writes one synthetic session in every format discover_sessions accepts
+(JSON and JSONL, plain, gzip and zstd) and reports, per format: size on
+disk, median load_transcript time, bytes read through read() calls
+(rchar from /proc/self/io, Linux only) and peak Python memory during the
+load. The files are read warm from the page cache, so times show decoding
+cost rather than disk speed; the sizes show the disk read saved on a cold
+read.
+
+Usage:
+    python benchmarks/input_formats.py --hours 20 --speakers 20 --vocab 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import (  # noqa: E402
+    TRANSCRIPT_FORMATS, generate_segments, make_speakers, make_vocabulary, write_transcript, zstandard,
+)
+from data_processor import load_transcript  # noqa: E402
+
+
+def read_chars() -> int:
+    """Bytes this process has read via read() so far (None where unavailable)."""
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def measure(path: str, repeats: int) -> dict:
+    durations = []
+    read_bytes = None
+    for _ in range(repeats):
+        before = read_chars()
+        start = time.perf_counter()
+        words = load_transcript(path)
+        durations.append((time.perf_counter() - start) * 1000)
+        after = read_chars()
+        if before is not None and after is not None:
+            read_bytes = after - before
+
+    tracemalloc.start()
+    load_transcript(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "words": words,
+        "size_mb": os.path.getsize(path) / 1e6,
+        "median_ms": statistics.median(durations),
+        "read_mb": read_bytes / 1e6 if read_bytes is not None else float("nan"),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcript input formats.")
+    parser.add_argument("--hours", type=float, default=10.0, help="Hours of speech in the session")
+    parser.add_argument("--speakers", type=int, default=20, help="Speakers in the session")
+    parser.add_argument("--vocab", type=int, default=20000, help="Content vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for word frequencies")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed loads per format")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    speakers = make_speakers(args.speakers, rng)
+    segments = generate_segments(args.hours, speakers, make_vocabulary(args.vocab), args.zipf, rng)
+    formats = [fmt for fmt in TRANSCRIPT_FORMATS if zstandard is not None or not fmt.endswith(".zst")]
+
+    print(f"{'format':12s} {'size MB':>9s} {'read MB':>9s} {'load ms':>9s} {'peak MB':>9s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        for fmt in formats:
+            path = os.path.join(tmp, f"Synthetic_labeled{fmt}")
+            write_transcript(path, segments)
+            result = measure(path, args.repeats)
+            if reference is None:
+                reference = result["words"]
+            elif result["words"] != reference:
+                raise SystemExit(f"{fmt} loaded different words than {formats[0]}")
+            print(f"{fmt:12s} {result['size_mb']:9.1f} {result['read_mb']:9.1f} "
+                  f"{result['median_ms']:9.0f} {result['peak_mb']:9.1f}")
+            os.remove(path)
+    print(f"\n{len(reference)} words; every format loaded identical words")
+
+
+if __name__ == "__main__":
+    main()
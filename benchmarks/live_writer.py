@@ -0,0 +1,76 @@
+"""
+Synthetic live transcript writer, for trying live sessions locally.
+
+Creates a session folder with a speakerlist.csv and an empty
+<Name>_labeled.jsonl, then appends synthetic segments to the transcript as
+a transcription pipeline would, paced by the segments' own timings (sped up
+by --speed). With --word-lines each word is written as its own line, and
+lines are sometimes flushed half-written, as a slow writer would.
+
+Usage:
+    python benchmarks/live_writer.py /tmp/live --name standup --speed 20
+    WORDCLOUD_DATA_DIR=/tmp/live WORDCLOUD_LIVE_SESSIONS=standup python app.py
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from synthetic_data import generate_segments, make_speakers, make_vocabulary, write_speakerlist
+
+
+def segment_lines(segment: dict, word_lines: bool, segment_index: int) -> list:
+    """The JSONL lines for one segment (one line, or one per word)."""
+    if not word_lines:
+        return [json.dumps(segment) + "\n"]
+    return [json.dumps({**word, "segment": segment_index}) + "\n" for word in segment["words"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append synthetic words to a live session transcript.")
+    parser.add_argument("out_dir", help="Data directory to create the session folder in")
+    parser.add_argument("--name", default="live", help="Session (folder) name")
+    parser.add_argument("--hours", type=float, default=1.0, help="Length of the session to write")
+    parser.add_argument("--speed", type=float, default=10.0, help="Speed-up over real time")
+    parser.add_argument("--speakers", type=int, default=8, help="Speakers in the session")
+    parser.add_argument("--vocab", type=int, default=2000, help="Content vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for word frequencies")
+    parser.add_argument("--word-lines", action="store_true", help="Write one line per word instead of per segment")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    session_dir = os.path.join(args.out_dir, args.name)
+    os.makedirs(session_dir, exist_ok=True)
+    speakers = make_speakers(args.speakers, rng)
+    write_speakerlist(os.path.join(session_dir, "speakerlist.csv"), speakers)
+    segments = generate_segments(args.hours, speakers, make_vocabulary(args.vocab), args.zipf, rng)
+
+    path = os.path.join(session_dir, f"{args.name.title()}_labeled.jsonl")
+    print(f"Writing {sum(len(s['words']) for s in segments):,} words to {path}")
+    started = time.monotonic()
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for index, segment in enumerate(segments):
+            # Wait until the segment has "been said"
+            delay = started + segment["end"] / args.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            for line in segment_lines(segment, args.word_lines, index):
+                if args.word_lines and rng.random() < 0.05:
+                    # A line flushed in two parts
+                    f.write(line[:len(line) // 2])
+                    f.flush()
+                    time.sleep(0.1)
+                    line = line[len(line) // 2:]
+                f.write(line)
+            f.flush()
+            written += len(segment["words"])
+            print(f"\r{written:,} words, {segment['end'] / 60:.1f} min of speech", end="", flush=True)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+"""
+End-to-end load test of the dashboard's Dash callbacks.
+
+Simulates concurrent viewers against the real /_dash-update-component
+endpoint of app.server. Each viewer is a thread that behaves like one
+browser tab: it opens a session, then repeatedly picks an action from
+--mix, waiting a random think time (mean --think-ms) between actions:
+- session: switch the session dropdown (update_client_data), then draw the
+  cloud on the server if the browser could not filter it (update_wordcloud)
+- filter: toggle one role/zone/region value, or now and then the grouping
+  or weighting mode; the server is asked for a cloud only when the browser
+  would have to (no client-side table, grouped forms or utterance weighting)
+- click: click a word in the cloud (update_word_details)
+- search: type into the word lookup (update_word_suggestions)
+
+Callback payloads are built from /_dash-dependencies, as the Dash renderer
+does. Throughput, p50/p95/p99 latency and the error rate are reported per
+callback.
+
+Without --url, synthetic sessions are generated into a temporary directory
+and the app is started on a local port under gunicorn, as in the Procfile
+(--preload, --threads), then stopped afterwards. Everything runs offline.
+
+Usage:
+    python benchmarks/load_test.py --users 20 --duration 60 --workers 2
+    python benchmarks/load_test.py --server-filtering --hours 10 --users 50 -o load.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8050 --mix session=1,filter=6,click=3,search=1
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from synthetic_data import generate_dataset, add_dataset_arguments
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reported callback name -> id of the first input of its (server-side) callback
+CALLBACKS = {
+    "update_client_data": "session-dropdown",
+    "update_wordcloud": "cloud-request-store",
+    "update_word_details": "clicked-word-store",
+    "update_word_suggestions": "word-lookup-input",
+}
+
+ACTIONS = ["session", "filter", "click", "search"]
+DEFAULT_MIX = "session=1,filter=6,click=3,search=1"
+
+FILTER_COLUMNS = ["role", "zone", "region"]
+MODE_TOGGLE_SHARE = 0.1  # Filter actions that flip the grouping or weighting mode instead
+CLICK_WORDS = 100  # Top words per session that viewers click and search for
+
+
+def parse_mix(text: str) -> dict:
+    """Parse "session=1,filter=6,..." into action weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"Unknown action {name!r} (expected one of {ACTIONS})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad weight for {name}: {weight!r}")
+    if not any(w > 0 for w in mix.values()):
+        raise argparse.ArgumentTypeError("At least one action needs a positive weight")
+    return mix
+
+
+class DashClient:
+    """One keep-alive HTTP connection to the app, like one browser tab's."""
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple:
+        """
+        Send a request; returns (status, parsed JSON body or None).
+
+        Like a browser, a request on a kept-alive connection that the server
+        has since closed (it idled past the keep-alive timeout) is retried
+        once on a new connection.
+        """
+        reused = self.conn is not None
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.conn.request(method, path, None if body is None else json.dumps(body), headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (BrokenPipeError, ConnectionResetError, http.client.RemoteDisconnected):
+            self.close()
+            if not reused:
+                raise
+            return self.request(method, path, body)
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def get_json(self, path: str, **params):
+        status, data = self.request("GET", path + ("?" + urlencode(params) if params else ""))
+        if status != 200:
+            raise RuntimeError(f"GET {path} answered {status}")
+        return data
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def dash_payload(dependency: dict, values: dict) -> dict:
+    """
+    The /_dash-update-component body for a callback.
+
+    values maps "id.property" to the value of each input and state; the
+    first input is the one reported as changed.
+    """
+    outputs = []
+    for output in dependency["output"].strip(".").split("..."):
+        component, prop = output.rsplit(".", 1)
+        outputs.append({"id": component, "property": prop})
+    multi = dependency["output"].startswith("..")
+
+    def props(items):
+        return [{"id": i["id"], "property": i["property"], "value": values.get(f"{i['id']}.{i['property']}")}
+                for i in items]
+
+    first = dependency["inputs"][0]
+    return {
+        "output": dependency["output"],
+        "outputs": outputs if multi else outputs[0],
+        "inputs": props(dependency["inputs"]),
+        "state": props(dependency.get("state", [])),
+        "changedPropIds": [f"{first['id']}.{first['property']}"],
+    }
+
+
+class Results:
+    """Latencies and errors per callback, shared by all viewers."""
+
+    def __init__(self):
+        self.latencies = {name: [] for name in CALLBACKS}
+        self.errors = {name: {} for name in CALLBACKS}  # callback -> {status or exception name: count}
+        self.browser_redraws = 0  # Clouds the browser redrew without the server
+        self._lock = threading.Lock()
+
+    def add(self, callback: str, seconds: float, error: str = None):
+        with self._lock:
+            if error is None:
+                self.latencies[callback].append(seconds)
+            else:
+                self.errors[callback][error] = self.errors[callback].get(error, 0) + 1
+
+    def add_browser_redraw(self):
+        with self._lock:
+            self.browser_redraws += 1
+
+    def summary(self, elapsed: float) -> dict:
+        """Per-callback throughput, latency percentiles (ms) and error rate."""
+        result = {}
+        with self._lock:
+            items = [(name, list(self.latencies[name]), dict(self.errors[name])) for name in CALLBACKS]
+        for name, latencies, errors in items:
+            failed = sum(errors.values())
+            total = len(latencies) + failed
+            if not total:
+                continue
+            entry = {
+                "requests": total,
+                "throughput_rps": round(total / elapsed, 2),
+                "error_rate": round(failed / total, 4),
+                "errors": errors,
+            }
+            if latencies:
+                ms = np.array(latencies) * 1000
+                entry.update({
+                    "p50_ms": round(float(np.percentile(ms, 50)), 1),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 1),
+                    "p99_ms": round(float(np.percentile(ms, 99)), 1),
+                    "max_ms": round(float(ms.max()), 1),
+                })
+            result[name] = entry
+        return result
+
+
+class Viewer:
+    """One simulated browser tab, driving the callbacks as the page would."""
+
+    def __init__(self, client: DashClient, target: dict, results: Results, mix: dict, think_ms: float,
+                 rng: random.Random):
+        self.client = client
+        self.target = target
+        self.results = results
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.think_ms = think_ms
+        self.rng = rng
+        self.client_id = uuid.uuid4().hex
+        self.seq = 0
+        self.session = "all"
+        self.filters = {col: [] for col in FILTER_COLUMNS}
+        self.grouping = "off"
+        self.weighting = "mentions"
+        self.table = False  # Whether the browser got a table to filter the session itself
+
+    def call(self, name: str, values: dict):
+        """Fire one callback and record its latency, or its error."""
+        body = dash_payload(self.target["dependencies"][name], values)
+        start = time.perf_counter()
+        try:
+            status, data = self.client.request("POST", "/_dash-update-component", body)
+        except (OSError, http.client.HTTPException) as e:
+            self.results.add(name, time.perf_counter() - start, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - start
+        # 204: the callback left the page as it was (PreventUpdate / no_update)
+        if status not in (200, 204):
+            self.results.add(name, elapsed, str(status))
+            return None
+        self.results.add(name, elapsed)
+        return data
+
+    def filter_values(self) -> dict:
+        values = {f"filter-{col}.value": self.filters[col] or None for col in FILTER_COLUMNS}
+        values.update({"session-dropdown.value": self.session, "grouping-mode.value": self.grouping})
+        return values
+
+    def refresh_cloud(self):
+        """Redraw the cloud after a view change, on the server only if the browser could not."""
+        if self.table and self.grouping == "off" and self.weighting != "utterances":
+            self.results.add_browser_redraw()
+            return
+        self.seq += 1
+        request = {"session": self.session, "grouping": self.grouping, "weighting": self.weighting,
+                   "client": self.client_id, "seq": self.seq}
+        request.update({col: self.filters[col] or None for col in FILTER_COLUMNS})
+        self.call("update_wordcloud", {"cloud-request-store.data": request})
+
+    def switch_session(self):
+        choices = [s for s in self.target["sessions"] if s != self.session] or self.target["sessions"]
+        self.session = self.rng.choice(choices)
+        data = self.call("update_client_data", {"session-dropdown.value": self.session})
+        if data is not None:
+            store = data.get("response", {}).get("client-data-store", {}).get("data") or {}
+            self.table = store.get("matrix") is not None
+        self.refresh_cloud()
+
+    def toggle_filter(self):
+        if self.rng.random() < MODE_TOGGLE_SHARE:
+            if self.rng.random() < 0.5:
+                self.grouping = "stem" if self.grouping == "off" else "off"
+            else:
+                self.weighting = "utterances" if self.weighting == "mentions" else "mentions"
+        else:
+            options = self.target["filters"]
+            columns = [col for col in FILTER_COLUMNS if options.get(col)]
+            if not columns:
+                return
+            col = self.rng.choice(columns)
+            value = self.rng.choice(options[col])
+            if value in self.filters[col]:
+                self.filters[col].remove(value)
+            else:
+                self.filters[col].append(value)
+        self.refresh_cloud()
+
+    def click_word(self):
+        words = self.target["words"].get(self.session)
+        if words:
+            values = {**self.filter_values(), "clicked-word-store.data": self.rng.choice(words)}
+            self.call("update_word_details", values)
+
+    def search(self):
+        words = self.target["words"].get(self.session)
+        if words:
+            word = self.rng.choice(words)
+            values = {**self.filter_values(), "word-lookup-input.value": word[:self.rng.randint(2, 4)]}
+            self.call("update_word_suggestions", values)
+
+    def run(self, deadline: float):
+        self.switch_session()
+        handlers = {"session": self.switch_session, "filter": self.toggle_filter,
+                    "click": self.click_word, "search": self.search}
+        while time.monotonic() < deadline:
+            if self.think_ms:
+                time.sleep(min(self.rng.expovariate(1000 / self.think_ms), max(0, deadline - time.monotonic())))
+                if time.monotonic() >= deadline:
+                    break
+            handlers[self.rng.choices(self.actions, self.weights)[0]]()
+        self.client.close()
+
+
+def discover_target(url: str, timeout: float) -> dict:
+    """Callback definitions, sessions, filter options and clickable words, from the app."""
+    client = DashClient(url, timeout)
+    dependencies = {}
+    for dependency in client.get_json("/_dash-dependencies"):
+        if dependency.get("clientside_function"):
+            continue
+        for name, input_id in CALLBACKS.items():
+            if dependency["inputs"][0]["id"] == input_id:
+                dependencies[name] = dependency
+    missing = set(CALLBACKS) - set(dependencies)
+    if missing:
+        raise SystemExit(f"Callbacks not found in /_dash-dependencies: {sorted(missing)}")
+
+    sessions = ["all"] + client.get_json("/api/sessions")["sessions"]
+    filters = client.get_json("/api/filters", session="all")["filters"]
+    words = {}
+    for session in sessions:
+        frequencies = client.get_json("/api/frequencies", session=session, top_n=CLICK_WORDS)["frequencies"]
+        words[session] = [entry["word"] for entry in frequencies]
+    client.close()
+    return {"dependencies": dependencies, "sessions": sessions, "filters": filters, "words": words}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir: str, port: int, workers: int, threads: int, server_filtering: bool, log) -> subprocess.Popen:
+    """Start the app under gunicorn on a local port, as the Procfile does."""
+    env = {**os.environ, "WORDCLOUD_DATA_DIR": data_dir}
+    if server_filtering:
+        env["WORDCLOUD_CLIENT_FILTER_MAX_KB"] = "0"
+    command = [sys.executable, "-m", "gunicorn", "app:server", "--preload", "--threads", str(threads),
+               "--workers", str(workers), "--bind", f"127.0.0.1:{port}"]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_ready(url: str, timeout: float, server: subprocess.Popen = None):
+    """Wait until /ready answers 200 (the server's warm-up has finished)."""
+    client = DashClient(url, 5)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"Server exited with code {server.returncode}")
+        try:
+            if client.request("GET", "/ready")[0] == 200:
+                client.close()
+                return
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Server at {url} was not ready after {timeout:.0f} s")
+
+
+def run_load(url: str, users: int, duration: float, mix: dict, think_ms: float, timeout: float, seed: int) -> dict:
+    """Run the viewers against url for duration seconds; returns the report."""
+    target = discover_target(url, timeout)
+    results = Results()
+    rng = random.Random(seed)
+    viewers = [Viewer(DashClient(url, timeout), target, results, mix, think_ms, random.Random(rng.random()))
+               for _ in range(users)]
+
+    start = time.monotonic()
+    deadline = start + duration
+    threads = [threading.Thread(target=v.run, args=(deadline,), daemon=True) for v in viewers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    callbacks = results.summary(elapsed)
+    total = sum(c["requests"] for c in callbacks.values())
+    failed = sum(sum(c["errors"].values()) for c in callbacks.values())
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        "think_ms": think_ms,
+        "mix": mix,
+        "sessions": len(target["sessions"]) - 1,
+        "throughput_rps": round(total / elapsed, 2),
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "browser_redraws": results.browser_redraws,
+        "callbacks": callbacks,
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{report['users']} viewers for {report['duration_s']} s: {report['throughput_rps']} req/s, "
+          f"error rate {report['error_rate']:.2%}, "
+          f"{report['browser_redraws']} cloud redraws handled in the browser")
+    print(f"{'callback':26s} {'requests':>9s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'errors':>8s}")
+    for name, c in report["callbacks"].items():
+        print(f"{name:26s} {c['requests']:9d} {c['throughput_rps']:8.2f} {c.get('p50_ms', float('nan')):9.1f} "
+              f"{c.get('p95_ms', float('nan')):9.1f} {c.get('p99_ms', float('nan')):9.1f} {c['error_rate']:8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Dash callbacks with simulated viewers.")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--data-dir", help="Serve existing sessions instead of generating synthetic data")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent viewers")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--think-ms", type=float, default=1000.0,
+                        help="Mean pause between a viewer's actions (0 = back to back)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Relative weights of the actions (default {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers of the started server")
+    parser.add_argument("--threads", type=int, default=16, help="Threads per gunicorn worker of the started server")
+    parser.add_argument("--server-filtering", action="store_true",
+                        help="Start the server with client-side filtering off, as for large collections")
+    parser.add_argument("--ready-timeout", type=float, default=300.0, help="Seconds to wait for the server's warm-up")
+    parser.add_argument("-o", "--output", help="Write the report JSON to this file")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    def run(url):
+        report = run_load(url, args.users, args.duration, args.mix, args.think_ms, args.timeout, args.seed)
+        print_report(report)
+        return report
+
+    if args.url:
+        wait_ready(args.url, args.ready_timeout)
+        report = run(args.url)
+        report["server"] = {"url": args.url}
+    else:
+        params = {k: getattr(args, k) for k in ["sessions", "hours", "speakers", "vocab", "zipf", "seed"]}
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = args.data_dir
+            if not data_dir:
+                data_dir = os.path.join(tmp, "data")
+                print("Generating synthetic sessions...")
+                generate_dataset(data_dir, **params)
+            url = f"http://127.0.0.1:{free_port()}"
+            with open(os.path.join(tmp, "server.log"), "w+") as log:
+                server = start_server(data_dir, int(url.rsplit(":", 1)[1]), args.workers, args.threads,
+                                      args.server_filtering, log)
+                try:
+                    print(f"Waiting for the server at {url}...")
+                    wait_ready(url, args.ready_timeout, server)
+                    report = run(url)
+                except SystemExit:
+                    log.seek(0)
+                    print(log.read()[-4000:], file=sys.stderr)
+                    raise
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+        report["server"] = {"workers": args.workers, "threads": args.threads,
+                            "server_filtering": args.server_filtering,
+                            "dataset": args.data_dir or {"synthetic": params}}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Word cloud rendering benchmark page.
+
+Writes a self-contained HTML page that renders synthetic clouds of 50, 500
+and 2000 words with both renderers (SVG, and canvas with the layout in a
+Web Worker) and reports, per run:
+- time to first paint: from inserting the cloud's iframe to the first frame
+  after the words were drawn (the document's "wordcloud-rendered" message)
+- the longest main-thread stall on the page while it rendered, i.e. how
+  long the tab was frozen
+
+Open the page in a browser (it loads d3 from the same CDN as the app), and
+keep the tab in the foreground, since background tabs throttle frames.
+Results are shown in a table and kept in window.benchmarkResults.
+
+Usage:
+    python benchmarks/render_benchmark.py -o render_benchmark.html --sizes 50 500 2000
+"""
+import argparse
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import make_vocabulary  # noqa: E402
+from wordcloud_generator import render_wordcloud_html, wordcloud_words_data  # noqa: E402
+from config import WORDCLOUD_CONFIG  # noqa: E402
+
+RENDERERS = ["svg", "canvas"]
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Word cloud render benchmark</title>
+    <style>
+        body { font-family: sans-serif; margin: 20px; }
+        table { border-collapse: collapse; margin-top: 12px; }
+        td, th { border: 1px solid #ccc; padding: 4px 10px; text-align: right; }
+        iframe { border: 1px solid #eee; display: block; margin-top: 12px; }
+    </style>
+</head>
+<body>
+    <h3>Word cloud render benchmark</h3>
+    <p id="status">Starting...</p>
+    <table>
+        <thead><tr><th>renderer</th><th>words</th><th>placed</th>
+            <th>first paint ms (median)</th><th>longest stall ms (max)</th></tr></thead>
+        <tbody id="results"></tbody>
+    </table>
+    <div id="stage"></div>
+    <script>
+        const CASES = __CASES__;
+        const REPEATS = __REPEATS__;
+        const TIMEOUT_MS = 120000;
+        const WIDTH = __WIDTH__, HEIGHT = __HEIGHT__;
+        window.benchmarkResults = [];
+
+        function median(values) {
+            const sorted = values.slice().sort((a, b) => a - b);
+            const mid = sorted.length >> 1;
+            return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+        }
+
+        // One render: resolves with {firstPaint, stall, placed}
+        function renderOnce(doc) {
+            return new Promise(resolve => {
+                const stage = document.getElementById("stage");
+                const iframe = document.createElement("iframe");
+                iframe.width = WIDTH;
+                iframe.height = HEIGHT;
+                let stall = 0, last = performance.now(), running = true;
+                (function frame() {
+                    const now = performance.now();
+                    stall = Math.max(stall, now - last);
+                    last = now;
+                    if (running) requestAnimationFrame(frame);
+                })();
+                const start = performance.now();
+                function finish(result) {
+                    running = false;
+                    window.removeEventListener("message", onMessage);
+                    clearTimeout(timer);
+                    stage.removeChild(iframe);
+                    resolve(Object.assign({stall: stall}, result));
+                }
+                function onMessage(event) {
+                    if (event.source === iframe.contentWindow && event.data.type === "wordcloud-rendered") {
+                        finish({firstPaint: performance.now() - start, placed: event.data.words});
+                    }
+                }
+                const timer = setTimeout(() => finish({firstPaint: NaN, placed: 0}), TIMEOUT_MS);
+                window.addEventListener("message", onMessage);
+                iframe.srcdoc = doc;
+                stage.appendChild(iframe);
+            });
+        }
+
+        async function run() {
+            for (const c of CASES) {
+                const runs = [];
+                for (let r = 0; r < REPEATS; r++) {
+                    document.getElementById("status").textContent =
+                        `Rendering ${c.words} words with ${c.renderer} (${r + 1}/${REPEATS})`;
+                    runs.push(await renderOnce(c.doc));
+                }
+                const result = {
+                    renderer: c.renderer,
+                    words: c.words,
+                    placed: runs[runs.length - 1].placed,
+                    first_paint_ms: median(runs.map(x => x.firstPaint)),
+                    longest_stall_ms: Math.max(...runs.map(x => x.stall)),
+                };
+                window.benchmarkResults.push(result);
+                const row = document.createElement("tr");
+                [result.renderer, result.words, result.placed, result.first_paint_ms.toFixed(0),
+                 result.longest_stall_ms.toFixed(0)].forEach(value => {
+                    const cell = document.createElement("td");
+                    cell.textContent = value;
+                    row.appendChild(cell);
+                });
+                document.getElementById("results").appendChild(row);
+            }
+            document.getElementById("status").textContent = "Done";
+        }
+        run();
+    </script>
+</body>
+</html>
+"""
+
+
+def synthetic_frequencies(words: int) -> dict:
+    """Zipf-like counts for the first `words` synthetic vocabulary entries."""
+    return {word: 10000 // (rank + 1) + 1 for rank, word in enumerate(make_vocabulary(words))}
+
+
+def build_page(sizes: list, repeats: int) -> str:
+    cases = []
+    for size in sizes:
+        config = {"max_words": size}
+        words_json = json.dumps(wordcloud_words_data(synthetic_frequencies(size), config))
+        for renderer in RENDERERS:
+            cases.append({
+                "renderer": renderer,
+                "words": size,
+                "doc": render_wordcloud_html(words_json, {**config, "renderer": renderer}),
+            })
+    return (PAGE
+            .replace("__CASES__", json.dumps(cases).replace("</", "<\\/"))
+            .replace("__REPEATS__", str(repeats))
+            .replace("__WIDTH__", str(WORDCLOUD_CONFIG["width"]))
+            .replace("__HEIGHT__", str(WORDCLOUD_CONFIG["height"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the word cloud render benchmark page.")
+    parser.add_argument("-o", "--output", default="render_benchmark.html", help="HTML file to write")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 2000], help="Cloud sizes in words")
+    parser.add_argument("--repeats", type=int, default=3, help="Renders per renderer and size")
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(build_page(args.sizes, args.repeats))
+    print(f"Wrote {args.output}; open it in a browser to run the benchmark")
+
+
+if __name__ == "__main__":
+    main()
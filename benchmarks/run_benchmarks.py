@@ -0,0 +1,165 @@
+"""
+Benchmark suite for the data layer and word cloud generation.
+
+Generates (or reuses) a synthetic dataset, times the main pipeline stages,
+and writes the results as JSON so runs can be compared.
+
+Usage:
+    python benchmarks/run_benchmarks.py --hours 10 --sessions 3 -o results.json
+    python benchmarks/run_benchmarks.py --data-dir /path/to/data --compare results.json
+
+With --compare, each benchmark's median is compared against the earlier
+run and the script exits non-zero if any slowed down by more than
+--threshold (default 20%).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import generate_dataset, add_dataset_arguments  # noqa: E402
+from data_processor import load_transcript, load_speakerlist, compute_word_stats, filter_word_stats  # noqa: E402
+from session_loader import SessionManager  # noqa: E402
+from wordcloud_generator import generate_wordcloud_html  # noqa: E402
+
+
+def time_call(func, repeats: int) -> dict:
+    """Run func `repeats` times and summarise the wall-clock durations (ms)."""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeats": repeats,
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "mean_ms": round(statistics.mean(durations), 3),
+        "max_ms": round(max(durations), 3),
+    }
+
+
+def pick_filters(manager: SessionManager) -> dict:
+    """Pick a representative two-value role filter from the data."""
+    roles = manager.get_merged_filter_options().get("role", [])
+    return {"role": roles[:2]} if roles else {}
+
+
+def run_suite(data_dir: str, repeats: int) -> dict:
+    """Run every benchmark against the sessions in data_dir."""
+    manager = SessionManager(data_dir)
+    session_names = manager.get_session_list()
+    if not session_names:
+        raise SystemExit(f"No sessions found in {data_dir}")
+
+    session = manager.get_session(session_names[0])
+    filters = pick_filters(manager)
+    words = load_transcript(session.json_path)
+    speakers, _ = load_speakerlist(session.csv_path)
+    word_stats = compute_word_stats(words, speakers)
+    top_word = next(iter(manager.get_merged_frequencies(top_n=1)), "")
+    frequencies = manager.get_merged_frequencies()
+
+    benchmarks = {
+        "load_transcript": lambda: load_transcript(session.json_path),
+        "compute_word_stats": lambda: compute_word_stats(words, speakers),
+        "filter_word_stats": lambda: filter_word_stats(word_stats, speakers, filters),
+        "session_filtered_frequencies": lambda: session.get_filtered_frequencies(filters=filters),
+        "merged_frequencies": lambda: manager.get_merged_frequencies(),
+        "merged_frequencies_filtered": lambda: manager.get_merged_frequencies(filters=filters),
+        "merged_word_details": lambda: manager.get_merged_word_details(top_word),
+        "merged_word_details_filtered": lambda: manager.get_merged_word_details(top_word, filters=filters),
+        "generate_wordcloud_html": lambda: generate_wordcloud_html(frequencies),
+    }
+
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = time_call(func, repeats)
+        print(f"{name:32s} median {results[name]['median_ms']:10.2f} ms")
+
+    dataset = {
+        "sessions": len(session_names),
+        "words_first_session": len(words),
+        "vocabulary_first_session": len(word_stats),
+        "vocabulary_merged": len(manager.get_merged_word_stats()),
+        "filters": filters,
+    }
+    return {"dataset": dataset, "results": results}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare_results(current: dict, baseline: dict, threshold: float) -> list:
+    """Print median ratios against a baseline run; return names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':32s} {'baseline':>10s} {'current':>10s} {'ratio':>7s}")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["median_ms"]:
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:32s} {before['median_ms']:10.2f} {result['median_ms']:10.2f} {ratio:7.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run word cloud benchmarks.")
+    parser.add_argument("--data-dir", help="Use existing sessions instead of generating synthetic data")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ["sessions", "hours", "speakers", "vocab", "zipf", "seed"]}
+
+    if args.data_dir:
+        report = run_suite(args.data_dir, args.repeats)
+        report["dataset"]["source"] = args.data_dir
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, **params)
+            report = run_suite(tmp, args.repeats)
+        report["dataset"]["synthetic"] = params
+
+    report["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_results(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Sharded mode against the single-process path.
+
+Loads the same data with SessionManager and with ShardedSessionManager
+(--shards local shard processes, see sharding.py), then asks both the same
+questions and compares the answers exactly:
+- "All Sessions" and per-session frequencies for each --top-n, unfiltered
+  and under every single filter value (and one two-column filter), for each
+  grouping and weighting mode
+- merged and per-session word details and "said together with" for the
+  top words of the cloud (and a word that is not in any session)
+- word suggestions, filter options and participation
+
+Every mismatch is printed and makes the script exit non-zero.
+
+Usage:
+    python benchmarks/sharding_parity.py --shards 2 3 --sessions 5 --hours 0.5
+    python benchmarks/sharding_parity.py --data-dir /path/to/data --top-n 10 100
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from synthetic_data import generate_dataset, add_dataset_arguments  # noqa: E402
+from session_loader import SessionManager  # noqa: E402
+from sharding import ShardedSessionManager  # noqa: E402
+from word_forms import GROUPING_MODES, get_form_mapper  # noqa: E402
+
+WEIGHTINGS = ["mentions", "utterances"]
+DETAIL_WORDS = 5  # Top words whose details and associations are compared
+MISSING_WORD = "zzzznotaword"
+
+
+def available_groupings() -> list:
+    """No grouping, plus each grouping mode whose NLTK data is available."""
+    groupings = [None]
+    for mode in GROUPING_MODES:
+        try:
+            get_form_mapper(mode)
+            groupings.append(mode)
+        except LookupError:
+            print(f"skipping {mode} grouping: its NLTK data is unavailable")
+    return groupings
+
+
+def filter_views(options: dict) -> list:
+    """Unfiltered, every single filter value, and one filter on two columns."""
+    views = [{}]
+    for col, values in options.items():
+        views.extend({col: [value]} for value in values)
+    columns = [col for col, values in options.items() if values]
+    if len(columns) >= 2:
+        views.append({columns[0]: options[columns[0]][:2], columns[1]: options[columns[1]][:1]})
+    return views
+
+
+def canonical(value) -> str:
+    """Comparable text of an answer (numpy scalars and tuples included)."""
+    return json.dumps(value, sort_keys=True, default=lambda o: o.item() if hasattr(o, "item") else str(o))
+
+
+def compare(single: SessionManager, sharded: ShardedSessionManager, top_ns: list) -> tuple:
+    """Ask both managers the same questions; returns (questions asked, mismatches)."""
+    mismatches = []
+    asked = 0
+
+    def check(label: str, ask):
+        nonlocal asked
+        asked += 1
+        expected, got = canonical(ask(single)), canonical(ask(sharded))
+        if expected != got:
+            mismatches.append(f"{label}\n  single:  {expected[:300]}\n  sharded: {got[:300]}")
+
+    names = single.get_session_list()
+    check("session list", lambda m: m.get_session_list())
+    check("filter options", lambda m: m.get_merged_filter_options())
+    views = filter_views(single.get_merged_filter_options())
+    groupings = available_groupings()
+
+    for filters, grouping, weighting in itertools.product(views, groupings, WEIGHTINGS):
+        label = f"filters={filters} grouping={grouping} weighting={weighting}"
+        for top_n in top_ns:
+            check(f"all top {top_n} {label}",
+                  lambda m: m.get_merged_frequencies(filters, top_n, grouping, weighting=weighting))
+            for name in names:
+                check(f"{name} top {top_n} {label}",
+                      lambda m: m.get_session(name).get_filtered_frequencies(filters, top_n, grouping, weighting))
+
+    top_words = list(single.get_merged_frequencies(top_n=DETAIL_WORDS))
+    for filters in views:
+        for word in top_words + [MISSING_WORD]:
+            label = f"word={word} filters={filters}"
+            for grouping in groupings:
+                check(f"all details {label} grouping={grouping}",
+                      lambda m: m.get_merged_word_details(word, filters, grouping))
+            check(f"all associations {label}", lambda m: m.get_merged_associations(word, filters))
+            for name in names:
+                check(f"{name} details {label}", lambda m: m.get_session(name).get_word_details(word, filters))
+                check(f"{name} associations {label}", lambda m: m.get_session(name).get_associations(word, filters))
+        check(f"participation filters={filters}", lambda m: m.get_merged_participation(filters))
+        for name in names:
+            check(f"{name} participation filters={filters}",
+                  lambda m: m.get_session(name).get_participation(filters))
+
+    for word in top_words:
+        for prefix in {word[:2], word[:-1]}:
+            check(f"suggestions {prefix!r}", lambda m: m.get_word_suggestions(prefix, names[0]))
+
+    return asked, mismatches
+
+
+def run(data_dir: str, shard_counts: list, top_ns: list) -> int:
+    single = SessionManager(data_dir, memory_budget_mb=0, approximate=False, live_sessions=[])
+    failed = 0
+    for shards in shard_counts:
+        sharded = ShardedSessionManager(data_dir, shards=shards)
+        try:
+            start = time.perf_counter()
+            asked, mismatches = compare(single, sharded, top_ns)
+        finally:
+            sharded.close()
+        print(f"{shards} shard(s): {asked} questions, {len(mismatches)} mismatches "
+              f"({time.perf_counter() - start:.1f} s)")
+        for mismatch in mismatches:
+            print(mismatch)
+        failed += len(mismatches)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check sharded mode against the single-process path.")
+    parser.add_argument("--data-dir", help="Existing data directory (skips generation)")
+    parser.add_argument("--shards", type=int, nargs="+", default=[2, 3], help="Shard counts to check")
+    parser.add_argument("--top-n", type=int, nargs="+", default=[1, 10, 100], help="Cloud sizes (k) to compare")
+    add_dataset_arguments(parser)
+    parser.set_defaults(sessions=5, hours=0.25)
+    args = parser.parse_args()
+
+    if args.data_dir:
+        mismatches = run(args.data_dir, args.shards, args.top_n)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            generate_dataset(tmp, sessions=args.sessions, hours=args.hours, speakers=args.speakers,
+                             vocab=args.vocab, zipf=args.zipf, seed=args.seed)
+            mismatches = run(tmp, args.shards, args.top_n)
+
+    print(f"\n{mismatches} mismatch(es)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
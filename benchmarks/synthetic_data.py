@@ -0,0 +1,219 @@
+"""
+Synthetic session generator for benchmarks.
+
+Writes WhisperX-style ``<Name>_labeled.json`` transcripts (or any other
+format ``discover_sessions`` accepts, see ``--format``) and matching
+``speakerlist.csv`` files into session folders, in the layout that
+``discover_sessions`` expects. Word choice follows a Zipf distribution over
+a synthetic vocabulary, mixed with real stop words so the stop-word filter
+does realistic work.
+
+Usage:
+    python benchmarks/synthetic_data.py OUT_DIR --sessions 3 --hours 2 \\
+        --speakers 20 --vocab 5000 --zipf 1.1
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Transcript formats --format can write: suffix after "_labeled"
+TRANSCRIPT_FORMATS = [".json", ".json.gz", ".json.zst", ".jsonl", ".jsonl.gz", ".jsonl.zst"]
+
+# Speech rate used to convert hours into word counts
+WORDS_PER_MINUTE = 150
+
+# Fraction of tokens drawn from FILLER_WORDS rather than the content vocabulary
+FILLER_RATIO = 0.45
+FILLER_WORDS = [
+    "the", "and", "to", "of", "a", "that", "is", "in", "we", "so", "it",
+    "yeah", "um", "uh", "like", "know", "think", "just", "really", "okay",
+]
+
+ROLES = ["Building Official", "Energy Advisor", "Builder", "Policy and Programs staff", "Facilitator"]
+ZONES = ["1", "2", "3", "All"]
+REGIONS = ["Halifax", "Truro", "Shelburne", "Argyle", "Sydney", "Yarmouth"]
+
+
+def make_vocabulary(size: int) -> list:
+    """Build a vocabulary of distinct pronounceable pseudo-words."""
+    consonants = "bcdfghklmnprstvw"
+    vowels = "aeiou"
+    words = []
+    i = 0
+    while len(words) < size:
+        n = i
+        word = ""
+        # Alternate consonant/vowel syllables from the digits of n
+        while True:
+            word += consonants[n % len(consonants)] + vowels[(n // len(consonants)) % len(vowels)]
+            n //= len(consonants) * len(vowels)
+            if n == 0:
+                break
+        if len(word) >= 4:
+            words.append(word)
+        i += 1
+    return words
+
+
+def make_speakers(count: int, rng) -> list:
+    """Build speaker metadata rows for speakerlist.csv."""
+    speakers = []
+    for i in range(count):
+        speakers.append({
+            "Speaker": f"SPEAKER_{i:02d}",
+            "name": f"Speaker {i:02d}",
+            "role": ROLES[i % len(ROLES)],
+            "description": f"Synthetic participant {i}",
+            "zone": ZONES[int(rng.integers(len(ZONES)))],
+            "region": REGIONS[int(rng.integers(len(REGIONS)))],
+        })
+    return speakers
+
+
+def write_speakerlist(path: str, speakers: list):
+    """Write speakerlist.csv in the same shape as the real files."""
+    fields = ["Speaker", "name", "role", "description", "zone", "region"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for speaker in speakers:
+            writer.writerow([speaker[field] for field in fields])
+
+
+def generate_segments(hours: float, speakers: list, vocabulary: list, zipf: float, rng) -> list:
+    """
+    Generate transcript segments with word-level timings and speakers.
+
+    Speaker turns favour a few dominant speakers (Zipf-like), so filtered
+    views have realistically uneven counts.
+    """
+    total_words = int(hours * 60 * WORDS_PER_MINUTE)
+    names = [s["name"] for s in speakers]
+
+    ranks = np.arange(1, len(vocabulary) + 1, dtype=np.float64)
+    word_p = ranks ** -zipf
+    word_p /= word_p.sum()
+    speaker_p = np.arange(1, len(names) + 1, dtype=np.float64) ** -0.8
+    speaker_p /= speaker_p.sum()
+
+    content = rng.choice(len(vocabulary), size=total_words, p=word_p)
+    filler = rng.integers(len(FILLER_WORDS), size=total_words)
+    is_filler = rng.random(total_words) < FILLER_RATIO
+    punctuated = rng.random(total_words) < 0.08
+
+    seconds_per_word = 60.0 / WORDS_PER_MINUTE
+    segments = []
+    t = 0.0
+    i = 0
+    while i < total_words:
+        length = min(int(rng.integers(4, 45)), total_words - i)
+        speaker = names[int(rng.choice(len(names), p=speaker_p))]
+        words = []
+        for j in range(i, i + length):
+            token = FILLER_WORDS[filler[j]] if is_filler[j] else vocabulary[content[j]]
+            if punctuated[j]:
+                token += ","
+            start = round(t, 3)
+            t += seconds_per_word
+            words.append({
+                "word": " " + token,
+                "start": start,
+                "end": round(t - 0.05, 3),
+                "score": round(float(rng.uniform(0.5, 1.0)), 3),
+                "speaker": speaker,
+            })
+        segments.append({
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": "".join(w["word"] for w in words),
+            "speaker": speaker,
+            "words": words,
+        })
+        t += float(rng.uniform(0.2, 1.5))  # Pause between turns
+        i += length
+    return segments
+
+
+def open_for_writing(path: str):
+    """Open path as text for writing, compressing by its .gz/.zst suffix."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise SystemExit("Writing .zst transcripts needs the zstandard package")
+        writer = zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+        return io.TextIOWrapper(writer, encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def write_transcript(path: str, segments: list):
+    """Write segments as JSON, or one segment per line if path is .jsonl[.gz|.zst]."""
+    with open_for_writing(path) as f:
+        if ".jsonl" in os.path.basename(path):
+            for segment in segments:
+                f.write(json.dumps(segment) + "\n")
+        else:
+            json.dump({"segments": segments}, f)
+
+
+def generate_dataset(out_dir: str, sessions: int = 2, hours: float = 1.0, speakers: int = 15,
+                     vocab: int = 5000, zipf: float = 1.1, seed: int = 0, fmt: str = ".json") -> list:
+    """
+    Write `sessions` synthetic session folders under out_dir.
+
+    Returns the list of session folder paths.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(vocab)
+    paths = []
+
+    for k in range(sessions):
+        name = f"synthetic{k:02d}"
+        session_dir = os.path.join(out_dir, name)
+        os.makedirs(session_dir, exist_ok=True)
+
+        session_speakers = make_speakers(speakers, rng)
+        write_speakerlist(os.path.join(session_dir, "speakerlist.csv"), session_speakers)
+
+        segments = generate_segments(hours, session_speakers, vocabulary, zipf, rng)
+        write_transcript(os.path.join(session_dir, f"{name.title()}_labeled{fmt}"), segments)
+
+        paths.append(session_dir)
+    return paths
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    """Add the generator's size/shape options to an argument parser."""
+    parser.add_argument("--sessions", type=int, default=2, help="Number of sessions")
+    parser.add_argument("--hours", type=float, default=1.0, help="Hours of speech per session")
+    parser.add_argument("--speakers", type=int, default=15, help="Speakers per session")
+    parser.add_argument("--vocab", type=int, default=5000, help="Content vocabulary size")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for word frequencies")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic transcript sessions.")
+    parser.add_argument("out_dir", help="Directory to write session folders into")
+    add_dataset_arguments(parser)
+    parser.add_argument("--format", choices=TRANSCRIPT_FORMATS, default=".json", help="Transcript file format")
+    args = parser.parse_args()
+
+    paths = generate_dataset(args.out_dir, args.sessions, args.hours, args.speakers,
+                             args.vocab, args.zipf, args.seed, args.format)
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
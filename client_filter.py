@@ -0,0 +1,164 @@
+"""
+Compact per-session data for filtering in the browser.
+
+For sessions small enough, the whole word x speaker count table is sent
+to the browser once per session selection, in a dcc.Store. Filtering,
+top-N ranking, the word cloud document and the summary panel are then
+computed by a clientside callback (assets/client_filter.js), so changing
+a filter needs no server round trip. Larger collections, grouped word
+forms and utterance weighting fall back to the server callback.
+
+The table is CSR by word, with base64-encoded little-endian typed arrays:
+- words:   vocabulary in tie-break order (ties rank as on the server)
+- indptr:  int32 row pointers into speaker_index/counts
+- speaker_index: uint16 (or uint32) speaker index per non-zero count
+- counts:  uint32 count per (word, speaker)
+
+Speakers carry one code per filter column (an index into that column's
+values, or -1), plus their participation totals.
+"""
+import base64
+import json
+import threading
+
+import numpy as np
+
+from config import CLOUD_TOP_N, FILTER_COLUMNS, PARTICIPATION_TOP_SPEAKERS, WORDCLOUD_CONFIG
+from wordcloud_generator import WORDS_PLACEHOLDER, generate_empty_html, wordcloud_html_template
+
+
+_cache = {}  # (data version, session value) -> store contents (copy-on-write)
+_cache_lock = threading.Lock()
+
+
+def encode_array(values, dtype) -> str:
+    """Base64 of values as a little-endian array of dtype."""
+    return base64.b64encode(np.asarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()).decode("ascii")
+
+
+def build_client_data(session_manager, session_value: str, max_bytes: int) -> dict:
+    """
+    Store contents for session_value ("all" for the merged view).
+
+    "matrix" is None if client filtering is off (max_bytes 0), the counts
+    are approximate (the table needs exact per-speaker counts), the view
+    includes a live session (the table would go stale) or the encoded data
+    would exceed max_bytes; the server path is used then.
+    """
+    data = {"session": session_value, "matrix": None}
+    if not max_bytes or session_manager.get_live_sessions(session_value):
+        return data
+    if session_manager.get_count_error(session_value) is not None:
+        return data
+
+    merged = session_value == "all" or session_value is None
+    sessions = session_manager.get_all_sessions() if merged else [session_manager.get_session(session_value)]
+
+    # A rough size check first, so large collections are never encoded
+    if sum(session.vocabulary_size() for session in sessions) * 8 > max_bytes:
+        return data
+
+    speaker_ids = {}  # Speaker (prefixed in the merged view) -> index
+    metadata = []  # Per speaker: metadata dict, or None if not in the speaker list
+    talk_time, spoken, turns = [], [], []
+    session_talk_time = 0.0
+
+    def speaker_id(name, meta=None):
+        index = speaker_ids.get(name)
+        if index is None:
+            index = speaker_ids[name] = len(metadata)
+            metadata.append(meta)
+        return index
+
+    speakers = {}  # Speaker -> metadata, as in get_merged_speakers for the merged view
+    for session in sessions:
+        for name, meta in session.speakers.items():
+            if merged:
+                speakers[f"{session.session_name}:{name}"] = {**meta, "session": session.session_name}
+            else:
+                speakers[name] = meta
+
+    # Speakers with participation rows come first, in row order, so their
+    # index is also their position in the participation arrays
+    for session in sessions:
+        prefix = f"{session.session_name}:" if merged else ""
+        rows, total = session.get_participation_rows(None)
+        session_talk_time += total
+        for row in rows:
+            speaker_id(prefix + row["speaker"], speakers.get(prefix + row["speaker"]))
+            talk_time.append(row["talk_time"])
+            spoken.append(row["words"])
+            turns.append(row["turns"])
+    participation_rows = len(talk_time)
+    for name, meta in speakers.items():
+        speaker_id(name, meta)
+
+    words = {}  # Word -> {speaker index: count}, first session first (server tie order)
+    for session in sessions:
+        prefix = f"{session.session_name}:" if merged else ""
+        for word, stats in session.word_stats.items():
+            row = words.setdefault(word, {})
+            for speaker, count in stats["speakers"].items():
+                index = speaker_id(prefix + speaker)
+                row[index] = row.get(index, 0) + count
+
+    indptr = np.zeros(len(words) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in words.values()])
+    speaker_index = [index for row in words.values() for index in row]
+    counts = [count for row in words.values() for count in row.values()]
+
+    columns = FILTER_COLUMNS + (["session"] if merged else [])
+    column_codes = {}
+    for col in columns:
+        values = sorted({meta.get(col) for meta in metadata if meta and meta.get(col)})
+        codes = {value: i for i, value in enumerate(values)}
+        column_codes[col] = {
+            "values": values,
+            "codes": [codes.get(meta.get(col), -1) if meta else -1 for meta in metadata],
+        }
+
+    matrix = {
+        "words": list(words),
+        "indptr": encode_array(indptr, "i4"),
+        "speaker_index": encode_array(speaker_index, "u2" if len(metadata) < 2 ** 16 else "u4"),
+        "speaker_index_type": "uint16" if len(metadata) < 2 ** 16 else "uint32",
+        "counts": encode_array(counts, "u4"),
+        "speakers": list(speaker_ids),
+        "known": [meta is not None for meta in metadata],
+        "columns": column_codes,
+        "filter_columns": FILTER_COLUMNS,
+        "participation": {
+            "talk_time": talk_time,
+            "words": spoken,
+            "turns": turns,
+            "rows": participation_rows,
+            "session_talk_time": session_talk_time,
+        },
+        "top_n": CLOUD_TOP_N,
+        "top_speakers": PARTICIPATION_TOP_SPEAKERS,
+        "cloud": {
+            "template": wordcloud_html_template(),
+            "placeholder": WORDS_PLACEHOLDER,
+            "empty": generate_empty_html(),
+            "max_words": WORDCLOUD_CONFIG["max_words"],
+            "min_font_size": WORDCLOUD_CONFIG["min_font_size"],
+            "max_font_size": WORDCLOUD_CONFIG["max_font_size"],
+        },
+    }
+    if len(json.dumps(matrix, separators=(",", ":"))) > max_bytes:
+        return data
+    data["matrix"] = matrix
+    return data
+
+
+def get_client_data(session_manager, session_value: str, max_bytes: int) -> dict:
+    """build_client_data, cached until the session files change."""
+    global _cache
+    key = (session_manager.data_version, session_value)
+    data = _cache.get(key)
+    if data is None:
+        data = build_client_data(session_manager, session_value, max_bytes)
+        with _cache_lock:
+            # Entries for older data versions are dropped
+            _cache = {**{k: v for k, v in _cache.items() if k[0] == key[0]}, key: data}
+    return data
@@ -0,0 +1,67 @@
+"""
+Coalescing of superseded word cloud requests.
+
+The browser waits CLOUD_DEBOUNCE_MS for further filter changes before it
+asks the server for a cloud (see assets/client_filter.js), and tags each
+request with a per-page client id and an increasing sequence number.
+LatestRequests remembers the newest sequence number seen from each client.
+A computation checks its ticket between stages and stops as soon as a
+newer request from the same client has arrived, so under bursty input only
+the latest filter state runs to completion. A request still waiting behind
+a newer one is dropped before any work is done.
+
+The sequence numbers are kept per process: a newer request supersedes
+older ones served by the same gunicorn worker (by any of its threads).
+"""
+import threading
+from collections import OrderedDict
+
+from metrics import SUPERSEDED_REQUESTS
+
+
+class Superseded(Exception):
+    """Raised by Ticket.check once a newer request from the same client arrived."""
+
+
+class Ticket:
+    """One request's claim; requests without a client id are never superseded."""
+
+    def __init__(self, registry, client: str, seq: int):
+        self.registry = registry
+        self.client = client
+        self.seq = seq
+
+    def superseded(self) -> bool:
+        if self.client is None:
+            return False
+        return self.registry.latest(self.client, self.seq) > self.seq
+
+    def check(self):
+        """Raise Superseded if a newer request from the same client arrived."""
+        if self.superseded():
+            SUPERSEDED_REQUESTS.inc()
+            raise Superseded()
+
+
+class LatestRequests:
+    """Newest request sequence number per client, for the most recent clients."""
+
+    def __init__(self, max_clients: int):
+        self.max_clients = max_clients
+        self._latest = OrderedDict()  # client -> newest seq, least recently seen first
+        self._lock = threading.Lock()
+
+    def claim(self, client: str, seq: int) -> Ticket:
+        """Register a request, superseding older ones from the same client."""
+        if client is None or seq is None:
+            return Ticket(self, None, 0)
+        with self._lock:
+            if seq > self._latest.get(client, seq - 1):
+                self._latest[client] = seq
+            self._latest.move_to_end(client)
+            while len(self._latest) > self.max_clients:
+                self._latest.popitem(last=False)
+        return Ticket(self, client, seq)
+
+    def latest(self, client: str, default: int = 0) -> int:
+        return self._latest.get(client, default)
@@ -3,6 +3,7 @@ Configuration settings for the Word Cloud Dashboard.
 Automatically detects Railway production vs local development environment.
 """
 import os
+import tempfile
 
 # Detect environment
 IS_PRODUCTION = os.environ.get("RAILWAY_ENVIRONMENT") is not None
@@ -14,6 +15,37 @@ else:
     # Local development - point to transcribe output folder
     DATA_DIR = r"C:\Users\RyanKelly\OneDrive - Baseline Energy Analytics\opt\transcribe\output"
 
+# Explicit override (e.g. synthetic data for benchmarks)
+DATA_DIR = os.environ.get("WORDCLOUD_DATA_DIR") or DATA_DIR
+
+# Shared memory-mapped session store (see shared_store.py). When set, sessions
+# are compiled to flat arrays in this directory and memory-mapped read-only, so
+# gunicorn workers share one copy. Run gunicorn with --preload so the master
+# compiles and opens every session once before forking.
+SHARED_STORE_DIR = os.environ.get("WORDCLOUD_SHARED_STORE_DIR") or None
+
+# Memory budget for resident sessions, in MB (unset or 0 = unbounded). When
+# exceeded, the least-recently-used sessions are evicted; an evicted session is
+# compiled to COMPILED_CACHE_DIR and reloaded from there (memory-mapped) on its
+# next access.
+SESSION_MEMORY_BUDGET_MB = float(os.environ.get("WORDCLOUD_SESSION_BUDGET_MB") or 0)
+COMPILED_CACHE_DIR = os.environ.get("WORDCLOUD_COMPILED_CACHE_DIR") or os.path.join(
+    tempfile.gettempdir(), "wordcloud-compiled"
+)
+
+# Approximate counting (see approximate.py) for collections too large for exact
+# per-speaker counts: each speaker group keeps a heavy-hitters summary. Counts
+# are undercounted by at most APPROX_ERROR x the words counted, as long as a
+# session's groups fit in APPROX_MAX_COUNTERS counters (0 = no ceiling).
+APPROX_MODE = os.environ.get("WORDCLOUD_APPROXIMATE", "").lower() in ("1", "true", "yes")
+APPROX_ERROR = float(os.environ.get("WORDCLOUD_APPROX_ERROR", "0.001"))
+APPROX_MAX_COUNTERS = int(os.environ.get("WORDCLOUD_APPROX_MAX_COUNTERS", "200000"))
+
+# Sharded query mode (see sharding.py): number of local shard processes that
+# own the sessions (0 = single-process). Started in the gunicorn master under
+# --preload, so the workers share them.
+SHARD_COUNT = int(os.environ.get("WORDCLOUD_SHARDS") or 0)
+
 # Server configuration
 DEBUG = not IS_PRODUCTION
 HOST = "0.0.0.0"
@@ -24,10 +56,17 @@ WORDCLOUD_CONFIG = {
     "width": 800,
     "height": 400,
     "background_color": "white",
-    "max_words": 50,
+    "max_words": int(os.environ.get("WORDCLOUD_MAX_WORDS", "50")),
     "min_font_size": 10,
     "max_font_size": 100,
     "colormap": "viridis",
+    # "svg" lays out and draws with d3 on the page; "canvas" lays out in a
+    # Web Worker and draws on a canvas; "auto" uses canvas above canvas_min_words
+    "renderer": os.environ.get("WORDCLOUD_RENDERER", "auto"),
+    "canvas_min_words": 150,
+    # Fraction of rendered clouds that report their load, layout and paint
+    # times back to the server (see telemetry.py); 0 turns reporting off
+    "telemetry_sample": float(os.environ.get("WORDCLOUD_RENDER_TELEMETRY_SAMPLE", "1.0")),
 }
 
 # Custom stop words to add beyond NLTK defaults
@@ -75,6 +114,88 @@ CUSTOM_STOP_WORDS = {
     "different", "able", "new", "part", "people",
 }
 
+# Filter combinations whose ranked word totals are cached per session
+RANKED_CACHE_SIZE = 32
+
+# "Said together with" co-occurrence index (see cooccurrence.py). Counted words
+# co-occur within this many counted words in the same segment (0 = whole segment).
+COOCCURRENCE_WINDOW = int(os.environ.get("WORDCLOUD_COOCCURRENCE_WINDOW", "5"))
+COOCCURRENCE_MIN_COUNT = 2  # Pairs seen less often are not scored
+COOCCURRENCE_TOP_N = 8  # Associated terms shown in the details panel
+
+# Grouping of inflected forms (see word_forms.py): None, "stem" or "lemma".
+# GROUPING_MODE is the initial dashboard setting; mappings persist in LEMMA_CACHE_DIR.
+GROUPING_MODE = os.environ.get("WORDCLOUD_GROUPING", "").lower() or None
+LEMMA_CACHE_DIR = os.environ.get("WORDCLOUD_LEMMA_CACHE_DIR") or os.path.join(os.path.dirname(__file__), ".cache", "word_forms")
+
+# Cloud weighting (see utterances.py): "mentions" counts every occurrence,
+# "utterances" the distinct utterances containing a word. Initial dashboard setting.
+WEIGHTING_MODE = os.environ.get("WORDCLOUD_WEIGHTING", "").lower() or "mentions"
+
+# Speakers listed in the summary panel's participation table (see participation.py)
+PARTICIPATION_TOP_SPEAKERS = 8
+
+# Word lookup suggestions (see word_search.py)
+SUGGEST_LIMIT = 10
+FUZZY_MAX_DISTANCE = 2  # Edits allowed when matching misspelled words
+
+# Words ranked for the word cloud and its summary (at least the words drawn)
+CLOUD_TOP_N = max(100, WORDCLOUD_CONFIG["max_words"])
+
+# Client-side filtering (see client_filter.py): sessions whose word x speaker
+# table encodes to at most this many KB are filtered in the browser (0 = off)
+CLIENT_FILTER_MAX_KB = int(os.environ.get("WORDCLOUD_CLIENT_FILTER_MAX_KB", "1024"))
+
+# Request coalescing (see coalescing.py): the browser waits this long for
+# further filter changes before asking the server for a cloud (0 = no wait)
+CLOUD_DEBOUNCE_MS = int(os.environ.get("WORDCLOUD_CLOUD_DEBOUNCE_MS", "250"))
+COALESCE_MAX_CLIENTS = 10_000  # Clients whose latest request is remembered per process
+
+# Live sessions (see live.py): sessions named here (comma-separated) whose
+# transcript is an uncompressed .jsonl are tailed while it is being written.
+# New words are counted every LIVE_POLL_SECONDS and pushed to open dashboards
+# over server-sent events.
+LIVE_SESSIONS = [name.strip() for name in os.environ.get("WORDCLOUD_LIVE_SESSIONS", "").split(",") if name.strip()]
+LIVE_POLL_SECONDS = float(os.environ.get("WORDCLOUD_LIVE_POLL_SECONDS", "1.0"))
+LIVE_KEEPALIVE_SECONDS = 15  # Comment lines sent on idle streams, to notice closed tabs
+LIVE_RETRY_MS = 3000  # Browser reconnect delay after a dropped stream
+# Each open stream holds a server thread: at most this many per process, the
+# rest of gunicorn's --threads serve callbacks. Dashboards past the cap poll
+# every LIVE_FALLBACK_POLL_MS instead.
+LIVE_MAX_STREAMS = int(os.environ.get("WORDCLOUD_LIVE_MAX_STREAMS", "12"))
+LIVE_FALLBACK_POLL_MS = int(os.environ.get("WORDCLOUD_LIVE_FALLBACK_POLL_MS", "3000"))
+
+# Background warm-up (see warmup.py): besides the unfiltered cloud, precompute
+# this many of the single filter values that cover the most speakers
+WARMUP_FILTER_LIMIT = int(os.environ.get("WORDCLOUD_WARMUP_FILTERS", "10"))
+# A failed warm-up step is retried this many times, after WARMUP_RETRY_SECONDS
+# and then doubling waits, before it is skipped and listed in /ready's errors
+WARMUP_RETRIES = int(os.environ.get("WORDCLOUD_WARMUP_RETRIES", "2"))
+WARMUP_RETRY_SECONDS = 1.0
+
+# Parquet/Arrow export (see export.py). API exports are cached here by data version.
+EXPORT_DIR = os.environ.get("WORDCLOUD_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "wordcloud-export")
+EXPORT_CHUNK_ROWS = 100_000  # Rows per written record batch
+
 # Columns from speakerlist.csv to use as filter options
 # These are read dynamically, but we can specify which to prioritize
 FILTER_COLUMNS = ["role", "zone", "region"]
+
+# On-demand callback profiling (see profiling.py). WORDCLOUD_PROFILE=all profiles
+# every callback; "header" profiles only requests sending PROFILE_HEADER: 1.
+PROFILE_MODE = os.environ.get("WORDCLOUD_PROFILE", "").lower() or None
+PROFILE_DIR = os.environ.get("WORDCLOUD_PROFILE_DIR") or os.path.join(os.path.dirname(__file__), "profiles")
+PROFILE_HEADER = "X-Wordcloud-Profile"
+PROFILE_KEEP = 50  # Recent profiles kept in PROFILE_DIR and listed at /debug/profiles
+
+# Client render telemetry (see telemetry.py): cloud documents POST their timings
+# here; distinct configurations beyond TELEMETRY_MAX_CONFIGS are not recorded
+TELEMETRY_PATH = "/telemetry/render"
+TELEMETRY_MAX_CONFIGS = 200
+TELEMETRY_MAX_BYTES = 2048  # Larger reports are rejected
+
+# JSON query API (see api.py)
+API_PREFIX = "/api"
+API_DEFAULT_TOP_N = 100
+API_MAX_TOP_N = 1000
+API_GZIP_MIN_BYTES = 500  # Smaller responses are sent uncompressed
@@ -0,0 +1,189 @@
+"""
+Word co-occurrence index for "said together with" lookups.
+
+Built once per session at load time from the transcript segments. Two
+counted words co-occur when the same speaker says them within
+COOCCURRENCE_WINDOW counted words of each other inside one segment
+(window 0 = anywhere in the same segment). Stop words are excluded before
+windowing, exactly as in compute_word_stats.
+
+The index is a sparse CSR matrix over word ids (positions in the session's
+word_stats order). Each row stores (other word, speaker, count) triples, so
+a filtered query only reads one row and its cost does not depend on the
+vocabulary size.
+"""
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from config import COOCCURRENCE_WINDOW, COOCCURRENCE_MIN_COUNT
+
+INDEX_ARRAY_NAMES = ["cooc_indptr", "cooc_other", "cooc_speaker", "cooc_count", "cooc_pair_totals"]
+
+
+class CooccurrenceIndex:
+    """Sparse word x word co-occurrence counts, broken down by speaker."""
+
+    def __init__(self, indptr, other, speaker, count, pair_totals, speaker_names: list):
+        self.indptr = indptr  # Row pointers, one row per word id
+        self.other = other  # Co-occurring word id
+        self.speaker = speaker  # Speaker index into speaker_names
+        self.count = count  # Co-occurrences for (row word, other, speaker)
+        self.pair_totals = pair_totals  # Directed pair instances per speaker
+        self.speaker_names = speaker_names
+
+    def arrays(self) -> dict:
+        """Arrays for persisting the index (see shared_store)."""
+        return {
+            "cooc_indptr": self.indptr,
+            "cooc_other": self.other,
+            "cooc_speaker": self.speaker,
+            "cooc_count": self.count,
+            "cooc_pair_totals": self.pair_totals,
+        }
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
+
+    def speaker_mask(self, matching):
+        """Boolean mask over speaker_names for a matching set (None = everyone)."""
+        if matching is None:
+            return None
+        return np.array([name in matching for name in self.speaker_names], dtype=bool)
+
+    def row_counts(self, word_id: int, matching) -> tuple:
+        """
+        Co-occurrence counts of one word under a speaker filter.
+
+        Returns (other word ids, counts) aggregated over matching speakers.
+        """
+        if word_id is None or word_id + 1 >= len(self.indptr):
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+
+        start, end = int(self.indptr[word_id]), int(self.indptr[word_id + 1])
+        other = np.asarray(self.other[start:end])
+        count = np.asarray(self.count[start:end], dtype=np.int64)
+
+        mask = self.speaker_mask(matching)
+        if mask is not None and len(mask):
+            keep = mask[np.asarray(self.speaker[start:end])]
+            other, count = other[keep], count[keep]
+
+        # Rows are sorted by other id, so equal ids are contiguous
+        ids, first = np.unique(other, return_index=True)
+        return ids, np.add.reduceat(count, first) if len(first) else count[:0]
+
+    def total_pairs(self, matching) -> int:
+        """Directed pair instances under a speaker filter."""
+        mask = self.speaker_mask(matching)
+        totals = np.asarray(self.pair_totals)
+        return int(totals.sum() if mask is None else totals[mask].sum())
+
+
+def build_cooccurrence_index(counted: list, word_ids: dict, window: int = None) -> CooccurrenceIndex:
+    """
+    Build the co-occurrence index from a session's counted words.
+
+    counted is a sequence of (word, speaker, segment) in transcript order,
+    as produced by data_processor.counted_words; word_ids maps each word to
+    its id (its position in word_stats).
+    """
+    if window is None:
+        window = COOCCURRENCE_WINDOW
+
+    speaker_index = {}
+    tokens, segments, speakers = [], [], []
+    for word, speaker, segment in counted:
+        word_id = word_ids.get(word)
+        if word_id is None:
+            continue
+        if speaker not in speaker_index:
+            speaker_index[speaker] = len(speaker_index)
+        tokens.append(word_id)
+        segments.append(segment)
+        speakers.append(speaker_index[speaker])
+
+    tok = np.array(tokens, dtype=np.int64)
+    seg = np.array(segments, dtype=np.int64)
+    spk = np.array(speakers, dtype=np.int64)
+    vocab_size = max(word_ids.values(), default=-1) + 1
+    speaker_names = list(speaker_index)
+    n_speakers = max(len(speaker_names), 1)
+
+    if window <= 0 and len(seg):
+        # Whole-segment mode: the window is the longest segment
+        window = int(np.bincount(seg - seg.min()).max())
+
+    keys = []
+    for offset in range(1, window + 1):
+        if offset >= len(tok):
+            break
+        a, b = tok[:-offset], tok[offset:]
+        same = (seg[:-offset] == seg[offset:]) & (spk[:-offset] == spk[offset:]) & (a != b)
+        s = spk[offset:][same]
+        a, b = a[same], b[same]
+        # Count both directions so each row holds all of a word's partners
+        keys.append((a * vocab_size + b) * n_speakers + s)
+        keys.append((b * vocab_size + a) * n_speakers + s)
+
+    if keys:
+        unique, counts = np.unique(np.concatenate(keys), return_counts=True)
+    else:
+        unique, counts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    row = unique // (vocab_size * n_speakers)
+    other = (unique // n_speakers) % vocab_size if vocab_size else unique
+    speaker = unique % n_speakers
+
+    indptr = np.searchsorted(row, np.arange(vocab_size + 1)).astype(np.int64)
+    pair_totals = np.bincount(speaker, weights=counts, minlength=len(speaker_names)).astype(np.int64)
+
+    return CooccurrenceIndex(
+        indptr=indptr,
+        other=other.astype(np.int32),
+        speaker=speaker.astype(np.int16 if n_speakers < 2**15 else np.int32),
+        count=counts.astype(np.int32),
+        pair_totals=pair_totals,
+        speaker_names=speaker_names,
+    )
+
+
+def merge_association_counts(parts: list) -> dict:
+    """Sum per-session association counts (see SessionData.get_association_counts)."""
+    pairs = defaultdict(int)
+    merged = {"word_count": 0, "total_tokens": 0, "total_pairs": 0}
+    for part in parts:
+        for other, together in part["pairs"].items():
+            pairs[other] += together
+        for key in merged:
+            merged[key] += part[key]
+    return {"pairs": dict(pairs), **merged}
+
+
+def rank_associations(pair_counts: dict, word_count: int, other_counts: dict, total_tokens: int,
+                      total_pairs: int, top_n: int, min_count: int = None) -> list:
+    """
+    Score co-occurring words by pointwise mutual information.
+
+    PMI = log2(p(w, c) / (p(w) p(c))), with p(w, c) from pair counts and
+    p(w), p(c) from filtered word counts. Pairs seen fewer than min_count
+    times are dropped, since PMI overrates rare pairs.
+
+    Returns a list of {"word", "count", "pmi"} dicts, best first.
+    """
+    if min_count is None:
+        min_count = COOCCURRENCE_MIN_COUNT
+    if not word_count or not total_tokens or not total_pairs:
+        return []
+
+    scored = []
+    for other, together in pair_counts.items():
+        other_count = other_counts.get(other, 0)
+        if together < min_count or not other_count:
+            continue
+        pmi = math.log2((together / total_pairs) / ((word_count / total_tokens) * (other_count / total_tokens)))
+        scored.append({"word": other, "count": int(together), "pmi": round(pmi, 2)})
+
+    scored.sort(key=lambda a: (-a["pmi"], -a["count"], a["word"]))
+    return scored[:top_n]
@@ -3,13 +3,34 @@ Data processing module for loading transcripts and computing word statistics.
 """
 import json
 import csv
+import gzip
+import io
 import re
+import sys
+import heapq
+import itertools
+import threading
 from collections import defaultdict
 from pathlib import Path
 import nltk
+import numpy as np
 from nltk.corpus import stopwords
 
-from config import CUSTOM_STOP_WORDS
+from config import CUSTOM_STOP_WORDS, RANKED_CACHE_SIZE, COOCCURRENCE_MIN_COUNT
+from cooccurrence import build_cooccurrence_index, rank_associations
+from metrics import timed_stage
+from participation import ParticipationStats, summarize_participation
+from utterances import build_utterance_index
+from word_forms import get_form_mapper
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst transcripts
+    zstandard = None
+
+# Transcript files are <name>_labeled<suffix>, optionally compressed (see transcript_suffixes)
+TRANSCRIPT_BASE_SUFFIXES = [".json", ".jsonl"]
+JSONL_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
 
 # Download NLTK stopwords if not already present
 try:
@@ -56,27 +77,166 @@ def load_speakerlist(csv_path: str) -> dict:
     return speakers, columns
 
 
+def transcript_suffixes() -> list:
+    """Transcript file suffixes that can be read, in order of preference."""
+    compressions = ["", ".gz"] + ([".zst"] if zstandard is not None else [])
+    return [base + compression for base in TRANSCRIPT_BASE_SUFFIXES for compression in compressions]
+
+
+def open_transcript(path: str):
+    """Open a transcript for reading as text, decompressing .gz/.zst as a stream."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path} needs the zstandard package")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def word_entry(word_data: dict, segment_index: int) -> dict:
+    """Normalize one transcript word."""
+    return {
+        "word": word_data.get("word", "").lower().strip(),
+        "speaker": word_data.get("speaker", "Unknown"),
+        "start": word_data.get("start", 0),
+        "end": word_data.get("end", 0),
+        "score": word_data.get("score", 0),
+        "segment": segment_index,
+    }
+
+
+class JsonlWordReader:
+    """
+    Reads JSONL transcript lines into words, a batch at a time.
+
+    Segment numbering carries over between feed() calls, so a transcript
+    read as it is being written gets the same segments as one read whole.
+    """
+
+    def __init__(self):
+        self.segment_index = -1
+        self._previous = object()  # Segment marker of the last word line
+
+    def feed(self, lines) -> list:
+        """
+        Words from the next lines of a JSONL transcript.
+
+        Each line is either a segment (an object with "words") or a single word.
+        Word lines are grouped into segments by their "segment" field if they
+        have one, otherwise a new segment starts whenever the speaker changes.
+        """
+        words = []
+        segment_index = self.segment_index
+        previous = self._previous
+        for line in lines:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if "words" in data:
+                segment_index += 1
+                previous = object()
+                words.extend(word_entry(word_data, segment_index) for word_data in data["words"])
+                continue
+            marker = data.get("segment", data.get("speaker", "Unknown"))
+            if marker != previous:
+                segment_index += 1
+                previous = marker
+            words.append(word_entry(data, segment_index))
+        self.segment_index = segment_index
+        self._previous = previous
+        return words
+
+
+def complete_lines(lines):
+    """
+    Lines of a JSONL transcript, leaving out a last line that is still being
+    written (no newline yet and not valid JSON), as in a live transcript.
+    """
+    previous = None
+    for line in lines:
+        if previous is not None:
+            yield previous
+        previous = line
+    if previous is None:
+        return
+    if not previous.endswith("\n"):
+        try:
+            json.loads(previous)
+        except ValueError:
+            return
+    yield previous
+
+
+def read_jsonl_words(lines) -> list:
+    """Words from a JSONL transcript, read line by line (see JsonlWordReader.feed)."""
+    return JsonlWordReader().feed(lines)
+
+
+def iter_transcript(json_path: str, batch_lines: int = 10_000):
+    """
+    Yield a transcript's words in batches, as load_transcript would return them.
+
+    JSONL transcripts are read batch_lines lines at a time, so only one
+    batch of words is held at once; a JSON transcript is parsed whole and
+    yields a batch per segment.
+    """
+    with open_transcript(json_path) as f:
+        if str(json_path).endswith(JSONL_SUFFIXES):
+            reader = JsonlWordReader()
+            lines = complete_lines(f)
+            while True:
+                batch = list(itertools.islice(lines, batch_lines))
+                if not batch:
+                    return
+                yield reader.feed(batch)
+        data = json.load(f)
+
+    for segment_index, segment in enumerate(data.get("segments", [])):
+        yield [word_entry(word_data, segment_index) for word_data in segment.get("words", [])]
+
+
 def load_transcript(json_path: str) -> list:
     """
     Load transcript from JSON file.
 
-    Returns list of word objects with speaker attribution.
+    Also reads JSONL (one segment or word per line; a half-written last line
+    is skipped) and gzip/zstd-compressed files, which are decompressed as a
+    stream (see transcript_suffixes).
+
+    Returns list of word objects with speaker attribution and the index
+    of the segment they came from.
     """
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    return [word for batch in iter_transcript(json_path) for word in batch]
 
-    words = []
-    for segment in data.get("segments", []):
-        for word_data in segment.get("words", []):
-            words.append({
-                "word": word_data.get("word", "").lower().strip(),
-                "speaker": word_data.get("speaker", "Unknown"),
-                "start": word_data.get("start", 0),
-                "end": word_data.get("end", 0),
-                "score": word_data.get("score", 0),
-            })
 
-    return words
+def estimate_footprint(obj, sample_size: int = 1000) -> int:
+    """
+    Estimate the deep memory size of obj in bytes.
+
+    Containers larger than sample_size are extrapolated from an evenly
+    spaced sample of their items, so large transcripts are sized quickly.
+    """
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        items = list(obj.items()) if len(obj) <= sample_size else None
+        if items is None:
+            step = len(obj) // sample_size
+            items = [item for i, item in enumerate(obj.items()) if i % step == 0][:sample_size]
+        sampled = sum(estimate_footprint(k, sample_size) + estimate_footprint(v, sample_size) for k, v in items)
+        return size + sampled * len(obj) // max(len(items), 1)
+
+    if isinstance(obj, (list, tuple, set)):
+        items = list(obj)
+        if len(items) > sample_size:
+            items = items[::len(items) // sample_size][:sample_size]
+        sampled = sum(estimate_footprint(item, sample_size) for item in items)
+        return size + sampled * len(obj) // max(len(items), 1)
+
+    return size
 
 
 def get_stop_words() -> set:
@@ -98,6 +258,27 @@ def clean_word(word: str) -> str:
     return word
 
 
+def counted_occurrences(words: list):
+    """
+    Yield (position, cleaned word, word data) for each word that counts towards stats.
+
+    Stop words and empty/short words are skipped. position is the word's
+    index in words.
+    """
+    stop_words = get_stop_words()
+    for position, word_data in enumerate(words):
+        word = clean_word(word_data["word"])
+        if not word or word in stop_words or len(word) < 2:
+            continue
+        yield position, word, word_data
+
+
+def counted_words(words: list):
+    """Yield (word, speaker, segment) for each word that counts towards stats."""
+    for _, word, word_data in counted_occurrences(words):
+        yield word, word_data["speaker"], word_data.get("segment", 0)
+
+
 def compute_word_stats(words: list, speakers: dict) -> dict:
     """
     Compute statistics for each word.
@@ -108,21 +289,13 @@ def compute_word_stats(words: list, speakers: dict) -> dict:
     - speakers: Dict of speaker -> count
     - Plus counts for each metadata field (role, region, etc.)
     """
-    stop_words = get_stop_words()
     word_stats = defaultdict(lambda: {
         "total_count": 0,
         "speakers": defaultdict(int),
         "metadata": defaultdict(lambda: defaultdict(int))
     })
 
-    for word_data in words:
-        word = clean_word(word_data["word"])
-
-        # Skip stop words and empty/short words
-        if not word or word in stop_words or len(word) < 2:
-            continue
-
-        speaker = word_data["speaker"]
+    for word, speaker, _ in counted_words(words):
         stats = word_stats[word]
 
         stats["total_count"] += 1
@@ -148,16 +321,51 @@ def compute_word_stats(words: list, speakers: dict) -> dict:
     return result
 
 
-def filter_word_stats(word_stats: dict, speakers: dict, filters: dict) -> dict:
+def update_word_stats(word_stats: dict, words: list, speakers: dict) -> dict:
     """
-    Filter word stats based on selected filters.
+    Count more words on top of compute_word_stats output.
 
-    filters: dict of {metadata_field: [selected_values]}
+    word_stats is not modified: returns new entries for just the words that
+    occur in words (existing entries are copied before counting), so
+    {**word_stats, **changed} equals compute_word_stats over all the words.
+    """
+    changed = {}
+    for word, speaker, _ in counted_words(words):
+        stats = changed.get(word)
+        if stats is None:
+            previous = word_stats.get(word)
+            stats = changed[word] = {
+                "total_count": previous["total_count"] if previous else 0,
+                "speaker_count": 0,
+                "speakers": dict(previous["speakers"]) if previous else {},
+                "metadata": {k: dict(v) for k, v in previous["metadata"].items()} if previous else {},
+            }
+
+        stats["total_count"] += 1
+        stats["speakers"][speaker] = stats["speakers"].get(speaker, 0) + 1
+
+        # Add metadata counts if speaker is in our list
+        if speaker in speakers:
+            for key, value in speakers[speaker].items():
+                if key not in ["speaker_id", "name"] and value:
+                    values = stats["metadata"].setdefault(key, {})
+                    values[value] = values.get(value, 0) + 1
+
+    for stats in changed.values():
+        stats["speaker_count"] = len(stats["speakers"])
+    return changed
+
+
+def match_speakers(speakers: dict, filters: dict):
+    """
+    Resolve filters to the set of matching speaker names.
+
+    Returns None when no filter has a selection (everyone matches, including
+    speakers missing from the speaker list).
     """
     if not filters or all(not v for v in filters.values()):
-        return word_stats
+        return None
 
-    # Build set of speakers that match filters
     matching_speakers = set()
     for speaker, meta in speakers.items():
         matches = True
@@ -169,35 +377,58 @@ def filter_word_stats(word_stats: dict, speakers: dict, filters: dict) -> dict:
                     break
         if matches:
             matching_speakers.add(speaker)
+    return frozenset(matching_speakers)
+
+
+@timed_stage("filter")
+def filter_word_stats(word_stats: dict, speakers: dict, filters: dict) -> dict:
+    """
+    Filter word stats based on selected filters.
+
+    filters: dict of {metadata_field: [selected_values]}
+    """
+    matching_speakers = match_speakers(speakers, filters)
+    if matching_speakers is None:
+        return word_stats
 
     # Filter word stats to only include matching speakers
     filtered = {}
     for word, stats in word_stats.items():
-        # Recompute counts for matching speakers only
-        new_speakers = {s: c for s, c in stats["speakers"].items() if s in matching_speakers}
-        if not new_speakers:
-            continue
-
-        new_total = sum(new_speakers.values())
-
-        # Recompute metadata counts
-        new_metadata = defaultdict(lambda: defaultdict(int))
-        for speaker, count in new_speakers.items():
-            if speaker in speakers:
-                for key, value in speakers[speaker].items():
-                    if key not in ["speaker_id", "name"] and value:
-                        new_metadata[key][value] += count
-
-        filtered[word] = {
-            "total_count": new_total,
-            "speaker_count": len(new_speakers),
-            "speakers": new_speakers,
-            "metadata": {k: dict(v) for k, v in new_metadata.items()}
-        }
+        entry = restrict_word_entry(stats, speakers, matching_speakers)
+        if entry is not None:
+            filtered[word] = entry
 
     return filtered
 
 
+def restrict_word_entry(stats: dict, speakers: dict, matching_speakers) -> dict:
+    """
+    One word_stats entry recomputed for the matching speakers only.
+
+    Returns None if none of them said the word.
+    """
+    # Recompute counts for matching speakers only
+    new_speakers = {s: c for s, c in stats["speakers"].items() if s in matching_speakers}
+    if not new_speakers:
+        return None
+
+    # Recompute metadata counts
+    new_metadata = defaultdict(lambda: defaultdict(int))
+    for speaker, count in new_speakers.items():
+        if speaker in speakers:
+            for key, value in speakers[speaker].items():
+                if key not in ["speaker_id", "name"] and value:
+                    new_metadata[key][value] += count
+
+    return {
+        "total_count": sum(new_speakers.values()),
+        "speaker_count": len(new_speakers),
+        "speakers": new_speakers,
+        "metadata": {k: dict(v) for k, v in new_metadata.items()}
+    }
+
+
+@timed_stage("top_n")
 def get_word_frequencies(word_stats: dict, top_n: int = 100) -> dict:
     """Get word frequencies suitable for word cloud generation."""
     sorted_words = sorted(
@@ -209,6 +440,192 @@ def get_word_frequencies(word_stats: dict, top_n: int = 100) -> dict:
     return {word: stats["total_count"] for word, stats in sorted_words}
 
 
+def combine_word_details(parts: dict) -> dict:
+    """
+    Sum the details of several surface forms into one grouped entry.
+
+    parts maps each form to its details; the result adds a "forms"
+    breakdown of the forms that occur, most frequent first.
+    """
+    speakers = defaultdict(int)
+    metadata = defaultdict(lambda: defaultdict(int))
+    forms = {}
+
+    for form, details in parts.items():
+        if not details["total_count"]:
+            continue
+        forms[form] = details["total_count"]
+        for speaker, count in details["speakers"].items():
+            speakers[speaker] += count
+        for key, values in details["metadata"].items():
+            for value, count in values.items():
+                metadata[key][value] += count
+
+    return {
+        "total_count": sum(forms.values()),
+        "speaker_count": len(speakers),
+        "speakers": dict(speakers),
+        "metadata": {k: dict(v) for k, v in metadata.items()},
+        "forms": dict(sorted(forms.items(), key=lambda x: x[1], reverse=True)),
+    }
+
+
+def empty_word_details() -> dict:
+    """Details for a word nobody (matching the filters) said."""
+    return {
+        "total_count": 0,
+        "speaker_count": 0,
+        "speakers": {},
+        "metadata": {}
+    }
+
+
+def merge_session_details(parts: list, filtered: bool) -> dict:
+    """
+    Combine per-session word details into "All Sessions" details.
+
+    parts is a list of (session_name, details) in session order. Speakers are
+    prefixed with the session name; when filtered, a "session" breakdown is
+    included, as filter_word_stats does for merged speakers.
+    """
+    speakers = {}
+    metadata = defaultdict(lambda: defaultdict(int))
+    total = 0
+
+    for session_name, details in parts:
+        total += details["total_count"]
+        for speaker, count in details["speakers"].items():
+            speakers[f"{session_name}:{speaker}"] = count
+        for meta_key, meta_values in details["metadata"].items():
+            for value, count in meta_values.items():
+                metadata[meta_key][value] += count
+        if filtered and details["total_count"]:
+            metadata["session"][session_name] += details["total_count"]
+
+    if not total:
+        return empty_word_details()
+
+    return {
+        "total_count": total,
+        "speaker_count": len(speakers),
+        "speakers": speakers,
+        "metadata": {k: dict(v) for k, v in metadata.items()}
+    }
+
+
+def pick_group_label(forms: dict) -> str:
+    """
+    Display label for a group: its most frequent form.
+
+    forms maps each form to (count, tiebreak); equal counts prefer the
+    smallest tiebreak (earliest in word order).
+    """
+    return min(forms, key=lambda form: (-forms[form][0], forms[form][1]))
+
+
+class RankedCounts:
+    """
+    One session's word totals under a filter, in descending count order.
+
+    Ties keep the session's word order, matching get_word_frequencies.
+    words/counts are parallel sequences; count() is a point lookup.
+    """
+
+    def __init__(self, words, counts, lookup):
+        self.words = words
+        self.counts = counts
+        self._lookup = lookup
+        self._total = None
+        self._initials = None  # First character -> (words, counts), built on first with_prefix
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def nbytes(self) -> int:
+        """Estimated memory held by the entries, in bytes."""
+        if isinstance(self.words, np.ndarray):
+            return self.words.nbytes + np.asarray(self.counts).nbytes
+        # List entries come with a lookup dict over the same words, about as large again
+        return 2 * (estimate_footprint(self.words) + estimate_footprint(self.counts))
+
+    @property
+    def total(self) -> int:
+        """Sum of all counts (computed once)."""
+        if self._total is None:
+            self._total = int(sum(self.counts))
+        return self._total
+
+    def count(self, word: str) -> int:
+        """Filtered total for word (0 if absent)."""
+        return self._lookup(word)
+
+    def top(self, k: int) -> dict:
+        return {str(w): int(c) for w, c in zip(self.words[:k], self.counts[:k])}
+
+    def with_prefix(self, prefix: str) -> "RankedCounts":
+        """The entries whose word starts with prefix, in the same order."""
+        if isinstance(self.words, np.ndarray):  # Memory-mapped sessions
+            keep = np.flatnonzero(np.char.startswith(self.words, prefix))
+            words, counts = self.words[keep], self.counts[keep]
+        else:
+            if self._initials is None:
+                initials = defaultdict(lambda: ([], []))
+                for w, c in zip(self.words, self.counts):
+                    bucket = initials[w[:1]]
+                    bucket[0].append(w)
+                    bucket[1].append(c)
+                self._initials = dict(initials)
+            bucket_words, bucket_counts = self._initials.get(prefix[:1], ([], []))
+            keep = [i for i, w in enumerate(bucket_words) if w.startswith(prefix)]
+            words, counts = [bucket_words[i] for i in keep], [bucket_counts[i] for i in keep]
+        return RankedCounts(words, counts, lambda w: self.count(w) if w.startswith(prefix) else 0)
+
+
+@timed_stage("top_n")
+def top_k_merge(ranked_lists: list, k: int, tiebreak) -> dict:
+    """
+    Exact top-k of per-word sums across several RankedCounts lists.
+
+    Uses the Threshold Algorithm: lists are read in descending order in
+    lock-step, each newly seen word is totalled by point lookups in every
+    list, and a size-k heap keeps the best so far. Reading stops once the
+    k-th best total beats the sum of the next unread counts, which bounds
+    any unseen word. Equal totals are ordered by tiebreak(word) ascending.
+
+    Returns {word: total} ordered best first.
+    """
+    if k <= 0:
+        return {}
+
+    heap = []  # (total, negated tiebreak, word); heap[0] is the worst kept
+    seen = set()
+    depth = 0
+    longest = max((len(r) for r in ranked_lists), default=0)
+
+    while depth < longest:
+        for ranked in ranked_lists:
+            if depth >= len(ranked):
+                continue
+            word = str(ranked.words[depth])
+            if word in seen:
+                continue
+            seen.add(word)
+            total = sum(r.count(word) for r in ranked_lists)
+            entry = (total, tuple(-x for x in tiebreak(word)), word)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+        depth += 1
+        threshold = sum(int(r.counts[depth]) for r in ranked_lists if depth < len(r))
+        if len(heap) == k and heap[0][0] > threshold:
+            break
+
+    ordered = sorted(heap, reverse=True)
+    return {word: int(total) for total, _, word in ordered}
+
+
 class SessionData:
     """Container for a single session's processed data."""
 
@@ -221,6 +638,47 @@ class SessionData:
         self.speakers, self.columns = load_speakerlist(csv_path)
         self.words = load_transcript(json_path)
         self.word_stats = compute_word_stats(self.words, self.speakers)
+        counted = list(counted_words(self.words))
+        word_ids = {w: i for i, w in enumerate(self.word_stats)}
+        self.cooccurrence = build_cooccurrence_index(counted, word_ids)
+        self.utterances = build_utterance_index(counted, word_ids)
+        self.participation = ParticipationStats.from_words(self.words)
+        self._init_query_caches()
+
+    def _init_query_caches(self):
+        self._ranked_cache = {}  # (matching speaker set or None, grouping) -> RankedCounts
+        self._groups = {}  # Grouping mode -> group index (see group_index)
+        self._ranked_lock = threading.Lock()
+        self._word_ranks = None  # word -> position in word_stats order, built lazily
+        self._words_by_rank = None  # Inverse of _word_ranks, built lazily
+        self._data_bytes = None  # data_footprint(), measured on first memory_footprint()
+        self._cache_bytes = 0  # Estimated memory of the caches and indexes above, kept as they change
+
+    def _add_cache_bytes(self, nbytes: int):
+        with self._ranked_lock:
+            self._cache_bytes += nbytes
+
+    def vocabulary_size(self) -> int:
+        """Number of distinct (non-stop) words in the session."""
+        return len(self.word_stats)
+
+    def vocabulary(self) -> list:
+        """Distinct (non-stop) words in the session."""
+        return list(self.word_stats)
+
+    def memory_footprint(self) -> int:
+        """
+        Estimated memory held by this session, in bytes: its data plus the
+        query caches and indexes built so far (so it grows as they fill).
+        """
+        if self._data_bytes is None:
+            self._data_bytes = self.data_footprint()
+        return self._data_bytes + self._cache_bytes
+
+    def data_footprint(self) -> int:
+        """Estimated memory held by this session's data, without its query caches, in bytes."""
+        estimated = sum(estimate_footprint(obj) for obj in [self.speakers, self.words, self.word_stats])
+        return estimated + self.cooccurrence.nbytes() + self.utterances.nbytes()
 
     def get_filter_options(self) -> dict:
         """Get unique values for each filterable column."""
@@ -238,24 +696,228 @@ class SessionData:
                 options[col_lower] = sorted(values)
         return options
 
-    def get_filtered_frequencies(self, filters: dict = None, top_n: int = 100) -> dict:
-        """Get word frequencies with optional filtering."""
-        if filters:
-            filtered_stats = filter_word_stats(self.word_stats, self.speakers, filters)
-        else:
-            filtered_stats = self.word_stats
-        return get_word_frequencies(filtered_stats, top_n)
+    def resolve_speakers(self, filters: dict = None):
+        """Matching speaker names for filters, or None if unfiltered."""
+        speakers = {name: {**meta, "session": self.session_name} for name, meta in self.speakers.items()}
+        return match_speakers(speakers, filters)
+
+    def word_rank(self, word: str):
+        """Position of word in the session's word order (None if absent)."""
+        if self._word_ranks is None:
+            self._word_ranks = {w: i for i, w in enumerate(self.word_stats)}
+            self._add_cache_bytes(estimate_footprint(self._word_ranks))
+        return self._word_ranks.get(word)
+
+    def word_at(self, rank: int) -> str:
+        """Word at a position in the session's word order."""
+        if self._words_by_rank is None:
+            self._words_by_rank = list(self.word_stats)
+            self._add_cache_bytes(estimate_footprint(self._words_by_rank))
+        return self._words_by_rank[rank]
+
+    def group_index(self, grouping: str) -> dict:
+        """
+        How this session's words group under a grouping mode (built once per mode).
+
+        Returns {"key_of": {word: group key}, "members": {group key: [words
+        in word order]}, "rank": {group key: position of its first word}}.
+        """
+        groups = self._groups.get(grouping)
+        if groups is None:
+            key_of = get_form_mapper(grouping).keys(self.vocabulary())
+            ranks = {word: self.word_rank(word) for word in key_of}
+            members = defaultdict(list)
+            for word in sorted(key_of, key=ranks.get):
+                members[key_of[word]].append(word)
+            groups = {
+                "key_of": key_of,
+                "members": dict(members),
+                "rank": {key: ranks[words[0]] for key, words in members.items()},
+            }
+            nbytes = sum(estimate_footprint(part) for part in groups.values())
+            with self._ranked_lock:
+                self._groups = {**self._groups, grouping: groups}
+                self._cache_bytes += nbytes
+        return groups
+
+    def group_rank(self, key: str, grouping: str):
+        """Position of a group's first word in the session's word order (None if absent)."""
+        return self.group_index(grouping)["rank"].get(key)
+
+    def group_members(self, word: str, grouping: str) -> list:
+        """The session's words sharing word's group, in word order."""
+        groups = self.group_index(grouping)
+        word = word.lower()
+        key = groups["key_of"].get(word)
+        if key is None:
+            # Not in this session: only vocabulary words are kept in the mapping
+            key = get_form_mapper(grouping).key(word, persist=False)
+        return groups["members"].get(key, [])
+
+    def get_group_forms(self, keys: list, filters: dict, grouping: str, weighting: str = None) -> dict:
+        """{group key: {form: (filtered count, word rank)}} for keys present in the session."""
+        members = self.group_index(grouping)["members"]
+        ranked = self.get_ranked_counts(filters, weighting=weighting)
+        return {
+            key: {form: (ranked.count(form), self.word_rank(form)) for form in members[key]}
+            for key in keys if key in members
+        }
 
-    def get_word_details(self, word: str, filters: dict = None) -> dict:
-        """Get detailed stats for a specific word."""
-        if filters:
-            stats = filter_word_stats(self.word_stats, self.speakers, filters)
+    def get_ranked_counts(self, filters: dict = None, grouping: str = None, weighting: str = None) -> RankedCounts:
+        """
+        Word totals under filters, ranked by count.
+
+        With a grouping mode, entries are group keys (see word_forms) whose
+        totals sum their forms. With weighting "utterances", totals count the
+        utterances containing the word rather than its mentions (see
+        utterances.py). Cached per matching speaker set and modes, so
+        repeated filter combinations cost nothing after the first query.
+        """
+        weighting = "utterances" if weighting == "utterances" else None
+        key = (self.resolve_speakers(filters), grouping, weighting)
+        ranked = self._ranked_cache.get(key)
+        if ranked is None:
+            if grouping:
+                ranked = self._compute_grouped_counts(self.get_ranked_counts(filters, weighting=weighting), grouping)
+            elif weighting:
+                ranked = self._compute_utterance_counts(key[0])
+            else:
+                ranked = self._compute_ranked_counts(key[0])
+            nbytes = ranked.nbytes()
+            with self._ranked_lock:
+                # Replacing an entry another thread computed meanwhile, or the oldest one
+                replaced = self._ranked_cache.pop(key, None)
+                if replaced is None and len(self._ranked_cache) >= RANKED_CACHE_SIZE:
+                    replaced = self._ranked_cache.pop(next(iter(self._ranked_cache)))
+                if replaced is not None:
+                    self._cache_bytes -= replaced.nbytes()
+                self._ranked_cache[key] = ranked
+                self._cache_bytes += nbytes
+        return ranked
+
+    @timed_stage("filter")
+    def _compute_ranked_counts(self, matching) -> RankedCounts:
+        if matching is None:
+            totals = [(word, stats["total_count"]) for word, stats in self.word_stats.items()]
         else:
-            stats = self.word_stats
-
-        return stats.get(word.lower(), {
-            "total_count": 0,
-            "speaker_count": 0,
-            "speakers": {},
-            "metadata": {}
-        })
+            totals = []
+            for word, stats in self.word_stats.items():
+                total = sum(c for s, c in stats["speakers"].items() if s in matching)
+                if total:
+                    totals.append((word, total))
+
+        totals.sort(key=lambda x: x[1], reverse=True)
+        lookup = dict(totals)
+        return RankedCounts(
+            [w for w, _ in totals], [c for _, c in totals], lambda word: lookup.get(word, 0)
+        )
+
+    @timed_stage("filter")
+    def _compute_utterance_counts(self, matching) -> RankedCounts:
+        """Utterances containing each word under a speaker filter, ranked; ties keep word order."""
+        totals = self.utterances.totals(matching)
+        nonzero = np.flatnonzero(totals)
+        order = nonzero[np.argsort(-totals[nonzero], kind="stable")]
+
+        def lookup(word):
+            rank = self.word_rank(word)
+            return 0 if rank is None else int(totals[rank])
+
+        return RankedCounts([self.word_at(int(i)) for i in order], totals[order], lookup)
+
+    def _compute_grouped_counts(self, base: RankedCounts, grouping: str) -> RankedCounts:
+        """Re-aggregate ungrouped totals by group key; ties keep group order."""
+        groups = self.group_index(grouping)
+        key_of = groups["key_of"]
+        totals = defaultdict(int)
+        for word, count in zip(base.words, base.counts):
+            totals[key_of[str(word)]] += int(count)
+
+        order = sorted(totals, key=lambda k: (-totals[k], groups["rank"][k]))
+        totals = dict(totals)
+        return RankedCounts(order, [totals[k] for k in order], lambda key: totals.get(key, 0))
+
+    def get_filtered_frequencies(self, filters: dict = None, top_n: int = 100, grouping: str = None,
+                                 weighting: str = None) -> dict:
+        """
+        Get word frequencies with optional filtering.
+
+        With a grouping mode, each group is labelled by its most frequent form.
+        weighting "utterances" counts utterances instead of mentions.
+        """
+        top = self.get_ranked_counts(filters, grouping, weighting).top(top_n)
+        if not grouping:
+            return top
+        forms = self.get_group_forms(list(top), filters, grouping, weighting)
+        return {pick_group_label(forms[key]): count for key, count in top.items()}
+
+    def get_utterance_total(self, filters: dict = None) -> int:
+        """Utterances with at least one counted word by the speakers matching filters."""
+        return self.utterances.total_utterances(self.resolve_speakers(filters))
+
+    def count_error(self, filters: dict = None):
+        """How far counts may be below the exact ones; None as they are exact (see approximate.py)."""
+        return None
+
+    def get_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
+        """
+        Get detailed stats for a specific word.
+
+        With a grouping mode, stats cover every form in the word's group and
+        include a "forms" breakdown.
+        """
+        if grouping:
+            members = self.group_members(word, grouping)
+            return combine_word_details({m: self.get_word_details(m, filters) for m in members})
+
+        # A point lookup: only this word's entry is filtered, so the cost
+        # does not grow with the vocabulary
+        stats = self.word_stats.get(word.lower())
+        if stats is None:
+            return empty_word_details()
+
+        matching = self.resolve_speakers(filters)
+        if matching is None:
+            return stats
+        return restrict_word_entry(stats, self.speakers, matching) or empty_word_details()
+
+    def get_participation_rows(self, filters: dict = None) -> tuple:
+        """(per-speaker participation rows under filters, unfiltered session talk time)."""
+        rows = self.participation.rows(self.resolve_speakers(filters))
+        return rows, self.participation.total_talk_time()
+
+    def get_participation(self, filters: dict = None) -> dict:
+        """Talk time, words, wpm, turns and share per speaker and metadata group."""
+        rows, session_talk_time = self.get_participation_rows(filters)
+        return summarize_participation(rows, self.speakers, session_talk_time)
+
+    def get_association_counts(self, word: str, filters: dict = None) -> dict:
+        """
+        Raw "said together with" counts for word under filters.
+
+        Returns {"pairs": {other: co-occurrences}, "word_count",
+        "total_tokens", "total_pairs"}; see cooccurrence.rank_associations.
+        """
+        word = word.lower()
+        matching = self.resolve_speakers(filters)
+        ranked = self.get_ranked_counts(filters)
+        ids, counts = self.cooccurrence.row_counts(self.word_rank(word), matching)
+        return {
+            "pairs": {self.word_at(int(i)): int(c) for i, c in zip(ids, counts)},
+            "word_count": ranked.count(word),
+            "total_tokens": ranked.total,
+            "total_pairs": self.cooccurrence.total_pairs(matching),
+        }
+
+    def get_associations(self, word: str, filters: dict = None, top_n: int = 10) -> list:
+        """Words most often said together with word, scored by PMI."""
+        counts = self.get_association_counts(word, filters)
+        ranked = self.get_ranked_counts(filters)
+        other_counts = {
+            other: ranked.count(other)
+            for other, together in counts["pairs"].items() if together >= COOCCURRENCE_MIN_COUNT
+        }
+        return rank_associations(
+            counts["pairs"], counts["word_count"], other_counts,
+            counts["total_tokens"], counts["total_pairs"], top_n
+        )
@@ -0,0 +1,242 @@
+"""
+Columnar export of the cleaned transcript data for notebooks.
+
+Two tables are written per export, as Parquet or Arrow IPC files:
+- occurrences: one row per counted word (token, speaker, speaker metadata,
+  segment, timestamps and alignment score)
+- counts: one row per (session, word, speaker) with its count
+
+Tokens come from the same cleaning and stop-word pass as the dashboard
+(data_processor.counted_occurrences), so summing the counts rows of the
+speakers matching a filter gives exactly the dashboard's word totals.
+Sessions are read one at a time from their source files and written in
+record batches of EXPORT_CHUNK_ROWS, so memory stays bounded by the
+largest session rather than the whole collection.
+
+Needs pyarrow. Run directly to export from the command line:
+    python export.py --out exports/ [--format arrow] [--session NAME ...]
+"""
+import argparse
+import os
+import shutil
+import threading
+from collections import defaultdict
+
+from config import DATA_DIR, EXPORT_DIR, EXPORT_CHUNK_ROWS
+from data_processor import load_speakerlist, load_transcript, counted_occurrences
+from session_loader import discover_sessions
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: only needed for exports
+    pa = pq = None
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+EXPORT_TABLES = ["occurrences", "counts"]
+
+_export_lock = threading.Lock()  # One export build at a time per process
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Export needs pyarrow (pip install pyarrow)")
+
+
+def metadata_columns(speaker_lists: list) -> list:
+    """Union of speaker metadata fields across speaker lists, in first-seen order."""
+    columns = {}
+    for speakers in speaker_lists:
+        for meta in speakers.values():
+            for key in meta:
+                if key != "name":
+                    columns.setdefault(key, None)
+    return list(columns)
+
+
+def table_schemas(columns: list) -> dict:
+    """Arrow schemas of the exported tables for the given metadata columns."""
+    metadata = [pa.field(col, pa.string()) for col in columns]
+    return {
+        "occurrences": pa.schema([
+            pa.field("session", pa.string()),
+            pa.field("position", pa.int64()),  # Index of the word in the session transcript
+            pa.field("segment", pa.int32()),
+            pa.field("token", pa.string()),
+            pa.field("word", pa.string()),  # As transcribed, before cleaning
+            pa.field("speaker", pa.string()),
+            *metadata,
+            pa.field("start", pa.float64()),
+            pa.field("end", pa.float64()),
+            pa.field("score", pa.float64()),
+        ]),
+        "counts": pa.schema([
+            pa.field("session", pa.string()),
+            pa.field("word", pa.string()),
+            pa.field("speaker", pa.string()),
+            *metadata,
+            pa.field("count", pa.int64()),
+        ]),
+    }
+
+
+class BatchWriter:
+    """Writes column lists to a Parquet or Arrow IPC file in record batches."""
+
+    def __init__(self, path: str, schema, fmt: str, chunk_rows: int):
+        self.schema = schema
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, schema)
+        else:
+            self._writer = pa.ipc.new_file(path, schema)
+
+    def write(self, columns: dict, length: int):
+        """Write columns (name -> list of length values) in batches of chunk_rows."""
+        for start in range(0, length, self.chunk_rows):
+            end = min(start + self.chunk_rows, length)
+            batch = pa.record_batch([columns[name][start:end] for name in self.schema.names], schema=self.schema)
+            self._writer.write_batch(batch)
+        self.rows += length
+
+    def close(self):
+        self._writer.close()
+
+
+def timestamp(value):
+    return float(value) if value is not None else None
+
+
+def speaker_columns(speaker_list: list, speakers: dict, columns: list) -> dict:
+    """Metadata columns for a list of speaker names (None where unknown or empty)."""
+    values = {
+        name: [meta.get(col) or None for col in columns]
+        for name, meta in speakers.items()
+    }
+    missing = [None] * len(columns)
+    rows = [values.get(name, missing) for name in speaker_list]
+    return {col: [row[i] for row in rows] for i, col in enumerate(columns)}
+
+
+def export_sessions(session_info: list, out_dir: str, fmt: str = "parquet", chunk_rows: int = None) -> dict:
+    """
+    Export the given sessions (discover_sessions entries) to out_dir.
+
+    Writes occurrences.<ext> and counts.<ext>, replacing them atomically.
+    Returns {table: (path, rows)}.
+    """
+    require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+
+    # Speaker lists are small; reading them first fixes the schema before any rows are written
+    speaker_lists = [load_speakerlist(info["csv_path"])[0] for info in session_info]
+    columns = metadata_columns(speaker_lists)
+    schemas = table_schemas(columns)
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {table: os.path.join(out_dir, table + EXPORT_FORMATS[fmt]) for table in EXPORT_TABLES}
+    tmp_paths = {table: f"{path}.tmp{os.getpid()}" for table, path in paths.items()}
+    writers = {table: BatchWriter(tmp_paths[table], schemas[table], fmt, chunk_rows) for table in EXPORT_TABLES}
+
+    try:
+        for info, speakers in zip(session_info, speaker_lists):
+            # Columns are built a session at a time, then written out in batches
+            occurrences = defaultdict(list)
+            for position, token, word_data in counted_occurrences(load_transcript(info["json_path"])):
+                occurrences["position"].append(position)
+                occurrences["segment"].append(word_data.get("segment", 0))
+                occurrences["token"].append(token)
+                occurrences["word"].append(word_data["word"])
+                occurrences["speaker"].append(word_data["speaker"])
+                occurrences["start"].append(timestamp(word_data["start"]))
+                occurrences["end"].append(timestamp(word_data["end"]))
+                occurrences["score"].append(timestamp(word_data["score"]))
+            length = len(occurrences["token"])
+            occurrences["session"] = [info["name"]] * length
+            occurrences.update(speaker_columns(occurrences["speaker"], speakers, columns))
+            writers["occurrences"].write(occurrences, length)
+
+            counts = defaultdict(int)  # (word, speaker) -> count, in first-seen order
+            for key in zip(occurrences["token"], occurrences["speaker"]):
+                counts[key] += 1
+            del occurrences
+            words, speaker_list = zip(*counts) if counts else ((), ())
+            count_columns = {
+                "session": [info["name"]] * len(counts),
+                "word": list(words),
+                "speaker": list(speaker_list),
+                "count": list(counts.values()),
+                **speaker_columns(speaker_list, speakers, columns),
+            }
+            writers["counts"].write(count_columns, len(counts))
+
+        for writer in writers.values():
+            writer.close()
+        for table in EXPORT_TABLES:
+            os.replace(tmp_paths[table], paths[table])
+    finally:
+        for path in tmp_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {table: (paths[table], writers[table].rows) for table in EXPORT_TABLES}
+
+
+def cached_export(session_manager, session_value: str, fmt: str) -> dict:
+    """
+    Paths of the export tables for a session (or "all"), building them if needed.
+
+    Exports are kept under EXPORT_DIR by data version, so they are only
+    rebuilt after the session files change (or a live session counts new
+    words). Building one removes the exports of every other version.
+    """
+    require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    session_info = session_manager.get_session_info(None if session_value == "all" else session_value)
+
+    version = session_manager.data_version
+    out_dir = os.path.join(EXPORT_DIR, version, session_value)
+    paths = {table: os.path.join(out_dir, table + EXPORT_FORMATS[fmt]) for table in EXPORT_TABLES}
+    if not all(os.path.exists(path) for path in paths.values()):
+        with _export_lock:
+            if not all(os.path.exists(path) for path in paths.values()):
+                export_sessions(session_info, out_dir, fmt)
+                remove_other_versions(version)
+    return paths
+
+
+def remove_other_versions(version: str):
+    """Delete the cached exports of every data version but this one."""
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        if name != version and os.path.isdir(path):
+            # Files already being sent stay readable until closed (on POSIX)
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export cleaned transcript data as Parquet or Arrow files.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Session data directory")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--session", action="append", help="Session to export (repeatable; default all)")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS, help="Rows per record batch")
+    args = parser.parse_args()
+
+    session_info = discover_sessions(args.data_dir)
+    if args.session:
+        missing = set(args.session) - {info["name"] for info in session_info}
+        if missing:
+            parser.error(f"Session not found: {', '.join(sorted(missing))}")
+        session_info = [info for info in session_info if info["name"] in args.session]
+
+    for table, (path, rows) in export_sessions(session_info, args.out, args.format, args.chunk_rows).items():
+        print(f"{table}: {rows} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
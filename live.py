@@ -0,0 +1,205 @@
+"""
+Live sessions: counts that grow while a session is being transcribed.
+
+A session listed in LIVE_SESSIONS whose transcript is an uncompressed
+.jsonl file is loaded as a LiveSession. Each poll() reads only the lines
+appended since the previous one (a trailing line without its newline waits
+for the next poll), and counts just those words on top of the existing
+word_stats, participation totals and segment numbering, so nothing is
+recomputed from the start of the transcript.
+
+Every poll that finds new words publishes a new LiveSnapshot: an ordinary
+SessionData over the counts so far, which never changes afterwards. Queries
+are answered by the latest snapshot, so requests running during an update
+see consistent counts, and each snapshot keeps its own ranked-count caches.
+The co-occurrence index is the exception to incremental updates: it is
+built for a snapshot the first time someone asks for a word's associations.
+Utterance counts are built per snapshot on first use too, but from word,
+speaker and segment ids kept as the words are counted, so that is a single
+vectorized pass.
+
+live_stream.py polls the live sessions and pushes updated clouds to open
+dashboards.
+"""
+import array
+import itertools
+import logging
+import os
+import threading
+
+import numpy as np
+
+from cooccurrence import build_cooccurrence_index
+from data_processor import (
+    SessionData, JsonlWordReader, counted_words, estimate_footprint, load_speakerlist, update_word_stats,
+)
+from participation import ParticipationStats, ParticipationTally
+from utterances import utterance_index_from_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptReplaced(Exception):
+    """The transcript got shorter than what was already read, so it is not append-only."""
+
+
+class TranscriptTail:
+    """The complete lines appended to a file since the last read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0  # Bytes read so far
+        self._partial = b""  # Start of a line whose newline has not been written yet
+
+    def read_lines(self) -> list:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            raise TranscriptReplaced(self.path)
+        if size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        return [line.decode("utf-8") for line in lines]
+
+
+class LiveSnapshot(SessionData):
+    """A live session's data as of one poll; never changes once published."""
+
+    def __init__(self, live: "LiveSession", word_stats: dict, participation: ParticipationStats):
+        self.session_name = live.session_name
+        self.json_path = live.json_path
+        self.csv_path = live.csv_path
+        self.speakers = live.speakers
+        self.columns = live.columns
+        self.words = live.words  # Append-only; this snapshot covers the first word_count
+        self.word_count = len(live.words)
+        self.word_stats = word_stats
+        self.participation = participation
+        self._cooccurrence = None
+        # Append-only like words; this snapshot covers the first _token_count
+        self._tokens = (live.tokens, live.token_speakers, live.token_segments)
+        self._token_count = len(live.tokens)
+        self._utterance_speakers = list(live.speaker_ids)
+        self._utterances = None
+        self._init_query_caches()
+
+    @property
+    def cooccurrence(self):
+        """Co-occurrence index over this snapshot's words, built on first use."""
+        if self._cooccurrence is None:
+            words = itertools.islice(self.words, self.word_count)
+            self._publish_index("_cooccurrence", build_cooccurrence_index(
+                counted_words(words), {w: i for i, w in enumerate(self.word_stats)}
+            ))
+        return self._cooccurrence
+
+    @property
+    def utterances(self):
+        """Utterance index over this snapshot's counted words, built on first use."""
+        if self._utterances is None:
+            tokens, speakers, segments = (np.frombuffer(ids[:self._token_count], dtype=np.int64)
+                                          for ids in self._tokens)
+            self._publish_index("_utterances", utterance_index_from_tokens(
+                tokens, speakers, segments, self._utterance_speakers, len(self.word_stats)
+            ))
+        return self._utterances
+
+    def _publish_index(self, attribute: str, index):
+        """Keep a lazily built index (the first one, if threads raced) and count its memory."""
+        with self._ranked_lock:
+            if getattr(self, attribute) is None:
+                setattr(self, attribute, index)
+                self._cache_bytes += index.nbytes()
+
+    def data_footprint(self) -> int:
+        """Estimated memory held by this snapshot's data, in bytes (lazy indexes count as caches)."""
+        return sum(estimate_footprint(obj) for obj in [self.speakers, self.words, self.word_stats])
+
+
+class LiveSession:
+    """
+    A session whose JSONL transcript is still being written.
+
+    Behaves as its latest LiveSnapshot (attributes and queries are passed
+    through); version counts the snapshots published so far.
+    """
+
+    def __init__(self, session_name: str, json_path: str, csv_path: str):
+        self.current = None
+        self.session_name = session_name
+        self.json_path = json_path
+        self.csv_path = csv_path
+        self.speakers, self.columns = load_speakerlist(csv_path)
+        self.version = 0
+        self._lock = threading.Lock()  # One poll at a time
+        self._reset()
+        self.poll()
+
+    def _reset(self):
+        self.words = []
+        # Word id (word_stats position), speaker id and segment of each counted word
+        self.tokens = array.array("q")
+        self.token_speakers = array.array("q")
+        self.token_segments = array.array("q")
+        self.word_ids = {}
+        self.speaker_ids = {}
+        self._word_stats = {}
+        self._tail = TranscriptTail(self.json_path)
+        self._reader = JsonlWordReader()
+        self._tally = ParticipationTally()
+
+    def __getattr__(self, name):
+        # Only called for attributes not set on the LiveSession itself
+        if name == "current":
+            raise AttributeError(name)
+        return getattr(self.current, name)
+
+    def _read(self) -> list:
+        return self._reader.feed(self._tail.read_lines())
+
+    def poll(self) -> int:
+        """Count the words appended since the last poll; returns how many there were."""
+        with self._lock:
+            force_publish = False
+            try:
+                words = self._read()
+            except (TranscriptReplaced, ValueError):
+                # Shorter than before, or caught mid-rewrite: count it again from the start
+                logger.warning("Live transcript %s was rewritten; counting it again from the start", self.json_path)
+                self._reset()
+                try:
+                    words = self._read()
+                except (TranscriptReplaced, ValueError):
+                    logger.exception("Could not read live transcript %s; retrying on the next poll", self.json_path)
+                    self._reset()
+                    if self.current is not None:
+                        return 0  # Keep showing the last counts read
+                    words = []
+                # Publish the recount even if empty; until then the last snapshot keeps answering
+                force_publish = True
+
+            if not words and self.current is not None and not force_publish:
+                return 0
+
+            changed = update_word_stats(self._word_stats, words, self.speakers)
+            self.words.extend(words)
+            self._tally.add(words)
+            for word, speaker, segment in counted_words(words):
+                # New words get the next id, as they are appended to word_stats in this order
+                self.tokens.append(self.word_ids.setdefault(word, len(self.word_ids)))
+                self.token_speakers.append(self.speaker_ids.setdefault(speaker, len(self.speaker_ids)))
+                self.token_segments.append(segment)
+            # Copy-on-write: published snapshots keep the dict they were given
+            self._word_stats = {**self._word_stats, **changed}
+            self.current = LiveSnapshot(self, self._word_stats, self._tally.stats())
+            self.version += 1
+            return len(words)
@@ -0,0 +1,173 @@
+"""
+Server-sent events for live sessions (see live.py).
+
+LiveFeed polls every live session every LIVE_POLL_SECONDS in a daemon
+thread. When a poll counts new words, the event streams waiting on the feed
+wake up and each sends its dashboard the redrawn cloud and summary panel for
+its session and filters, rendered by the same code as the server callback.
+Dashboards with the same view share one rendering per update.
+
+GET /live/events?session=<name>&role=...&grouping=...&weighting=... streams
+`data: {"cloud": <component>, "summary": [<components>]}` events, starting
+with the current state, for a live session or an "all" view that includes
+one. Each open stream holds a server thread, so at most LIVE_MAX_STREAMS
+are open per process (leaving the other threads to the Dash callbacks).
+Past that the request gets a 503, and the dashboard polls the same URL with
+once=1 instead: a single JSON event with the view version as its ETag.
+
+Threads do not survive a fork, so under gunicorn --preload the feed starts
+in each worker process on its first request, as the warm-up does.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import Blueprint, Response, request
+
+from api import parse_filters
+from config import LIVE_KEEPALIVE_SECONDS, LIVE_MAX_STREAMS, LIVE_POLL_SECONDS, LIVE_RETRY_MS
+from metrics import REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+# Rendered views kept for sharing between streams
+MAX_CACHED_VIEWS = 64
+
+
+class LiveFeed:
+    """Polls live sessions and wakes the event streams waiting for updates."""
+
+    def __init__(self, session_manager, render, max_streams: int = LIVE_MAX_STREAMS, registry: Registry = REGISTRY):
+        # render(session_value, filters, grouping_mode, weighting_mode) -> JSON text of one event
+        self.session_manager = session_manager
+        self.render = render
+        self.updates = 0  # Polls that counted new words, in this process
+        self.max_streams = max_streams
+        self.open_streams = 0
+        registry.gauge("wordcloud_live_streams", "Live event streams open in this process.",
+                       lambda: self.open_streams)
+        self.rejected_streams = registry.counter(
+            "wordcloud_live_streams_rejected_total",
+            "Live event streams refused because LIVE_MAX_STREAMS were open (the dashboard polls instead).",
+        )
+        self._changed = threading.Condition()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._views = {}  # (session, filters, grouping, weighting) -> (view version, event text), copy-on-write
+
+    def start(self):
+        """Start the polling thread if there are live sessions and it has not run in this process yet."""
+        if self._pid == os.getpid() or not self.session_manager.get_live_sessions():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="live-feed", daemon=True).start()
+
+    def _run(self):
+        while True:
+            counted = 0
+            for name in self.session_manager.get_live_sessions():
+                try:
+                    counted += self.session_manager.get_session(name).poll()
+                except Exception:
+                    logger.exception("Could not update live session %s", name)
+            if counted:
+                with self._changed:
+                    self.updates += 1
+                    self._changed.notify_all()
+            time.sleep(LIVE_POLL_SECONDS)
+
+    def wait(self, seen: int, timeout: float) -> int:
+        """Block until updates differs from seen (or timeout); returns updates."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.updates != seen, timeout)
+            return self.updates
+
+    def open_stream(self) -> bool:
+        """Take a stream slot; False if all LIVE_MAX_STREAMS are in use."""
+        with self._lock:
+            if self.open_streams >= self.max_streams:
+                self.rejected_streams.inc()
+                return False
+            self.open_streams += 1
+            return True
+
+    def close_stream(self):
+        """Give back a slot taken by open_stream."""
+        with self._lock:
+            self.open_streams -= 1
+
+    def view_version(self, session_value: str) -> int:
+        """Changes whenever a live session in the view counted new words."""
+        return sum(
+            self.session_manager.live_version(name)
+            for name in self.session_manager.get_live_sessions(session_value)
+        )
+
+    def event(self, session_value: str, filters: dict, grouping_mode: str, weighting_mode: str) -> tuple:
+        """(view version, event text) for a view, rendered once per version."""
+        key = (session_value, json.dumps(filters, sort_keys=True), grouping_mode, weighting_mode)
+        version = self.view_version(session_value)
+        cached = self._views.get(key)
+        if cached is not None and cached[0] == version:
+            return cached
+        entry = (version, self.render(session_value, filters, grouping_mode, weighting_mode))
+        with self._lock:
+            views = {} if len(self._views) >= MAX_CACHED_VIEWS else self._views
+            self._views = {**views, key: entry}
+        return entry
+
+    def stream(self, session_value: str, filters: dict, grouping_mode: str, weighting_mode: str):
+        """Server-sent events for one dashboard: the current view, then every change."""
+        yield f"retry: {LIVE_RETRY_MS}\n\n"
+        sent = None
+        updates = self.updates
+        while True:
+            version, text = self.event(session_value, filters, grouping_mode, weighting_mode)
+            if version != sent:
+                yield f"id: {version}\ndata: {text}\n\n"
+                sent = version
+            seen, updates = updates, self.wait(updates, LIVE_KEEPALIVE_SECONDS)
+            if updates == seen:
+                # Writing to a closed connection ends the stream
+                yield ": keepalive\n\n"
+
+
+def create_live_blueprint(feed: LiveFeed) -> Blueprint:
+    """Create the blueprint serving /live/events from a LiveFeed."""
+    live = Blueprint("live", __name__, url_prefix="/live")
+
+    @live.route("/events")
+    def events():
+        session_value = request.args.get("session", "all") or "all"
+        if not feed.session_manager.get_live_sessions(session_value):
+            return {"error": f"No live session in view: {session_value}"}, 404
+        feed.start()
+        view = (session_value, parse_filters(request.args), request.args.get("grouping") or "off",
+                request.args.get("weighting") or "mentions")
+
+        if request.args.get("once"):
+            # Polling fallback: the current event, unless the client already has it
+            version, text = feed.event(*view)
+            response = Response(text, mimetype="application/json", headers={"Cache-Control": "no-cache"})
+            response.set_etag(str(version))
+            return response.make_conditional(request)
+
+        if not feed.open_stream():
+            return Response(
+                json.dumps({"error": "Too many live streams open; poll with once=1"}), status=503,
+                mimetype="application/json", headers={"Retry-After": str(LIVE_RETRY_MS // 1000)},
+            )
+        response = Response(feed.stream(*view), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Stop reverse proxies from buffering events
+        })
+        # Runs when the server closes the response, including after the client disconnects
+        response.call_on_close(feed.close_stream)
+        return response
+
+    return live
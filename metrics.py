@@ -0,0 +1,277 @@
+"""
+Minimal Prometheus-style metrics with no external dependencies.
+
+Provides counters, histograms and callback gauges, a registry that renders
+the Prometheus text exposition format, and helpers for timing Dash callbacks
+and data-layer stages. Metrics are per process: under gunicorn each worker
+reports its own values.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple, values: tuple, extra: dict = None) -> str:
+    """Render a Prometheus label set, e.g. {stage="filter",le="0.1"}."""
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing count, optionally labelled."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values, optionally labelled."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # label key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager that observes the wall-clock duration of its block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+
+        result = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                result.append((f"{self.name}_bucket", format_labels(self.labelnames, key, {"le": format_value(bound)}), count))
+            result.append((f"{self.name}_bucket", format_labels(self.labelnames, key, {"le": "+Inf"}), state[-1]))
+            result.append((f"{self.name}_sum", format_labels(self.labelnames, key), state[-2]))
+            result.append((f"{self.name}_count", format_labels(self.labelnames, key), state[-1]))
+        return result
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time.
+
+    The callback returns either a number, or a dict mapping a label value
+    (for a single label name) to a number.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, func, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> list:
+        try:
+            value = self.func()
+        except Exception:
+            return []
+        if isinstance(value, dict):
+            return [(self.name, format_labels(self.labelnames, (k,)), v) for k, v in value.items()]
+        return [(self.name, "", value)]
+
+
+class Registry:
+    """Collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, func, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, func, labelnames))
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size of this process, in bytes."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    # Fallback: peak RSS (kilobytes on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Default registry and the metrics shared across modules
+REGISTRY = Registry()
+
+CALLBACK_DURATION = REGISTRY.histogram(
+    "wordcloud_callback_duration_seconds", "Dash callback latency.", ("callback",)
+)
+CALLBACK_ERRORS = REGISTRY.counter(
+    "wordcloud_callback_errors_total", "Dash callbacks that raised an exception.", ("callback",)
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "wordcloud_stage_duration_seconds",
+    "Data-layer stage latency (session_load, filter, merge, top_n, html).",
+    ("stage",),
+)
+SUPERSEDED_REQUESTS = REGISTRY.counter(
+    "wordcloud_superseded_requests_total",
+    "Word cloud requests dropped because a newer one from the same client arrived.",
+)
+SESSION_EVICTIONS = REGISTRY.counter(
+    "wordcloud_session_evictions_total", "Sessions evicted to stay within the memory budget."
+)
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size in bytes.", process_rss_bytes)
+REGISTRY.gauge("process_id", "Process ID of the worker that served this scrape.", os.getpid)
+
+
+def observe_callback(name: str):
+    """Decorator recording latency and errors of a Dash callback."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                CALLBACK_ERRORS.inc(callback=name)
+                raise
+            finally:
+                CALLBACK_DURATION.observe(time.perf_counter() - start, callback=name)
+        return wrapper
+    return decorator
+
+
+def observe_stage(stage: str):
+    """Context manager timing a data-layer stage."""
+    return STAGE_DURATION.time(stage=stage)
+
+
+def timed_stage(stage: str):
+    """Decorator form of observe_stage."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with observe_stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def register_session_gauges(session_manager, registry: Registry = REGISTRY):
+    """Register gauges describing a SessionManager's loaded data and caches."""
+    registry.gauge(
+        "wordcloud_sessions_loaded", "Sessions currently loaded in this process.",
+        lambda: session_manager.get_cache_stats()["loaded_sessions"],
+    )
+    registry.gauge(
+        "wordcloud_vocabulary_size", "Distinct words in each loaded session.",
+        lambda: session_manager.get_cache_stats()["vocabulary"], ("session",),
+    )
+    registry.gauge(
+        "wordcloud_session_resident_bytes", "Estimated memory held by loaded sessions.",
+        lambda: session_manager.get_cache_stats()["resident_bytes"],
+    )
+    registry.gauge(
+        "wordcloud_cache_entries", "Entries held in each in-process cache.",
+        lambda: session_manager.get_cache_stats()["caches"], ("cache",),
+    )
+
+
+def metrics_view(registry: Registry = REGISTRY):
+    """Flask view function serving the registry."""
+    def view():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+    return view
@@ -0,0 +1,185 @@
+"""
+Speaker participation analytics from word timings.
+
+At load time a session's words are turned into columnar arrays (speaker
+index, start, end) and reduced in one vectorized pass to per-speaker
+totals: talk time, words spoken, and turns (runs of consecutive words by
+the same speaker). A turn's talk time runs from its first word's start to
+its last word's end, so short pauses inside a turn count as talking.
+Words without timings (start and end both 0) still count as words but do
+not extend a turn.
+
+Requests only combine these few per-speaker rows, grouping them by speaker
+metadata and applying the current filters, so they cost nothing per word.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+IDENTITY_KEYS = ["speaker_id", "name"]
+
+
+class ParticipationStats:
+    """Per-speaker talk time, word and turn totals for one session."""
+
+    def __init__(self, speaker_names: list, talk_time, words, turns):
+        self.speaker_names = speaker_names
+        self.talk_time = np.asarray(talk_time, dtype=np.float64)  # Seconds
+        self.words = np.asarray(words, dtype=np.int64)
+        self.turns = np.asarray(turns, dtype=np.int64)
+
+    @classmethod
+    def from_words(cls, words: list) -> "ParticipationStats":
+        """Compute the totals from load_transcript output (in transcript order)."""
+        speaker_index = {}
+        speakers = np.fromiter(
+            (speaker_index.setdefault(w["speaker"], len(speaker_index)) for w in words),
+            dtype=np.int64, count=len(words)
+        )
+        start = np.fromiter((w["start"] or 0 for w in words), dtype=np.float64, count=len(words))
+        end = np.fromiter((w["end"] or 0 for w in words), dtype=np.float64, count=len(words))
+        n_speakers = len(speaker_index)
+
+        if not len(speakers):
+            return cls([], [], [], [])
+
+        # A new turn starts wherever the speaker changes
+        turn_starts = np.flatnonzero(np.r_[True, speakers[1:] != speakers[:-1]])
+        turn_speakers = speakers[turn_starts]
+
+        timed = (start > 0) | (end > 0)
+        first = np.minimum.reduceat(np.where(timed, start, np.inf), turn_starts)
+        last = np.maximum.reduceat(np.where(timed, end, -np.inf), turn_starts)
+        durations = np.where(np.isfinite(first), np.clip(last - first, 0, None), 0.0)
+
+        return cls(
+            speaker_names=list(speaker_index),
+            talk_time=np.bincount(turn_speakers, weights=durations, minlength=n_speakers),
+            words=np.bincount(speakers, minlength=n_speakers),
+            turns=np.bincount(turn_speakers, minlength=n_speakers),
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form (for the compiled store's meta.json)."""
+        return {
+            "speaker_names": self.speaker_names,
+            "talk_time": self.talk_time.tolist(),
+            "words": self.words.tolist(),
+            "turns": self.turns.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ParticipationStats":
+        return cls(data["speaker_names"], data["talk_time"], data["words"], data["turns"])
+
+    def total_talk_time(self) -> float:
+        return float(self.talk_time.sum())
+
+    def rows(self, matching=None) -> list:
+        """Per-speaker totals for speakers in matching (None = everyone)."""
+        return [
+            {
+                "speaker": name,
+                "talk_time": float(self.talk_time[i]),
+                "words": int(self.words[i]),
+                "turns": int(self.turns[i]),
+            }
+            for i, name in enumerate(self.speaker_names)
+            if matching is None or name in matching
+        ]
+
+
+class ParticipationTally:
+    """
+    ParticipationStats.from_words computed a batch of words at a time.
+
+    Talk time of finished turns is summed in turn order, and the open turn
+    (which the next words may extend) is added when stats() is taken, so the
+    totals match from_words over the same words.
+    """
+
+    def __init__(self):
+        self.speaker_index = {}
+        self.talk_time = []  # Per speaker, finished turns only
+        self.words = []
+        self.turns = []
+        self._speaker = None  # Index of the speaker of the open turn
+        self._first = None  # Earliest start of the open turn's timed words
+        self._last = None  # Latest end of the open turn's timed words
+
+    def _open_duration(self) -> float:
+        return max(self._last - self._first, 0.0) if self._first is not None else 0.0
+
+    def add(self, words: list):
+        for word in words:
+            index = self.speaker_index.get(word["speaker"])
+            if index is None:
+                index = self.speaker_index[word["speaker"]] = len(self.speaker_index)
+                self.talk_time.append(0.0)
+                self.words.append(0)
+                self.turns.append(0)
+
+            if index != self._speaker:
+                # A new turn starts wherever the speaker changes
+                if self._speaker is not None:
+                    self.talk_time[self._speaker] += self._open_duration()
+                self._speaker, self._first, self._last = index, None, None
+                self.turns[index] += 1
+
+            self.words[index] += 1
+            start, end = word["start"] or 0, word["end"] or 0
+            if start > 0 or end > 0:
+                self._first = start if self._first is None else min(self._first, start)
+                self._last = end if self._last is None else max(self._last, end)
+
+    def stats(self) -> ParticipationStats:
+        talk_time = list(self.talk_time)
+        if self._speaker is not None:
+            talk_time[self._speaker] += self._open_duration()
+        return ParticipationStats(list(self.speaker_index), talk_time, list(self.words), list(self.turns))
+
+
+def add_rates(entry: dict, session_talk_time: float) -> dict:
+    """Add words per minute and share of session talk time to a totals entry."""
+    minutes = entry["talk_time"] / 60
+    entry["wpm"] = round(entry["words"] / minutes, 1) if minutes else 0.0
+    entry["share"] = round(entry["talk_time"] / session_talk_time, 4) if session_talk_time else 0.0
+    entry["talk_time"] = round(entry["talk_time"], 2)
+    return entry
+
+
+def summarize_participation(rows: list, speakers: dict, session_talk_time: float) -> dict:
+    """
+    Per-speaker and per-metadata-group participation.
+
+    rows come from ParticipationStats.rows (speaker names may be prefixed
+    for merged sessions); speakers maps the same names to their metadata.
+    Shares are relative to session_talk_time, the unfiltered total.
+
+    Returns {"speakers": [...], "groups": {key: {value: {...}}}, "total": {...}},
+    with speakers sorted by talk time.
+    """
+    groups = defaultdict(lambda: defaultdict(lambda: {"talk_time": 0.0, "words": 0, "turns": 0, "speakers": 0}))
+    total = {"talk_time": 0.0, "words": 0, "turns": 0, "speakers": 0}
+
+    for row in rows:
+        for entry in [total] + [
+            groups[key][value]
+            for key, value in speakers.get(row["speaker"], {}).items()
+            if key not in IDENTITY_KEYS and key != "description" and value
+        ]:
+            entry["talk_time"] += row["talk_time"]
+            entry["words"] += row["words"]
+            entry["turns"] += row["turns"]
+            entry["speakers"] += 1
+
+    speaker_rows = sorted((add_rates(dict(row), session_talk_time) for row in rows),
+                          key=lambda r: r["talk_time"], reverse=True)
+    return {
+        "speakers": speaker_rows,
+        "groups": {
+            key: {value: add_rates(entry, session_talk_time) for value, entry in sorted(values.items())}
+            for key, values in groups.items()
+        },
+        "total": add_rates(total, session_talk_time),
+    }
@@ -0,0 +1,140 @@
+"""
+On-demand cProfile capture for Dash callbacks.
+
+Profiling is opt-in via the WORDCLOUD_PROFILE environment variable:
+- "all":    profile every wrapped callback
+- "header": profile only requests carrying the X-Wordcloud-Profile header
+
+Each profile covers the whole callback, including the SessionManager and
+data_processor calls it makes, and is written to PROFILE_DIR as a .pstats
+file (loadable by pstats, snakeviz or flameprof) plus a .json sidecar with
+the callback name, its inputs and the wall-clock duration. Only the newest
+PROFILE_KEEP profiles are kept in PROFILE_DIR. The slowest recent profiles
+are listed at /debug/profiles.
+"""
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import Blueprint, abort, has_request_context, jsonify, request, send_from_directory
+
+from config import PROFILE_MODE, PROFILE_DIR, PROFILE_HEADER, PROFILE_KEEP
+
+_recent = []  # Metadata of recent profiles, newest last
+_recent_lock = threading.Lock()
+
+
+def should_profile() -> bool:
+    """Whether the current request should be profiled."""
+    if PROFILE_MODE == "all":
+        return True
+    if PROFILE_MODE == "header" and has_request_context():
+        return request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")
+    return False
+
+
+def save_profile(profiler: cProfile.Profile, callback: str, inputs: dict, duration: float) -> dict:
+    """Write a profile and its metadata sidecar; remember it for the listing endpoint."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    stem = f"{now.strftime('%Y%m%dT%H%M%S%f')}_{callback}_{os.getpid()}"
+
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{stem}.pstats"))
+    record = {
+        "id": stem,
+        "callback": callback,
+        "inputs": inputs,
+        "duration_ms": round(duration * 1000, 3),
+        "timestamp": now.isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+    }
+    with open(os.path.join(PROFILE_DIR, f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, default=str)
+
+    with _recent_lock:
+        _recent.append(record)
+        del _recent[:-PROFILE_KEEP]
+    prune_profiles()
+    return record
+
+
+def prune_profiles(keep: int = PROFILE_KEEP):
+    """Delete all but the newest `keep` profiles in PROFILE_DIR (from any process)."""
+    # Ids start with a UTC timestamp, so they sort oldest first
+    stems = sorted({name.rsplit(".", 1)[0] for name in os.listdir(PROFILE_DIR)
+                    if name.endswith((".pstats", ".json"))})
+    for stem in stems[:-keep]:
+        for suffix in (".pstats", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + suffix))
+            except OSError:
+                pass  # Already removed by another worker
+
+
+def profile_callback(name: str):
+    """
+    Decorator that profiles a Dash callback when profiling is requested.
+
+    A no-op wrapper when WORDCLOUD_PROFILE is unset.
+    """
+    def decorator(func):
+        if not PROFILE_MODE:
+            return func
+
+        param_names = list(inspect.signature(func).parameters)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not should_profile():
+                return func(*args, **kwargs)
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active on this thread; run unprofiled
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                duration = time.perf_counter() - start
+                inputs = {**dict(zip(param_names, args)), **kwargs}
+                save_profile(profiler, name, inputs, duration)
+        return wrapper
+    return decorator
+
+
+def create_profiling_blueprint() -> Blueprint:
+    """Endpoints listing and downloading recent profiles (only when enabled)."""
+    debug = Blueprint("profiling", __name__, url_prefix="/debug/profiles")
+
+    @debug.route("")
+    def slowest_profiles():
+        """Slowest recent profiles in this process, slowest first."""
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError:
+            limit = 20
+        with _recent_lock:
+            records = sorted(_recent, key=lambda r: r["duration_ms"], reverse=True)
+        # Other workers writing to PROFILE_DIR may have pruned some of ours
+        records = [r for r in records if os.path.exists(os.path.join(PROFILE_DIR, f"{r['id']}.pstats"))][:limit]
+        return jsonify({"mode": PROFILE_MODE, "profile_dir": PROFILE_DIR, "profiles": records})
+
+    @debug.route("/<profile_id>.pstats")
+    def download_profile(profile_id):
+        with _recent_lock:
+            known = any(r["id"] == profile_id for r in _recent)
+        if not known:
+            abort(404)
+        return send_from_directory(os.path.abspath(PROFILE_DIR), f"{profile_id}.pstats", as_attachment=True)
+
+    return debug
@@ -3,11 +3,30 @@ Session loader module for discovering and managing multiple transcript sessions.
 """
 import os
 import json
+import hashlib
+import logging
+import threading
+import time
 from pathlib import Path
 from collections import defaultdict
 
-from config import DATA_DIR
-from data_processor import SessionData, compute_word_stats, get_word_frequencies, filter_word_stats
+from config import (
+    DATA_DIR, SHARED_STORE_DIR, SESSION_MEMORY_BUDGET_MB, COMPILED_CACHE_DIR, COOCCURRENCE_MIN_COUNT, APPROX_MODE,
+    LIVE_SESSIONS,
+)
+from approximate import ApproximateSessionData
+from live import LiveSession
+from cooccurrence import merge_association_counts, rank_associations
+from participation import summarize_participation
+from data_processor import (
+    SessionData, compute_word_stats, top_k_merge,
+    combine_word_details, merge_session_details, pick_group_label, transcript_suffixes,
+)
+from word_search import WordIndex, suggest_words
+from shared_store import load_mapped_session, write_session_store, MappedSessionData
+from metrics import observe_stage, timed_stage, SESSION_EVICTIONS
+
+logger = logging.getLogger(__name__)
 
 
 def load_word_examples(session_path: str) -> dict:
@@ -33,7 +52,7 @@ def discover_sessions(data_dir: str = None) -> list:
     Auto-discover sessions in the data directory.
 
     Sessions are identified by folders containing both:
-    - *_labeled.json (transcript)
+    - *_labeled.json (transcript; also .jsonl, optionally .gz/.zst compressed)
     - speakerlist.csv (speaker metadata)
 
     Returns list of dicts with session info.
@@ -51,8 +70,10 @@ def discover_sessions(data_dir: str = None) -> list:
     for item in data_path.iterdir():
         if item.is_dir():
             # Look for required files
-            json_files = list(item.glob("*_labeled.json"))
+            json_files = [path for suffix in transcript_suffixes() for path in sorted(item.glob(f"*_labeled{suffix}"))]
             csv_file = item / "speakerlist.csv"
+            if not json_files and any(item.glob("*_labeled.json*.zst")):
+                logger.warning("Skipping %s: .zst transcripts need the zstandard package", item.name)
 
             if json_files and csv_file.exists():
                 sessions.append({
@@ -65,42 +86,304 @@ def discover_sessions(data_dir: str = None) -> list:
     return sorted(sessions, key=lambda x: x["name"])
 
 
+def compute_data_version(session_info: list) -> str:
+    """
+    Compute a short fingerprint of the discovered session files.
+
+    Changes whenever a session is added or removed, or one of its
+    transcript, speaker list or examples files is modified.
+    """
+    digest = hashlib.sha1()
+    for info in session_info:
+        paths = [info["json_path"], info["csv_path"], os.path.join(info["path"], "word_examples.json")]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+            except OSError:
+                digest.update(f"{path}:missing;".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class PendingLoad:
+    """A session load in progress that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.session = None
+        self.error = None
+
+    def wait(self) -> SessionData:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.session
+
+
 class SessionManager:
-    """Manages loading and caching of multiple session data."""
+    """
+    Manages loading and caching of multiple session data.
+
+    Safe to share between threads. The session cache and session list are
+    never mutated in place: writers build a new dict/list under the lock and
+    rebind it, so readers can use them without locking. Concurrent first
+    requests for the same session wait on a single in-progress load.
+
+    With a memory budget, resident sessions are evicted least-recently-used
+    first once their estimated footprint, including the query caches and
+    indexes built since they loaded, plus the word lookup indexes, exceeds
+    it. The budget is checked on every get_session. Evicted sessions are
+    compiled to compiled_dir and reload from there on their next access.
+    Live sessions are never evicted, as a reload would count their
+    transcript again from the start.
+
+    In approximate mode sessions keep bounded heavy-hitters summaries
+    instead of exact counts (see approximate.py). Sessions named in
+    live_sessions are counted as their transcript grows (see live.py).
+    """
 
-    def __init__(self, data_dir: str = None):
+    def __init__(self, data_dir: str = None, store_dir: str = None, memory_budget_mb: float = None,
+                 compiled_dir: str = None, approximate: bool = None, live_sessions: list = None):
         self.data_dir = data_dir or DATA_DIR
-        self._sessions = {}  # Cache of loaded SessionData
-        self._session_info = []  # List of discovered sessions
+        self.store_dir = store_dir or SHARED_STORE_DIR  # None keeps sessions in-process
+        if memory_budget_mb is None:
+            memory_budget_mb = SESSION_MEMORY_BUDGET_MB
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)  # 0 = unbounded
+        self.compiled_dir = compiled_dir or COMPILED_CACHE_DIR
+        self.approximate = APPROX_MODE if approximate is None else approximate
+        self.live_sessions = set(LIVE_SESSIONS if live_sessions is None else live_sessions)
+        self._lock = threading.Lock()  # Guards writers of the fields below
+        self._sessions = {}  # Cache of loaded SessionData (copy-on-write)
+        self._session_info = []  # List of discovered sessions (replaced, never mutated)
+        self._pending = {}  # Session name -> PendingLoad for loads in progress
+        self._last_access = {}  # Session name -> monotonic time of last get_session
+        self._compiled = set()  # Sessions compiled to compiled_dir on eviction
+        self._warned_over_budget = set()  # Sets of unevictable sessions logged as exceeding the budget
+        self._retired_versions = {}  # Session name -> versions of live sessions since dropped, so versions never go back
+        self._word_indexes = {}  # Session name (or "all") -> (data_version, WordIndex)
+        self.eviction_count = 0
+        self._files_version = ""  # Fingerprint of the discovered session files
         self.refresh()
 
     def refresh(self):
         """Refresh the list of available sessions."""
-        self._session_info = discover_sessions(self.data_dir)
-        # Clear cache for sessions that no longer exist
-        valid_names = {s["name"] for s in self._session_info}
-        self._sessions = {k: v for k, v in self._sessions.items() if k in valid_names}
+        session_info = discover_sessions(self.data_dir)
+        data_version = compute_data_version(session_info)
+        valid_names = {s["name"] for s in session_info}
+
+        with self._lock:
+            self._session_info = session_info
+            self._files_version = data_version
+            # Clear cache for sessions that no longer exist
+            self._retire_live([v for k, v in self._sessions.items() if k not in valid_names])
+            self._sessions = {k: v for k, v in self._sessions.items() if k in valid_names}
+            self._word_indexes = {}
+
+    @property
+    def data_version(self) -> str:
+        """
+        Fingerprint of the session files, plus the updates counted in live
+        sessions (including dropped ones, so the count never goes back).
+        """
+        updates = sum(self._retired_versions.values())
+        updates += sum(s.version for s in self._sessions.values() if isinstance(s, LiveSession))
+        return f"{self._files_version}.{updates}" if updates else self._files_version
+
+    def live_version(self, session_name: str) -> int:
+        """Updates counted in a live session so far; only ever increases."""
+        return self._retired_versions.get(session_name, 0) + self.get_session(session_name).version
+
+    def _retire_live(self, sessions: list):
+        """Keep the versions of live sessions being dropped (caller holds the lock)."""
+        retired = dict(self._retired_versions)
+        for session in sessions:
+            if isinstance(session, LiveSession):
+                retired[session.session_name] = retired.get(session.session_name, 0) + session.version
+        self._retired_versions = retired
+
+    def get_live_sessions(self, session_name: str = None) -> list:
+        """Live session names in a view ("all" or None for every session)."""
+        names = self.get_session_list() if session_name in (None, "all") else [session_name]
+        return [name for name in names if self.is_live(name)]
+
+    def is_live(self, session_name: str) -> bool:
+        """Whether a session is tailed as a live session (listed, with a .jsonl transcript)."""
+        info = next((s for s in self._session_info if s["name"] == session_name), None)
+        return info is not None and session_name in self.live_sessions and info["json_path"].endswith(".jsonl")
 
     def get_session_list(self) -> list:
         """Get list of available session names."""
         return [s["name"] for s in self._session_info]
 
+    def get_session_info(self, session_name: str = None) -> list:
+        """Discovered session info (paths) for one session, or all if session_name is None."""
+        if session_name is None:
+            return list(self._session_info)
+        info = [s for s in self._session_info if s["name"] == session_name]
+        if not info:
+            raise ValueError(f"Session not found: {session_name}")
+        return info
+
     def get_session(self, session_name: str) -> SessionData:
         """Get SessionData for a specific session, loading if necessary."""
-        if session_name not in self._sessions:
-            # Find session info
-            info = next((s for s in self._session_info if s["name"] == session_name), None)
-            if info is None:
-                raise ValueError(f"Session not found: {session_name}")
+        # Fast path: lock-free read of the current cache
+        session = self._sessions.get(session_name)
+        if session is not None:
+            self._last_access[session_name] = time.monotonic()
+            if self.memory_budget:
+                self._enforce_budget(keep=session_name)
+            return session
+
+        with self._lock:
+            session = self._sessions.get(session_name)
+            if session is not None:
+                return session
+
+            pending = self._pending.get(session_name)
+            if pending is not None:
+                is_loader = False
+            else:
+                # Find session info
+                info = next((s for s in self._session_info if s["name"] == session_name), None)
+                if info is None:
+                    raise ValueError(f"Session not found: {session_name}")
+                pending = self._pending[session_name] = PendingLoad()
+                is_loader = True
+
+        if not is_loader:
+            return pending.wait()
+
+        evicted = []
+        try:
+            pending.session = self._load_session(info)
+            if self.memory_budget:
+                pending.session.memory_footprint()  # Measure the data now, outside the lock
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[session_name]
+                # Only publish if the session wasn't removed by a refresh meanwhile
+                if pending.error is None and any(s["name"] == session_name for s in self._session_info):
+                    self._sessions = {**self._sessions, session_name: pending.session}
+                    self._last_access[session_name] = time.monotonic()
+                    evicted = self._evict_over_budget(keep=session_name)
+            pending.done.set()
+
+        for name, session in evicted:
+            self._compile_evicted(name, session)
+
+        return pending.session
+
+    def _resident_bytes(self, sessions: dict) -> int:
+        """Estimated memory of sessions (with their caches) plus the word lookup indexes."""
+        indexes = sum(index.nbytes() for _, index in self._word_indexes.values())
+        return sum(session.memory_footprint() for session in sessions.values()) + indexes
+
+    def _enforce_budget(self, keep: str):
+        """Evict if caches built since the last check pushed resident memory over the budget."""
+        if self._resident_bytes(self._sessions) <= self.memory_budget:
+            return
+        with self._lock:
+            evicted = self._evict_over_budget(keep)
+        for name, session in evicted:
+            self._compile_evicted(name, session)
+
+    def _evict_over_budget(self, keep: str) -> list:
+        """
+        Drop least-recently-used sessions until within budget (caller holds the lock).
 
-            # Load session data
-            self._sessions[session_name] = SessionData(
-                session_name=session_name,
+        Returns the evicted (name, session) pairs; `keep` and live sessions are
+        never evicted.
+        """
+        if not self.memory_budget:
+            return []
+
+        evicted = []
+        sessions = dict(self._sessions)
+        while self._resident_bytes(sessions) > self.memory_budget:
+            # Live sessions are pinned: reloading one would count its transcript from the start
+            candidates = [n for n in sessions if n != keep and not isinstance(sessions[n], LiveSession)]
+            if not candidates:
+                # Checked on every access, so only said once per set of sessions
+                pinned = frozenset(sessions)
+                if pinned not in self._warned_over_budget:
+                    self._warned_over_budget = self._warned_over_budget | {pinned}
+                    logger.warning(
+                        "Sessions that cannot be evicted (%s, %.1f MB) exceed the %.1f MB memory budget",
+                        ", ".join(sorted(pinned)), self._resident_bytes(sessions) / 2**20, self.memory_budget / 2**20
+                    )
+                break
+            victim = min(candidates, key=lambda n: self._last_access.get(n, 0))
+            session = sessions.pop(victim)
+            evicted.append((victim, session))
+            self._word_indexes = {k: v for k, v in self._word_indexes.items() if k != victim}
+            self.eviction_count += 1
+            SESSION_EVICTIONS.inc()
+            logger.info(
+                "Evicted session %s (%.1f MB) to stay within the %.1f MB memory budget",
+                victim, session.memory_footprint() / 2**20, self.memory_budget / 2**20
+            )
+
+        if evicted:
+            self._sessions = sessions
+        return evicted
+
+    def _compile_evicted(self, name: str, session: SessionData):
+        """Write an evicted in-process session to the compiled cache for fast reload."""
+        if isinstance(session, (MappedSessionData, ApproximateSessionData, LiveSession)) or name in self._compiled:
+            return
+        info = next((s for s in self._session_info if s["name"] == name), None)
+        if info is None:
+            return
+        try:
+            write_session_store(session, os.path.join(self.compiled_dir, name), compute_data_version([info]))
+        except OSError:
+            logger.exception("Could not compile evicted session %s", name)
+            return
+        with self._lock:
+            self._compiled = self._compiled | {name}
+
+    def _load_session(self, info: dict) -> SessionData:
+        """Load one session from its source files (or the shared store)."""
+        with observe_stage("session_load"):
+            if self.is_live(info["name"]):
+                return LiveSession(info["name"], info["json_path"], info["csv_path"])
+            if info["name"] in self.live_sessions:
+                logger.warning("Session %s is not live: its transcript is not an uncompressed .jsonl", info["name"])
+            if self.approximate:
+                # Summaries are small already, so they are neither stored nor compiled
+                return ApproximateSessionData(info["name"], info["json_path"], info["csv_path"])
+            if self.store_dir:
+                return load_mapped_session(info, self.store_dir, compute_data_version([info]))
+            if info["name"] in self._compiled:
+                # Previously evicted: reopen the compiled arrays (recompiles if stale)
+                return load_mapped_session(info, self.compiled_dir, compute_data_version([info]))
+
+            return SessionData(
+                session_name=info["name"],
                 json_path=info["json_path"],
                 csv_path=info["csv_path"]
             )
 
-        return self._sessions[session_name]
+    def get_cache_stats(self) -> dict:
+        """Sizes of in-process caches, without loading anything."""
+        sessions = self._sessions
+        return {
+            "loaded_sessions": len(sessions),
+            "resident_bytes": self._resident_bytes(sessions) if self.memory_budget else 0,
+            "evictions": self.eviction_count,
+            "vocabulary": {name: s.vocabulary_size() for name, s in sessions.items()},
+            "caches": {
+                "sessions": len(sessions),
+                "pending_loads": len(self._pending),
+            },
+        }
+
+    def preload(self):
+        """Load every discovered session now (e.g. in the gunicorn master)."""
+        self.get_all_sessions()
 
     def get_all_sessions(self) -> list:
         """Get all SessionData objects."""
@@ -116,6 +399,7 @@ class SessionManager:
 
         return {k: sorted(v) for k, v in merged.items()}
 
+    @timed_stage("merge")
     def get_merged_word_stats(self) -> dict:
         """
         Get word stats merged across all sessions.
@@ -162,30 +446,149 @@ class SessionManager:
                 merged[prefixed_name] = {**meta, "session": session.session_name}
         return merged
 
-    def get_merged_frequencies(self, filters: dict = None, top_n: int = 100) -> dict:
-        """Get word frequencies merged across all sessions with optional filtering."""
-        merged_stats = self.get_merged_word_stats()
-
-        if filters:
-            merged_speakers = self.get_merged_speakers()
-            merged_stats = filter_word_stats(merged_stats, merged_speakers, filters)
+    def get_merged_frequencies(self, filters: dict = None, top_n: int = 100, grouping: str = None,
+                               checkpoint=None, weighting: str = None) -> dict:
+        """
+        Get word frequencies merged across all sessions with optional filtering.
+
+        Each session ranks its own filtered totals, and a threshold top-k
+        merge combines them, so the merged word_stats is never built.
+        Results (including tie order) match filtering the merged stats.
+        With a grouping mode, groups are merged by key and labelled by their
+        most frequent form; weighting "utterances" ranks by utterances
+        containing each word. checkpoint, if given, is called before each
+        session is ranked and may raise to stop.
+        """
+        sessions = self.get_all_sessions()
+        ranked_lists = []
+        for session in sessions:
+            if checkpoint:
+                checkpoint()
+            ranked_lists.append(session.get_ranked_counts(filters, grouping, weighting))
+
+        def tiebreak(word):
+            # Position in the merged dict: first session containing the word, then its rank there
+            for i, session in enumerate(sessions):
+                rank = session.group_rank(word, grouping) if grouping else session.word_rank(word)
+                if rank is not None:
+                    return (i, rank)
+            return (len(sessions), 0)
+
+        top = top_k_merge(ranked_lists, top_n, tiebreak)
+        if not grouping:
+            return top
+        forms = self.get_group_forms(list(top), filters, grouping, weighting)
+        return {pick_group_label(forms[key]): count for key, count in top.items()}
+
+    def get_group_forms(self, keys: list, filters: dict, grouping: str, weighting: str = None) -> dict:
+        """
+        {group key: {form: (filtered count, tiebreak)}} summed across sessions.
 
-        return get_word_frequencies(merged_stats, top_n)
+        The tiebreak is the form's position in the merged word order.
+        """
+        forms = defaultdict(dict)
+        for i, session in enumerate(self.get_all_sessions()):
+            for key, session_forms in session.get_group_forms(keys, filters, grouping, weighting).items():
+                for form, (count, rank) in session_forms.items():
+                    total, tiebreak = forms[key].get(form, (0, (i, rank)))
+                    forms[key][form] = (total + count, tiebreak)
+        return dict(forms)
+
+    def get_group_members(self, word: str, grouping: str) -> list:
+        """Forms sharing word's group in any session, in merged word order."""
+        members = {}
+        for session in self.get_all_sessions():
+            for form in session.group_members(word, grouping):
+                members.setdefault(form, None)
+        return list(members)
 
-    def get_merged_word_details(self, word: str, filters: dict = None) -> dict:
+    def get_merged_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
         """Get detailed stats for a word across all sessions."""
-        merged_stats = self.get_merged_word_stats()
+        if grouping:
+            members = self.get_group_members(word, grouping)
+            return combine_word_details({m: self.get_merged_word_details(m, filters) for m in members})
+
+        # Each session looks up just this word, so a click costs the same
+        # however large the merged vocabulary is
+        parts = [(session.session_name, session.get_word_details(word, filters))
+                 for session in self.get_all_sessions()]
+        filtered = bool(filters) and any(filters.values())
+        return merge_session_details(parts, filtered)
+
+    def get_count_error(self, session_name: str = None, filters: dict = None):
+        """
+        How far counts under filters may be below the exact ones (None if exact).
 
-        if filters:
-            merged_speakers = self.get_merged_speakers()
-            merged_stats = filter_word_stats(merged_stats, merged_speakers, filters)
+        If session_name is "all" or None, the bound is for merged counts.
+        """
+        if session_name and session_name != "all":
+            return self.get_session(session_name).count_error(filters)
+        errors = [e for e in (s.count_error(filters) for s in self.get_all_sessions()) if e is not None]
+        return sum(errors) if errors else None
 
-        return merged_stats.get(word.lower(), {
-            "total_count": 0,
-            "speaker_count": 0,
-            "speakers": {},
-            "metadata": {}
-        })
+    def get_utterance_total(self, session_name: str = None, filters: dict = None) -> int:
+        """
+        Utterances with a counted word by the speakers matching filters.
+
+        If session_name is "all" or None, sums over all sessions.
+        """
+        if session_name and session_name != "all":
+            return self.get_session(session_name).get_utterance_total(filters)
+        return sum(session.get_utterance_total(filters) for session in self.get_all_sessions())
+
+    def get_merged_participation(self, filters: dict = None) -> dict:
+        """Participation across all sessions; shares are of the combined talk time."""
+        rows, speakers, talk_time = [], {}, 0.0
+        for session in self.get_all_sessions():
+            name = session.session_name
+            session_rows, session_talk_time = session.get_participation_rows(filters)
+            talk_time += session_talk_time
+            rows.extend({**row, "speaker": f"{name}:{row['speaker']}"} for row in session_rows)
+            for speaker, meta in session.speakers.items():
+                speakers[f"{name}:{speaker}"] = {**meta, "session": name}
+        return summarize_participation(rows, speakers, talk_time)
+
+    def get_merged_associations(self, word: str, filters: dict = None, top_n: int = 10) -> list:
+        """Words most often said together with word across all sessions, scored by PMI."""
+        sessions = self.get_all_sessions()
+        counts = merge_association_counts([s.get_association_counts(word, filters) for s in sessions])
+        ranked_lists = [s.get_ranked_counts(filters) for s in sessions]
+        other_counts = {
+            other: sum(r.count(other) for r in ranked_lists)
+            for other, together in counts["pairs"].items() if together >= COOCCURRENCE_MIN_COUNT
+        }
+        return rank_associations(
+            counts["pairs"], counts["word_count"], other_counts,
+            counts["total_tokens"], counts["total_pairs"], top_n
+        )
+
+    def get_word_index(self, key: str, sessions: list) -> WordIndex:
+        """Lookup index over the vocabulary of sessions, cached under key."""
+        cached = self._word_indexes.get(key)
+        if cached is not None and cached[0] == self.data_version:
+            return cached[1]
+
+        words = set()
+        for session in sessions:
+            words.update(session.vocabulary())
+        index = WordIndex(words)
+        with self._lock:
+            self._word_indexes = {**self._word_indexes, key: (self.data_version, index)}
+        return index
+
+    def get_word_suggestions(self, text: str, session_name: str = None, filters: dict = None,
+                             limit: int = None) -> list:
+        """
+        Autocomplete and typo suggestions for text, ranked by filtered frequency.
+
+        If session_name is "all" or None, suggests from all sessions.
+        """
+        if session_name and session_name != "all":
+            sessions = [self.get_session(session_name)]
+        else:
+            session_name, sessions = "all", self.get_all_sessions()
+        index = self.get_word_index(session_name, sessions)
+        return suggest_words(index, [s.get_ranked_counts(filters) for s in sessions], text, limit)
 
     def get_word_examples(self, word: str, session_name: str = None) -> list:
         """
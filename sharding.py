@@ -0,0 +1,653 @@
+"""
+Sharded query mode: sessions spread across local worker processes.
+
+Sessions from discover_sessions are assigned round-robin to N shard
+processes. Each shard owns a private SessionManager (with all its caches)
+for its sessions and answers queries over authenticated local
+multiprocessing.connection channels (a Unix socket, or a named pipe on
+Windows). Shards are started as plain subprocesses running this file, so
+they never re-import the Dash app. ShardedSessionManager scatters queries
+to the shards and gathers their partial counts, giving the same results
+as the single-process path.
+
+Shards listen at fixed addresses and serve any number of connections, so
+the processes forked from the one that started them (gunicorn workers
+under --preload) share them, each over its own connections. The starting
+process watches its shards and respawns one that dies at the same address;
+a query that finds its connection broken reconnects and is sent again
+(queries only read). A shard exits when its starting process does.
+
+"All Sessions" top-N uses the three-phase TPUT algorithm, so only
+candidate words cross the pipes rather than whole vocabularies:
+1. each shard returns its local top-k; the k-th best lower bound is tau
+2. each shard returns every word whose partial total is >= tau / shards
+3. exact partial totals are gathered for those candidates only
+A word missing from phase 2 totals less than tau, so the result is exact.
+"""
+import argparse
+import json
+import logging
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+from config import COOCCURRENCE_MIN_COUNT, SUGGEST_LIMIT
+from cooccurrence import merge_association_counts, rank_associations
+from data_processor import top_k_merge, pick_group_label, merge_session_details
+from word_search import suggest_words
+from session_loader import SessionManager
+from metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a shard process to accept connections (when started or respawned)
+SHARD_CONNECT_TIMEOUT = 60
+# How often the starting process checks that its shards are alive, in seconds
+SHARD_SUPERVISE_SECONDS = 1.0
+
+
+class ShardServer:
+    """Query handler for one connection to a shard process."""
+
+    def __init__(self, manager: SessionManager):
+        self.manager = manager  # Shared by the shard's connections
+        self.assigned = []  # [(global session index, session name)], sent by the client on connect
+
+    def sessions(self) -> list:
+        return [(index, self.manager.get_session(name)) for index, name in self.assigned]
+
+    def tiebreak(self, word: str, grouping: str = None) -> tuple:
+        for index, session in self.sessions():
+            rank = session.group_rank(word, grouping) if grouping else session.word_rank(word)
+            if rank is not None:
+                return (index, rank)
+        return (float("inf"), 0)
+
+    def partial(self, word: str, ranked_lists: list) -> int:
+        return sum(r.count(word) for r in ranked_lists)
+
+    def handle_ping(self):
+        return os.getpid()
+
+    def handle_assign(self, assigned: list):
+        known = set(self.manager.get_session_list())
+        if any(name not in known for _, name in assigned):
+            self.manager.refresh()  # Sessions added since the shard started
+        self.assigned = [tuple(entry) for entry in assigned]
+
+    def handle_filter_options(self):
+        return [session.get_filter_options() for _, session in self.sessions()]
+
+    def handle_speakers(self, name: str):
+        return self.manager.get_session(name).speakers
+
+    def handle_word_stats(self, name: str):
+        return self.manager.get_session(name).word_stats
+
+    def handle_vocabulary_size(self, name: str):
+        return self.manager.get_session(name).vocabulary_size()
+
+    def handle_session_frequencies(self, name: str, filters: dict, top_n: int, grouping: str = None,
+                                   weighting: str = None):
+        return self.manager.get_session(name).get_filtered_frequencies(filters=filters, top_n=top_n, grouping=grouping,
+                                                                      weighting=weighting)
+
+    def handle_utterance_total(self, name: str, filters: dict):
+        return self.manager.get_session(name).get_utterance_total(filters)
+
+    def handle_count_error(self, name: str, filters: dict):
+        return self.manager.get_session(name).count_error(filters)
+
+    def handle_session_details(self, name: str, word: str, filters: dict, grouping: str = None):
+        return self.manager.get_session(name).get_word_details(word, filters=filters, grouping=grouping)
+
+    def handle_participation_rows(self, name: str, filters: dict):
+        return self.manager.get_session(name).get_participation_rows(filters)
+
+    def handle_session_participation(self, name: str, filters: dict):
+        return self.manager.get_session(name).get_participation(filters)
+
+    def handle_group_members(self, name: str, word: str, grouping: str):
+        return self.manager.get_session(name).group_members(word, grouping)
+
+    def handle_group_forms(self, keys: list, filters: dict, grouping: str, weighting: str = None):
+        forms = defaultdict(dict)
+        for index, session in self.sessions():
+            for key, session_forms in session.get_group_forms(keys, filters, grouping, weighting).items():
+                for form, (count, rank) in session_forms.items():
+                    total, tiebreak = forms[key].get(form, (0, (index, rank)))
+                    forms[key][form] = (total + count, tiebreak)
+        return dict(forms)
+
+    def handle_word_details(self, word: str, filters: dict):
+        return [
+            (index, session.session_name, session.get_word_details(word, filters=filters))
+            for index, session in self.sessions()
+        ]
+
+    def handle_session_associations(self, name: str, word: str, filters: dict, top_n: int):
+        return self.manager.get_session(name).get_associations(word, filters=filters, top_n=top_n)
+
+    def handle_association_counts(self, word: str, filters: dict):
+        return merge_association_counts([
+            session.get_association_counts(word, filters) for _, session in self.sessions()
+        ])
+
+    def handle_word_suggestions(self, text: str, session_name: str, filters: dict, limit: int):
+        if session_name:
+            return self.manager.get_word_suggestions(text, session_name, filters, limit)
+        sessions = [session for _, session in self.sessions()]
+        index = self.manager.get_word_index("shard", sessions)
+        return suggest_words(index, [s.get_ranked_counts(filters) for s in sessions], text, limit)
+
+    def handle_partial_top(self, filters: dict, k: int, grouping: str = None, weighting: str = None):
+        ranked_lists = [session.get_ranked_counts(filters, grouping, weighting) for _, session in self.sessions()]
+        return list(top_k_merge(ranked_lists, k, lambda word: self.tiebreak(word, grouping)).items())
+
+    def handle_partial_above(self, filters: dict, tau: float, grouping: str = None, weighting: str = None):
+        ranked_lists = [session.get_ranked_counts(filters, grouping, weighting) for _, session in self.sessions()]
+        # A word with partial >= tau has count >= tau / m in at least one session
+        per_session = tau / max(len(ranked_lists), 1)
+        candidates = set()
+        for ranked in ranked_lists:
+            for word, count in zip(ranked.words, ranked.counts):
+                if count < per_session:
+                    break
+                candidates.add(str(word))
+        return [w for w in candidates if self.partial(w, ranked_lists) >= max(tau, 1)]
+
+    def handle_partial_counts(self, filters: dict, words: list, grouping: str = None, weighting: str = None):
+        ranked_lists = [session.get_ranked_counts(filters, grouping, weighting) for _, session in self.sessions()]
+        return {word: (self.partial(word, ranked_lists), self.tiebreak(word, grouping)) for word in words}
+
+    def handle_cache_stats(self):
+        return self.manager.get_cache_stats()
+
+
+def serve_connection(conn, server: ShardServer):
+    """Answer (method, args) requests on one connection until it closes."""
+    while True:
+        try:
+            method, args = conn.recv()
+        except (EOFError, OSError):
+            break
+        try:
+            conn.send(("ok", getattr(server, f"handle_{method}")(*args)))
+        except Exception as e:
+            conn.send(("error", e))
+    conn.close()
+
+
+def serve_shard(address, authkey: bytes, data_dir: str, store_dir: str):
+    """Accept connections at address, one thread each, until stdin closes."""
+    manager = SessionManager(data_dir, store_dir=store_dir, live_sessions=[])
+    listener = Listener(address, authkey=authkey)
+
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return  # Listener closed
+            threading.Thread(target=serve_connection, args=(conn, ShardServer(manager)), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    # The starting process holds the other end of stdin; EOF means it exited or stopped the shard
+    sys.stdin.buffer.read()
+    listener.close()
+
+
+class ShardProcess:
+    """A shard process started by this process; start() again to respawn it."""
+
+    def __init__(self, address, authkey: bytes, data_dir: str, store_dir: str):
+        self.address = address
+        self.authkey = authkey
+        self.data_dir = data_dir
+        self.store_dir = store_dir
+        self.process = None
+        self.start()
+
+    def start(self):
+        env = {**os.environ, "WORDCLOUD_SHARD_AUTHKEY": self.authkey.hex()}
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__),
+             "--address", json.dumps(self.address),
+             "--data-dir", self.data_dir,
+             "--store-dir", self.store_dir or ""],
+            env=env, stdin=subprocess.PIPE,
+        )
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ShardClient:
+    """
+    This process's connection to one shard.
+
+    Connects on first use in each process (a connection inherited over a
+    fork stays with the parent) and tells the shard its sessions. A request
+    whose connection turns out broken, as when the shard died, is sent again
+    once over a new connection, waiting for the shard to be respawned.
+    """
+
+    def __init__(self, address, authkey: bytes, assigned: list):
+        self.address = address
+        self.authkey = authkey
+        self.assigned = assigned
+        self.lock = threading.Lock()  # One request in flight per connection
+        self.conn = None
+        self._pid = None  # Process that opened conn
+        self._request = None  # Last request sent, to send again after reconnecting
+
+    def _connect(self):
+        deadline = time.monotonic() + SHARD_CONNECT_TIMEOUT
+        while True:
+            try:
+                conn = Client(self.address, authkey=self.authkey)
+                break
+            except (OSError, EOFError):
+                # Not listening (yet): starting up, or being respawned
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Shard for {[n for _, n in self.assigned]} is not accepting connections")
+                time.sleep(0.1)
+        conn.send(("assign", (self.assigned,)))
+        status, value = conn.recv()
+        if status == "error":
+            conn.close()
+            raise value
+        self.conn, self._pid = conn, os.getpid()
+
+    def disconnect(self):
+        """Drop this process's connection (the next request reconnects)."""
+        if self.conn is not None and self._pid == os.getpid():
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+        self.conn = None
+
+    def send(self, method: str, *args):
+        self._request = (method, args)
+        if self._pid != os.getpid():
+            self.conn = None
+        if self.conn is None:
+            return  # recv() connects and sends it
+        try:
+            self.conn.send(self._request)
+        except (OSError, EOFError):
+            self.disconnect()
+
+    def recv(self):
+        try:
+            if self.conn is None:
+                raise EOFError
+            status, value = self.conn.recv()
+        except (OSError, EOFError):
+            # Not connected yet, or the shard went away: queries only read, so ask again
+            self.disconnect()
+            self._connect()
+            self.conn.send(self._request)
+            status, value = self.conn.recv()
+        if status == "error":
+            raise value
+        return value
+
+    def call(self, method: str, *args):
+        with self.lock:
+            self.send(method, *args)
+            return self.recv()
+
+    def close(self):
+        with self.lock:
+            self.disconnect()
+
+
+class ShardedSessionProxy:
+    """Stand-in for a SessionData that lives in a shard process."""
+
+    def __init__(self, manager, session_name: str):
+        self.manager = manager
+        self.session_name = session_name
+
+    def _call(self, method: str, *args):
+        return self.manager._shard_for(self.session_name).call(method, *args)
+
+    @property
+    def speakers(self) -> dict:
+        return self._call("speakers", self.session_name)
+
+    @property
+    def word_stats(self) -> dict:
+        return self._call("word_stats", self.session_name)
+
+    def vocabulary_size(self) -> int:
+        return self._call("vocabulary_size", self.session_name)
+
+    def get_filter_options(self) -> dict:
+        shard = self.manager._shard_for(self.session_name)
+        position = [name for _, name in shard.assigned].index(self.session_name)
+        return shard.call("filter_options")[position]
+
+    def get_filtered_frequencies(self, filters: dict = None, top_n: int = 100, grouping: str = None,
+                                 weighting: str = None) -> dict:
+        return self._call("session_frequencies", self.session_name, filters, top_n, grouping, weighting)
+
+    def get_utterance_total(self, filters: dict = None) -> int:
+        return self._call("utterance_total", self.session_name, filters)
+
+    def count_error(self, filters: dict = None):
+        return self._call("count_error", self.session_name, filters)
+
+    def get_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
+        return self._call("session_details", self.session_name, word, filters, grouping)
+
+    def group_members(self, word: str, grouping: str) -> list:
+        return self._call("group_members", self.session_name, word, grouping)
+
+    def get_participation_rows(self, filters: dict = None) -> tuple:
+        return self._call("participation_rows", self.session_name, filters)
+
+    def get_participation(self, filters: dict = None) -> dict:
+        return self._call("session_participation", self.session_name, filters)
+
+    def get_associations(self, word: str, filters: dict = None, top_n: int = 10) -> list:
+        return self._call("session_associations", self.session_name, word, filters, top_n)
+
+
+class ShardedSessionManager(SessionManager):
+    """
+    SessionManager that keeps sessions in local shard processes.
+
+    Shard processes start on first use. Under gunicorn --preload that is
+    the app import in the master, so all workers share one set of shards
+    (without --preload, each worker starts its own). Live sessions are not
+    tailed in this mode; they load as ordinary sessions.
+    """
+
+    def __init__(self, data_dir: str = None, store_dir: str = None, shards: int = 2):
+        self.shard_count = max(1, shards)
+        self._shards = []  # ShardClient per shard, in shard order
+        self._processes = []  # ShardProcess per shard, in the process that started them
+        self._owner_pid = None  # Process that started the shards
+        self._shards_lock = threading.Lock()
+        super().__init__(data_dir, store_dir=store_dir, live_sessions=[])
+
+    @staticmethod
+    def _assign(names: list, count: int) -> list:
+        """Round-robin [(global index, name)] lists for count shards."""
+        assignments = [[] for _ in range(count)]
+        for index, name in enumerate(names):
+            assignments[index % count].append((index, name))
+        return assignments
+
+    def refresh(self):
+        """Refresh the session list; reassign sessions to the shards if it changed."""
+        previous = self.get_session_list()
+        super().refresh()
+        names = self.get_session_list()
+        if previous == names or not self._shards:
+            return
+        with self._shards_lock:
+            for shard, assigned in zip(self._shards, self._assign(names, len(self._shards))):
+                with shard.lock:
+                    # The shard learns its new sessions when this process reconnects
+                    shard.assigned = assigned
+                    shard.disconnect()
+
+    def _ensure_shards(self) -> list:
+        with self._shards_lock:
+            if self._shards:
+                return self._shards
+
+            names = self.get_session_list()
+            assignments = self._assign(names, min(self.shard_count, max(len(names), 1)))
+            authkey = secrets.token_bytes(32)
+            if sys.platform == "win32":
+                prefix = rf"\\.\pipe\wordcloud-shard-{secrets.token_hex(8)}-"
+            else:
+                prefix = os.path.join(tempfile.mkdtemp(prefix="wordcloud-shards-"), "shard-")
+            addresses = [f"{prefix}{i}" for i in range(len(assignments))]
+
+            processes = [ShardProcess(address, authkey, self.data_dir, self.store_dir) for address in addresses]
+            shards = [ShardClient(address, authkey, assigned) for address, assigned in zip(addresses, assignments)]
+            try:
+                for shard in shards:
+                    shard.call("ping")  # Waits until the shard accepts connections
+            except Exception:
+                for process in processes:
+                    process.stop()
+                raise
+            self._shards, self._processes, self._owner_pid = shards, processes, os.getpid()
+            threading.Thread(target=self._supervise, args=(processes,), name="shard-supervisor", daemon=True).start()
+            return self._shards
+
+    def _supervise(self, processes: list):
+        """Respawn shards that exit, until they are closed (runs in the starting process only)."""
+        while self._processes is processes:
+            for index, process in enumerate(processes):
+                if not process.alive() and self._processes is processes:
+                    logger.warning("Shard %d exited with code %s; restarting it", index, process.process.returncode)
+                    process.start()
+            time.sleep(SHARD_SUPERVISE_SECONDS)
+
+    def _shard_for(self, session_name: str) -> ShardClient:
+        for shard in self._ensure_shards():
+            if any(name == session_name for _, name in shard.assigned):
+                return shard
+        raise ValueError(f"Session not found: {session_name}")
+
+    def scatter(self, method: str, *args) -> list:
+        """Send one request to every shard in parallel and gather the replies in shard order."""
+        shards = self._ensure_shards()
+        for shard in shards:  # Locks always taken in shard order, so no deadlock
+            shard.lock.acquire()
+        try:
+            for shard in shards:
+                shard.send(method, *args)
+            replies, error = [], None
+            for shard in shards:
+                try:
+                    replies.append(shard.recv())
+                except Exception as e:
+                    error = error or e
+            if error is not None:
+                raise error
+            return replies
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+    def close(self):
+        """Drop this process's shard connections, and stop the shards if it started them."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.close()
+            if self._owner_pid == os.getpid():
+                processes, self._processes = self._processes, []
+                for process in processes:
+                    process.stop()
+            self._shards = []
+            self._owner_pid = None
+
+    def get_session(self, session_name: str) -> ShardedSessionProxy:
+        self._shard_for(session_name)
+        return ShardedSessionProxy(self, session_name)
+
+    def preload(self):
+        """Start the shards and have each load its sessions."""
+        self.scatter("filter_options")
+
+    def get_cache_stats(self) -> dict:
+        stats = {"loaded_sessions": 0, "resident_bytes": 0, "evictions": 0, "vocabulary": {}, "caches": {}}
+        if not self._shards:
+            return stats
+        for shard_stats in self.scatter("cache_stats"):
+            for key in ["loaded_sessions", "resident_bytes", "evictions"]:
+                stats[key] += shard_stats[key]
+            stats["vocabulary"].update(shard_stats["vocabulary"])
+            for cache, size in shard_stats["caches"].items():
+                stats["caches"][cache] = stats["caches"].get(cache, 0) + size
+        stats["caches"]["shards"] = len(self._shards)
+        return stats
+
+    def get_merged_filter_options(self) -> dict:
+        merged = defaultdict(set)
+        for shard_options in self.scatter("filter_options"):
+            for options in shard_options:
+                for col, values in options.items():
+                    merged[col].update(values)
+        return {k: sorted(v) for k, v in merged.items()}
+
+    def get_merged_speakers(self) -> dict:
+        merged = {}
+        for name in self.get_session_list():
+            for speaker, meta in self.get_session(name).speakers.items():
+                merged[f"{name}:{speaker}"] = {**meta, "session": name}
+        return merged
+
+    def get_all_sessions(self) -> list:
+        return [self.get_session(name) for name in self.get_session_list()]
+
+    def get_merged_frequencies(self, filters: dict = None, top_n: int = 100, grouping: str = None,
+                               checkpoint=None, weighting: str = None) -> dict:
+        """
+        Exact "All Sessions" top-N via three-phase scatter/gather (TPUT).
+
+        checkpoint, if given, is called between phases and may raise to stop.
+        """
+        if top_n <= 0:
+            return {}
+        checkpoint = checkpoint or (lambda: None)
+
+        with observe_stage("shard_gather"):
+            # Phase 1: local top-k lower bounds
+            lower = defaultdict(int)
+            for partial in self.scatter("partial_top", filters, top_n, grouping, weighting):
+                for word, count in partial:
+                    lower[word] += count
+            bounds = sorted(lower.values(), reverse=True)
+            tau = bounds[top_n - 1] if len(bounds) >= top_n else 0
+            checkpoint()
+
+            # Phase 2: every word that could reach tau
+            candidates = set(lower)
+            for words in self.scatter("partial_above", filters, tau / len(self._shards), grouping, weighting):
+                candidates.update(words)
+            checkpoint()
+
+            # Phase 3: exact totals for the candidates
+            totals = defaultdict(int)
+            tiebreaks = {}
+            candidates = sorted(candidates)
+            for partial in self.scatter("partial_counts", filters, candidates, grouping, weighting):
+                for word, (count, tiebreak) in partial.items():
+                    totals[word] += count
+                    tiebreaks[word] = min(tiebreaks.get(word, tiebreak), tiebreak)
+
+        ranked = sorted(
+            (w for w in candidates if totals[w] > 0),
+            key=lambda w: (-totals[w], tiebreaks[w])
+        )[:top_n]
+        if not grouping:
+            return {w: totals[w] for w in ranked}
+        forms = self.get_group_forms(ranked, filters, grouping, weighting)
+        return {pick_group_label(forms[key]): totals[key] for key in ranked}
+
+    def get_group_forms(self, keys: list, filters: dict, grouping: str, weighting: str = None) -> dict:
+        forms = defaultdict(dict)
+        for shard_forms in self.scatter("group_forms", keys, filters, grouping, weighting):
+            for key, key_forms in shard_forms.items():
+                for form, (count, tiebreak) in key_forms.items():
+                    total, first = forms[key].get(form, (0, tiebreak))
+                    forms[key][form] = (total + count, min(first, tiebreak))
+        return dict(forms)
+
+    def get_merged_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
+        if grouping:
+            return super().get_merged_word_details(word, filters, grouping)
+
+        parts = []
+        for shard_parts in self.scatter("word_details", word, filters):
+            parts.extend(shard_parts)
+        parts.sort(key=lambda p: p[0])
+        filtered = bool(filters) and any(filters.values())
+        return merge_session_details([(name, details) for _, name, details in parts], filtered)
+
+    def get_word_suggestions(self, text: str, session_name: str = None, filters: dict = None,
+                             limit: int = None) -> list:
+        """
+        Suggestions gathered from the shards.
+
+        For "All Sessions", each shard proposes its own best candidates and
+        their exact totals are then summed across shards, so counts are exact
+        but a word that is only frequent in aggregate may be missed.
+        """
+        if limit is None:
+            limit = SUGGEST_LIMIT
+        if session_name and session_name != "all":
+            return self._shard_for(session_name).call("word_suggestions", text, session_name, filters, limit)
+
+        distances = {}
+        for suggestions in self.scatter("word_suggestions", text, None, filters, limit):
+            for s in suggestions:
+                distances[s["word"]] = min(distances.get(s["word"], s["distance"]), s["distance"])
+
+        totals = defaultdict(int)
+        for partial in self.scatter("partial_counts", filters, sorted(distances)):
+            for word, (count, _) in partial.items():
+                totals[word] += count
+
+        merged = [{"word": w, "count": totals[w], "distance": d} for w, d in distances.items()]
+        # Prefix matches (distance 0) first by count, then typos by closeness
+        merged.sort(key=lambda s: (s["distance"], -s["count"], s["word"]))
+        return merged[:limit]
+
+    def get_merged_associations(self, word: str, filters: dict = None, top_n: int = 10) -> list:
+        counts = merge_association_counts(self.scatter("association_counts", word, filters))
+        candidates = sorted(w for w, c in counts["pairs"].items() if c >= COOCCURRENCE_MIN_COUNT)
+        other_counts = defaultdict(int)
+        for partial in self.scatter("partial_counts", filters, candidates):
+            for other, (count, _) in partial.items():
+                other_counts[other] += count
+        return rank_associations(
+            counts["pairs"], counts["word_count"], other_counts,
+            counts["total_tokens"], counts["total_pairs"], top_n
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one query shard (started by ShardedSessionManager).")
+    parser.add_argument("--address", required=True, help="JSON-encoded address to listen at")
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--store-dir", default="")
+    args = parser.parse_args()
+
+    address = json.loads(args.address)
+    authkey = bytes.fromhex(os.environ["WORDCLOUD_SHARD_AUTHKEY"])
+    if not address.startswith("\\\\") and os.path.exists(address):
+        os.unlink(address)  # Socket left behind by a shard that died
+    serve_shard(address, authkey, args.data_dir, args.store_dir or None)
+
+
+if __name__ == "__main__":
+    main()
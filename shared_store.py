@@ -0,0 +1,296 @@
+"""
+Shared, memory-mapped session store for multi-worker deployments.
+
+Each session's word statistics are compiled once into flat NumPy arrays
+(a sorted vocabulary plus a word x speaker count matrix in CSR layout) and
+written to disk. Workers open them with ``mmap_mode="r"``, so every gunicorn
+worker reads the same page-cache pages instead of holding its own copy of
+the nested ``word_stats`` dicts and the raw word list.
+
+Files per session, under ``<store_dir>/<session_name>/``:
+- vocab.npy:   sorted vocabulary (fixed-width unicode)
+- rank.npy:    first-occurrence rank of each vocabulary entry
+- indptr.npy:  CSR row pointers into indices/counts
+- indices.npy: speaker index for each non-zero count
+- counts.npy:  occurrence count for each (word, speaker) pair
+- cooc_*.npy:  the session's co-occurrence index (see cooccurrence.py)
+- utt_*.npy:   the session's utterance counts and table (see utterances.py)
+- meta.json:   speakers, columns, speaker names, participation totals,
+               source fingerprint and store format
+"""
+import os
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex, INDEX_ARRAY_NAMES
+from data_processor import SessionData, RankedCounts, estimate_footprint, combine_word_details, empty_word_details
+from participation import ParticipationStats
+from utterances import UtteranceIndex, UTTERANCE_ARRAY_NAMES
+from metrics import timed_stage
+
+ARRAY_NAMES = ["vocab", "rank", "indptr", "indices", "counts"]
+
+# Bumped when the set of files changes; older stores are recompiled
+STORE_FORMAT = 4
+
+# Metadata keys that identify a speaker rather than describe them
+IDENTITY_KEYS = ["speaker_id", "name"]
+
+
+def compile_session_arrays(word_stats: dict) -> tuple:
+    """
+    Convert a word_stats dict into (speaker_names, arrays).
+
+    Vocabulary is sorted for binary-search lookup; rank keeps the original
+    dict order so frequency ties break exactly like the dict-based path.
+    """
+    speaker_names = []
+    speaker_index = {}
+    for stats in word_stats.values():
+        for speaker in stats["speakers"]:
+            if speaker not in speaker_index:
+                speaker_index[speaker] = len(speaker_names)
+                speaker_names.append(speaker)
+
+    words = list(word_stats.keys())
+    order = sorted(range(len(words)), key=lambda i: words[i])
+
+    indptr = [0]
+    indices = []
+    counts = []
+    for i in order:
+        for speaker, count in word_stats[words[i]]["speakers"].items():
+            indices.append(speaker_index[speaker])
+            counts.append(count)
+        indptr.append(len(indices))
+
+    max_len = max((len(w) for w in words), default=1)
+    arrays = {
+        "vocab": np.array([words[i] for i in order], dtype=f"<U{max_len}"),
+        "rank": np.array(order, dtype=np.int32),
+        "indptr": np.array(indptr, dtype=np.int64),
+        "indices": np.array(indices, dtype=np.int32),
+        "counts": np.array(counts, dtype=np.int32),
+    }
+    return speaker_names, arrays
+
+
+def write_session_store(session: SessionData, session_dir: str, source_version: str):
+    """
+    Write a session's compiled arrays to session_dir.
+
+    Files are written under temporary names and renamed into place, with
+    meta.json last, so concurrent readers never see a partial store.
+    """
+    os.makedirs(session_dir, exist_ok=True)
+    speaker_names, arrays = compile_session_arrays(session.word_stats)
+    arrays.update(session.cooccurrence.arrays())
+    arrays.update(session.utterances.arrays())
+    suffix = f".tmp{os.getpid()}"
+
+    for name, array in arrays.items():
+        path = os.path.join(session_dir, f"{name}.npy")
+        with open(path + suffix, "wb") as f:
+            np.save(f, array)
+        os.replace(path + suffix, path)
+
+    meta = {
+        "session_name": session.session_name,
+        "source_version": source_version,
+        "speakers": session.speakers,
+        "columns": session.columns,
+        "speaker_names": speaker_names,
+        "cooccurrence_speakers": session.cooccurrence.speaker_names,
+        "utterance_speakers": session.utterances.speaker_names,
+        "participation": session.participation.to_dict(),
+        "format": STORE_FORMAT,
+    }
+    meta_path = os.path.join(session_dir, "meta.json")
+    with open(meta_path + suffix, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(meta_path + suffix, meta_path)
+
+
+def read_store_version(session_dir: str) -> str:
+    """Return the source fingerprint of a compiled store, or None if absent or outdated."""
+    try:
+        with open(os.path.join(session_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if meta.get("format") != STORE_FORMAT:
+        return None
+    return meta.get("source_version")
+
+
+class MappedSessionData(SessionData):
+    """
+    Read-only SessionData backed by memory-mapped compiled arrays.
+
+    Offers the same query methods as SessionData. The raw word list is not
+    kept; word_stats is rebuilt on access for callers that still need the
+    full dict (such as the merged "All Sessions" path).
+    """
+
+    def __init__(self, session_name: str, session_dir: str, json_path: str = None, csv_path: str = None):
+        self.session_name = session_name
+        self.json_path = json_path
+        self.csv_path = csv_path
+        self.session_dir = session_dir
+
+        with open(os.path.join(session_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.speakers = meta["speakers"]
+        self.columns = meta["columns"]
+        self.speaker_names = meta["speaker_names"]
+        self.participation = ParticipationStats.from_dict(meta["participation"])
+
+        arrays = {
+            name: np.load(os.path.join(session_dir, f"{name}.npy"), mmap_mode="r")
+            for name in ARRAY_NAMES + INDEX_ARRAY_NAMES + UTTERANCE_ARRAY_NAMES
+        }
+        self.vocab = arrays["vocab"]
+        self.rank = arrays["rank"]
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.counts = arrays["counts"]
+        self.cooccurrence = CooccurrenceIndex(
+            arrays["cooc_indptr"], arrays["cooc_other"], arrays["cooc_speaker"],
+            arrays["cooc_count"], arrays["cooc_pair_totals"], meta["cooccurrence_speakers"]
+        )
+        self.utterances = UtteranceIndex(
+            *(arrays[name] for name in UTTERANCE_ARRAY_NAMES), meta["utterance_speakers"]
+        )
+        self._init_query_caches()
+
+    @property
+    def word_stats(self) -> dict:
+        """Rebuild the full word_stats dict (in original order) from the arrays."""
+        result = {}
+        for i in np.argsort(self.rank, kind="stable"):
+            result[str(self.vocab[i])] = self._row_stats(int(i), None)
+        return result
+
+    def vocabulary_size(self) -> int:
+        """Number of distinct (non-stop) words in the session."""
+        return len(self.vocab)
+
+    def vocabulary(self) -> list:
+        """Distinct (non-stop) words in the session."""
+        return self.vocab.tolist()
+
+    def data_footprint(self) -> int:
+        """Bytes of mapped arrays plus speaker metadata (mapped pages are reclaimable)."""
+        arrays = [self.vocab, self.rank, self.indptr, self.indices, self.counts]
+        mapped = sum(a.nbytes for a in arrays) + self.cooccurrence.nbytes() + self.utterances.nbytes()
+        return mapped + estimate_footprint(self.speakers)
+
+    def _speaker_mask(self, filters: dict):
+        """Boolean mask over speaker_names for the filter, or None if unfiltered."""
+        return self._mask_for(self.resolve_speakers(filters))
+
+    def _mask_for(self, matching):
+        if matching is None:
+            return None
+        return np.array([name in matching for name in self.speaker_names], dtype=bool)
+
+    def _row_stats(self, row: int, mask) -> dict:
+        """Build a word_stats entry for one vocabulary row."""
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        speakers = {}
+        metadata = defaultdict(lambda: defaultdict(int))
+
+        for idx, count in zip(self.indices[start:end].tolist(), self.counts[start:end].tolist()):
+            if mask is not None and not mask[idx]:
+                continue
+            name = self.speaker_names[idx]
+            speakers[name] = count
+            if name in self.speakers:
+                for key, value in self.speakers[name].items():
+                    if key not in IDENTITY_KEYS and value:
+                        metadata[key][value] += count
+
+        return {
+            "total_count": sum(speakers.values()),
+            "speaker_count": len(speakers),
+            "speakers": speakers,
+            "metadata": {k: dict(v) for k, v in metadata.items()}
+        }
+
+    def _lookup(self, word: str):
+        """Return the vocabulary row for word, or None."""
+        if len(self.vocab) == 0:
+            return None
+        row = int(np.searchsorted(self.vocab, word))
+        if row < len(self.vocab) and self.vocab[row] == word:
+            return row
+        return None
+
+    def word_rank(self, word: str):
+        """Position of word in the original word_stats order (None if absent)."""
+        row = self._lookup(word)
+        return None if row is None else int(self.rank[row])
+
+    def word_at(self, rank: int) -> str:
+        """Word at a position in the original word_stats order."""
+        if self._words_by_rank is None:
+            self._words_by_rank = np.argsort(self.rank, kind="stable")
+        return str(self.vocab[self._words_by_rank[rank]])
+
+    @timed_stage("filter")
+    def _compute_ranked_counts(self, matching) -> RankedCounts:
+        """Filtered totals for every word, computed on the arrays."""
+        if len(self.vocab) == 0:
+            return RankedCounts([], [], lambda word: 0)
+
+        mask = self._mask_for(matching)
+        counts = self.counts if mask is None else self.counts * mask[self.indices]
+        totals = np.add.reduceat(counts, self.indptr[:-1])
+
+        nonzero = np.flatnonzero(totals)
+        # Sort by count descending, then first-occurrence rank (matches dict order)
+        order = nonzero[np.lexsort((self.rank[nonzero], -totals[nonzero]))]
+
+        def lookup(word):
+            row = self._lookup(word)
+            return 0 if row is None else int(totals[row])
+
+        return RankedCounts(self.vocab[order], totals[order], lookup)
+
+    def get_word_details(self, word: str, filters: dict = None, grouping: str = None) -> dict:
+        """Get detailed stats for a specific word by reading only its row."""
+        if grouping:
+            members = self.group_members(word, grouping)
+            return combine_word_details({m: self.get_word_details(m, filters) for m in members})
+
+        row = self._lookup(word.lower())
+        if row is not None:
+            stats = self._row_stats(row, self._speaker_mask(filters))
+            if stats["total_count"]:
+                return stats
+
+        return empty_word_details()
+
+
+def load_mapped_session(info: dict, store_dir: str, source_version: str) -> MappedSessionData:
+    """
+    Open a session from the shared store, compiling it first if missing or stale.
+    """
+    session_dir = str(Path(store_dir) / info["name"])
+    if read_store_version(session_dir) != source_version:
+        session = SessionData(
+            session_name=info["name"],
+            json_path=info["json_path"],
+            csv_path=info["csv_path"]
+        )
+        write_session_store(session, session_dir, source_version)
+
+    return MappedSessionData(
+        session_name=info["name"],
+        session_dir=session_dir,
+        json_path=info["json_path"],
+        csv_path=info["csv_path"]
+    )
@@ -0,0 +1,158 @@
+"""
+Client render-time telemetry.
+
+Server metrics stop when the cloud document leaves the server; what users
+wait for is the iframe loading, the d3 scripts arriving from the CDN, the
+d3-cloud layout and the first paint. The cloud document (see
+wordcloud_generator.rendered_script) times those in the browser and sends a
+small JSON report to TELEMETRY_PATH with navigator.sendBeacon:
+
+    {"renderer": "svg", "max_words": 50, "words": 50, "placed": 47,
+     "head_share": 0.41, "load_ms": 180.2, "fetch_ms": 95.0,
+     "layout_ms": 62.4, "paint_ms": 8.1, "total_ms": 251.0}
+
+Reports are aggregated into /metrics per configuration: renderer, max_words
+and a bucket of the cloud's frequency distribution (head_share, the share
+of the total frequency held by the top tenth of the words; steep clouds have
+a few large words, flat ones many, which are harder to place). Like the
+other metrics they are per process.
+"""
+import json
+
+from flask import Blueprint, Response, request
+
+from config import TELEMETRY_PATH, TELEMETRY_MAX_CONFIGS, TELEMETRY_MAX_BYTES
+from metrics import REGISTRY, Registry
+
+RENDERERS = ["svg", "canvas"]
+
+# Phases timed in the browser; load is document start to layout start (so
+# includes the d3 downloads for SVG clouds), total is document start to paint
+PHASES = ["load", "fetch", "layout", "paint", "total"]
+
+# Upper bounds of the head_share buckets used as a label
+HEAD_SHARE_BUCKETS = (0.25, 0.5, 0.75, 1.0)
+
+# Browser-side durations are slower than the server's stages
+CLIENT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+MAX_WORDS_LIMIT = 100_000
+MAX_DURATION_MS = 600_000  # Longer phases are dropped as bogus (e.g. a tab asleep mid-render)
+
+
+def head_share_bucket(share: float) -> str:
+    """Label for a head_share value: the upper bound of its bucket."""
+    for bound in HEAD_SHARE_BUCKETS:
+        if share <= bound:
+            return str(bound)
+    return str(HEAD_SHARE_BUCKETS[-1])
+
+
+def _integer(report: dict, key: str, low: int, high: int) -> int:
+    value = report.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise ValueError(f"{key} must be an integer from {low} to {high}")
+    return value
+
+
+def parse_render_report(report) -> dict:
+    """
+    Validate a render report; raises ValueError if it is malformed.
+
+    Returns the configuration labels, the word counts, and the phase
+    durations in seconds (phases that are missing or out of range are left out).
+    """
+    if not isinstance(report, dict):
+        raise ValueError("Report must be a JSON object")
+    renderer = report.get("renderer")
+    if renderer not in RENDERERS:
+        raise ValueError(f"renderer must be one of {RENDERERS}")
+    max_words = _integer(report, "max_words", 1, MAX_WORDS_LIMIT)
+    words = _integer(report, "words", 0, MAX_WORDS_LIMIT)
+    placed = _integer(report, "placed", 0, words)
+
+    share = report.get("head_share")
+    if isinstance(share, bool) or not isinstance(share, (int, float)) or not 0 <= share <= 1:
+        raise ValueError("head_share must be a number from 0 to 1")
+
+    durations = {}
+    for phase in PHASES:
+        value = report.get(f"{phase}_ms")
+        if not isinstance(value, bool) and isinstance(value, (int, float)) and 0 <= value <= MAX_DURATION_MS:
+            durations[phase] = value / 1000
+
+    return {
+        "labels": {"renderer": renderer, "max_words": str(max_words), "head_share": head_share_bucket(share)},
+        "placed": placed,
+        "dropped": words - placed,
+        "durations": durations,
+    }
+
+
+class RenderTelemetry:
+    """Aggregates browser render reports into metrics, per configuration."""
+
+    def __init__(self, registry: Registry = REGISTRY, max_configs: int = TELEMETRY_MAX_CONFIGS):
+        labels = ("renderer", "max_words", "head_share")
+        self.durations = registry.histogram(
+            "wordcloud_client_render_seconds",
+            "Browser-side cloud render phases (load, fetch, layout, paint, total).",
+            labels + ("phase",), buckets=CLIENT_BUCKETS,
+        )
+        self.words = registry.counter(
+            "wordcloud_client_words_total",
+            "Words given to the browser layout, by whether d3-cloud placed or dropped them.",
+            labels + ("outcome",),
+        )
+        self.rejected = registry.counter(
+            "wordcloud_client_reports_rejected_total",
+            "Render reports not recorded (malformed, or too many configurations).",
+            ("reason",),
+        )
+        self.max_configs = max_configs
+        # Bounds the label sets clients can create; a set is only ever added
+        # to, so a racing duplicate add is harmless
+        self._configs = set()
+
+    def record(self, report) -> bool:
+        """Record one report; returns False if it was rejected."""
+        try:
+            parsed = parse_render_report(report)
+        except ValueError:
+            self.rejected.inc(reason="invalid")
+            return False
+
+        labels = parsed["labels"]
+        key = tuple(labels.values())
+        if key not in self._configs:
+            if len(self._configs) >= self.max_configs:
+                self.rejected.inc(reason="configs")
+                return False
+            self._configs.add(key)
+
+        for phase, seconds in parsed["durations"].items():
+            self.durations.observe(seconds, phase=phase, **labels)
+        self.words.inc(parsed["placed"], outcome="placed", **labels)
+        self.words.inc(parsed["dropped"], outcome="dropped", **labels)
+        return True
+
+
+def create_telemetry_blueprint(telemetry: RenderTelemetry) -> Blueprint:
+    """Create the blueprint accepting render reports at TELEMETRY_PATH."""
+    collect = Blueprint("telemetry", __name__)
+
+    @collect.route(TELEMETRY_PATH, methods=["POST"])
+    def render_report():
+        # sendBeacon posts text/plain (no CORS preflight), so the body is parsed as-is
+        if (request.content_length or 0) > TELEMETRY_MAX_BYTES:
+            telemetry.rejected.inc(reason="invalid")
+            return {"error": "Report too large"}, 413
+        try:
+            report = json.loads(request.get_data(cache=False))
+        except ValueError:
+            report = None
+        if not telemetry.record(report):
+            return {"error": "Report not recorded"}, 400
+        return Response(status=204)
+
+    return collect
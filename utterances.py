@@ -0,0 +1,138 @@
+"""
+Utterance counts: how many distinct utterances contain each word.
+
+A raw count lets one speaker repeating a word twenty times in one answer
+outweigh ten people who each said it once. Weighting the cloud by
+utterances counts each word at most once per utterance instead, where an
+utterance is one speaker's words within one transcript segment (for word
+lines without a segment number, a run of words by the same speaker).
+
+Built once per session at load time from the counted words, in one
+vectorized pass:
+- the utterance table: one row per utterance (segment, speaker, counted
+  words), from the distinct (segment, speaker) pairs
+- a sparse CSR matrix over word ids (positions in the session's word_stats
+  order) of (speaker, utterances containing the word) pairs, from the
+  distinct (word, utterance) pairs
+
+Speaker filters select whole utterances, so a filtered total is a masked
+row sum, exactly like the word x speaker count matrix of shared_store.
+"""
+import numpy as np
+
+UTTERANCE_ARRAY_NAMES = [
+    "utt_indptr", "utt_speaker", "utt_count", "utt_table_segment", "utt_table_speaker", "utt_table_words",
+]
+
+# Cloud weightings: raw occurrences, or distinct utterances containing the word
+WEIGHTING_MODES = ["mentions", "utterances"]
+
+
+class UtteranceIndex:
+    """Per-word utterance counts by speaker, plus the session's utterance table."""
+
+    def __init__(self, indptr, speaker, count, table_segment, table_speaker, table_words, speaker_names: list):
+        self.indptr = indptr  # Row pointers, one row per word id
+        self.speaker = speaker  # Speaker index into speaker_names
+        self.count = count  # Utterances by that speaker containing the row word
+        self.table_segment = table_segment  # Per utterance: transcript segment
+        self.table_speaker = table_speaker  # Per utterance: speaker index
+        self.table_words = table_words  # Per utterance: counted words in it
+        self.speaker_names = speaker_names
+
+    def arrays(self) -> dict:
+        """Arrays for persisting the index (see shared_store)."""
+        return {
+            "utt_indptr": self.indptr,
+            "utt_speaker": self.speaker,
+            "utt_count": self.count,
+            "utt_table_segment": self.table_segment,
+            "utt_table_speaker": self.table_speaker,
+            "utt_table_words": self.table_words,
+        }
+
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays().values())
+
+    def speaker_mask(self, matching):
+        """Boolean mask over speaker_names for a matching set (None = everyone)."""
+        if matching is None:
+            return None
+        return np.array([name in matching for name in self.speaker_names], dtype=bool)
+
+    def totals(self, matching) -> np.ndarray:
+        """Utterances containing each word id, by matching speakers."""
+        count = np.asarray(self.count, dtype=np.int64)
+        mask = self.speaker_mask(matching)
+        if mask is not None:
+            count = count * mask[np.asarray(self.speaker)]
+        # Differences of the running sum give row sums, also for empty rows
+        running = np.concatenate([[0], np.cumsum(count)])
+        indptr = np.asarray(self.indptr)
+        return running[indptr[1:]] - running[indptr[:-1]]
+
+    def total_utterances(self, matching) -> int:
+        """Utterances (with at least one counted word) by matching speakers."""
+        mask = self.speaker_mask(matching)
+        if mask is None:
+            return len(self.table_speaker)
+        return int(mask[np.asarray(self.table_speaker)].sum())
+
+
+def build_utterance_index(counted, word_ids: dict) -> UtteranceIndex:
+    """
+    Build the utterance index from a session's counted words.
+
+    counted is a sequence of (word, speaker, segment), as produced by
+    data_processor.counted_words; word_ids maps each word to its id (its
+    position in word_stats).
+    """
+    speaker_index = {}
+    tokens, speakers, segments = [], [], []
+    for word, speaker, segment in counted:
+        word_id = word_ids.get(word)
+        if word_id is None:
+            continue
+        tokens.append(word_id)
+        speakers.append(speaker_index.setdefault(speaker, len(speaker_index)))
+        segments.append(segment)
+
+    return utterance_index_from_tokens(
+        np.array(tokens, dtype=np.int64), np.array(speakers, dtype=np.int64), np.array(segments, dtype=np.int64),
+        list(speaker_index), max(word_ids.values(), default=-1) + 1,
+    )
+
+
+def utterance_index_from_tokens(tokens, speakers, segments, speaker_names: list, vocab_size: int) -> UtteranceIndex:
+    """
+    The vectorized part of build_utterance_index.
+
+    tokens, speakers and segments are parallel int64 arrays (word id, speaker
+    index into speaker_names, segment) with one entry per counted word.
+    """
+    n_speakers = max(len(speaker_names), 1)
+
+    # The utterance table: distinct (segment, speaker) pairs
+    keys, utterance_of, table_words = np.unique(segments * n_speakers + speakers, return_inverse=True,
+                                                return_counts=True)
+    table_speaker = keys % n_speakers
+    n_utterances = max(len(keys), 1)
+
+    # Distinct (word, utterance) pairs, then how many per (word, speaker)
+    pairs = np.unique(tokens * n_utterances + utterance_of.reshape(-1))
+    pair_speaker = table_speaker[pairs % n_utterances]
+    unique, count = np.unique((pairs // n_utterances) * n_speakers + pair_speaker, return_counts=True)
+
+    row = unique // n_speakers
+    indptr = np.searchsorted(row, np.arange(vocab_size + 1)).astype(np.int64)
+    speaker_dtype = np.int16 if n_speakers < 2**15 else np.int32
+
+    return UtteranceIndex(
+        indptr=indptr,
+        speaker=(unique % n_speakers).astype(speaker_dtype),
+        count=count.astype(np.int32),
+        table_segment=(keys // n_speakers).astype(np.int64),
+        table_speaker=table_speaker.astype(speaker_dtype),
+        table_words=table_words.astype(np.int32),
+        speaker_names=speaker_names,
+    )
@@ -0,0 +1,133 @@
+"""
+Background cache warm-up and readiness reporting.
+
+After startup, a daemon thread runs a list of warm-up steps: loading every
+session, building the lookup indexes, and computing the default "All
+Sessions" cloud plus the most common filter combinations. The /ready
+endpoint reports progress and only answers 200 once every step is done,
+so a load balancer or health check can hold traffic until the hot paths
+are warm.
+
+A failed step is retried with backoff. A step that keeps failing (say, one
+corrupt transcript) is skipped and listed in errors, and the warm-up ends
+"degraded", which still answers 200: one bad session breaks its own view,
+not every deploy. Only a warm-up that cannot plan its steps at all stays 503.
+
+Threads do not survive a fork, so under gunicorn --preload the warm-up
+starts in each worker process on its first request (typically the health
+check) rather than in the master.
+"""
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify
+
+from config import WARMUP_RETRIES, WARMUP_RETRY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Runs named warm-up steps once per process in a background thread."""
+
+    def __init__(self, steps_factory, retries: int = WARMUP_RETRIES, retry_seconds: float = WARMUP_RETRY_SECONDS):
+        # steps_factory() -> list of (label, callable); called in the warm-up thread
+        self.steps_factory = steps_factory
+        self.retries = retries
+        self.retry_seconds = retry_seconds  # Wait before the first retry, doubled for each further one
+        self._lock = threading.Lock()
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        self.status = "pending"  # pending -> running -> ready | degraded (steps skipped) | failed
+        self.total = 0
+        self.completed = 0
+        self.current = None
+        self.errors = []
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        """Start the warm-up thread if it has not run in this process yet."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._reset()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _run(self):
+        self.started_at = time.time()
+        self.status = "running"
+        try:
+            steps = self.steps_factory()
+        except Exception as e:
+            logger.exception("Warm-up could not plan its steps")
+            self.errors.append({"step": "plan", "error": str(e)})
+            self.finished_at = time.time()
+            self.status = "failed"
+            return
+        self.total = len(steps)
+
+        for label, step in steps:
+            self.current = label
+            self._run_step(label, step)
+            self.completed += 1
+
+        self.current = None
+        self.finished_at = time.time()
+        self.status = "degraded" if self.errors else "ready"
+
+    def _run_step(self, label: str, step):
+        """Run one step, retrying with backoff; a step that keeps failing is recorded and skipped."""
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                if attempt < self.retries:
+                    delay = self.retry_seconds * 2 ** attempt
+                    logger.warning("Warm-up step failed: %s (%s); retrying in %.1f s", label, e, delay)
+                    time.sleep(delay)
+                    continue
+                logger.exception("Warm-up step failed, skipping it: %s", label)
+                self.errors.append({"step": label, "error": str(e), "attempts": attempt + 1})
+            else:
+                logger.info("Warm-up: %s (%.2f s)", label, time.perf_counter() - started)
+            return
+
+    @property
+    def ready(self) -> bool:
+        """Whether every step has run; skipped steps are listed in errors."""
+        return self.status in ("ready", "degraded")
+
+    def progress(self) -> dict:
+        """Snapshot of the warm-up state for /ready."""
+        finished = self.finished_at or time.time()
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "completed": self.completed,
+            "total": self.total,
+            "current": self.current,
+            "errors": list(self.errors),
+            "elapsed_s": round(finished - self.started_at, 3) if self.started_at else 0.0,
+            "pid": os.getpid(),
+        }
+
+
+def ready_view(warmup: Warmup):
+    """Flask view reporting warm-up progress: 200 once ready (or degraded), 503 until then."""
+    def view():
+        warmup.start()
+        progress = warmup.progress()
+        response = jsonify(progress)
+        response.status_code = 200 if progress["ready"] else 503
+        response.headers["Cache-Control"] = "no-store"
+        return response
+    return view
@@ -0,0 +1,132 @@
+"""
+Grouping of inflected word forms by stem or lemma.
+
+In a grouping mode, "contractor"/"contractors" or "build"/"building"/"builds"
+are counted as one entry instead of splitting their weight. Each distinct
+vocabulary word is stemmed or lemmatized once: results are cached in memory
+and persisted to LEMMA_CACHE_DIR as one JSON file per mode, so restarts and
+new sessions only process words never seen before. Switching modes at
+runtime re-aggregates existing counts; transcripts are never re-read.
+
+Modes:
+- "stem":  NLTK Porter stemmer (no corpus needed)
+- "lemma": NLTK WordNet lemmatizer (noun, then verb); needs the wordnet corpus
+"""
+import json
+import logging
+import os
+import threading
+
+import nltk
+from nltk.stem import PorterStemmer, WordNetLemmatizer
+
+from config import LEMMA_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+GROUPING_MODES = ["stem", "lemma"]
+
+
+def ensure_wordnet():
+    """Download the WordNet corpus if it is not already present."""
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        nltk.download('wordnet', quiet=True)
+        nltk.data.find('corpora/wordnet')  # Still missing: raise LookupError
+
+
+def make_normalizer(mode: str):
+    """Return a function mapping a word to its group key for mode."""
+    if mode == "stem":
+        return PorterStemmer().stem
+    if mode == "lemma":
+        ensure_wordnet()
+        lemmatizer = WordNetLemmatizer()
+
+        def lemmatize(word: str) -> str:
+            lemma = lemmatizer.lemmatize(word, pos="n")
+            return lemma if lemma != word else lemmatizer.lemmatize(word, pos="v")
+        return lemmatize
+    raise ValueError(f"Unknown grouping mode: {mode}")
+
+
+class FormMapper:
+    """Persistent word -> group key cache for one grouping mode."""
+
+    def __init__(self, mode: str, cache_dir: str = None):
+        self.mode = mode
+        self.path = os.path.join(cache_dir or LEMMA_CACHE_DIR, f"{mode}.json")
+        self._normalize = make_normalizer(mode)
+        self._lock = threading.Lock()
+        self._keys = self._read()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def _write(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._keys, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not persist %s mapping to %s: %s", self.mode, self.path, e)
+
+    def key(self, word: str, persist: bool = True) -> str:
+        """
+        Group key of a single word. With persist=False an unseen word is
+        normalized without being added to the mapping, for query words that
+        may not be in any vocabulary.
+        """
+        if not persist:
+            key = self._keys.get(word)
+            return self._normalize(word) if key is None else key
+        return self.keys([word])[word]
+
+    def keys(self, words) -> dict:
+        """Group keys for words, normalizing (and persisting) only unseen ones."""
+        words = list(words)
+        missing = [w for w in words if w not in self._keys]
+        if missing:
+            with self._lock:
+                added = {w: self._normalize(w) for w in missing if w not in self._keys}
+                if added:
+                    # Copy-on-write so lock-free readers never see a dict being resized
+                    self._keys = {**self._keys, **added}
+                    self._write()
+        keys = self._keys
+        return {w: keys[w] for w in words}
+
+
+_mappers = {}
+_unavailable = set()  # Modes whose NLTK data could not be found or downloaded
+_mappers_lock = threading.Lock()
+
+
+def get_form_mapper(mode: str) -> FormMapper:
+    """
+    Shared FormMapper for mode (created on first use).
+
+    Raises LookupError if the mode's NLTK data is missing; the download is
+    only attempted once per process.
+    """
+    mapper = _mappers.get(mode)
+    if mapper is None:
+        with _mappers_lock:
+            mapper = _mappers.get(mode)
+            if mapper is None:
+                if mode in _unavailable:
+                    raise LookupError(f"NLTK data for {mode} grouping is unavailable")
+                try:
+                    mapper = _mappers[mode] = FormMapper(mode)
+                except LookupError:
+                    _unavailable.add(mode)
+                    logger.warning("NLTK data for %s grouping is unavailable", mode)
+                    raise
+    return mapper
@@ -0,0 +1,174 @@
+"""
+As-you-type word suggestions: prefix autocomplete plus fuzzy (typo) lookup.
+
+Prefix matches come from a sorted vocabulary with bisect range search.
+Fuzzy matches use a symmetric-delete index: every word is indexed under
+each string reachable by deleting up to FUZZY_MAX_DISTANCE characters, so
+a query only generates its own deletes and verifies the few words sharing
+one of them, instead of comparing against the whole vocabulary. The delete
+strings are stored as sorted 64-bit hashes in NumPy arrays, which keeps
+the index to a few bytes per entry; hash collisions only add candidates
+that fail verification.
+
+Suggestions are ranked by filtered frequency, summed over the RankedCounts
+of the sessions in view.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+from config import SUGGEST_LIMIT, FUZZY_MAX_DISTANCE
+from data_processor import top_k_merge, estimate_footprint
+
+# Above this many prefix matches, scan the ranked lists instead of looking up each match
+PREFIX_LOOKUP_LIMIT = 2000
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent swaps).
+
+    Returns max_distance + 1 as soon as the distance is known to exceed it.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def deletes(word: str, max_distance: int) -> set:
+    """All strings reachable from word by deleting up to max_distance characters."""
+    result = level = {word}
+    for _ in range(max_distance):
+        level = {s[:i] + s[i + 1:] for s in level for i in range(len(s))}
+        result = result | level
+    return result
+
+
+class WordIndex:
+    """Sorted vocabulary with prefix search and a lazily built symmetric-delete index."""
+
+    def __init__(self, words, max_distance: int = None):
+        self.words = sorted(set(words))
+        self.max_distance = FUZZY_MAX_DISTANCE if max_distance is None else max_distance
+        self._delete_hashes = None  # Sorted hashes of every word's deletes, built on first fuzzy query
+        self._delete_positions = None  # Word position for each hash
+        self._words_bytes = estimate_footprint(self.words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def nbytes(self) -> int:
+        """Estimated memory held by the index (the delete index once built), in bytes."""
+        built = [a for a in [self._delete_hashes, self._delete_positions] if a is not None]
+        return self._words_bytes + sum(a.nbytes for a in built)
+
+    def prefix_range(self, prefix: str) -> tuple:
+        """(lo, hi) positions of the words starting with prefix."""
+        lo = bisect_left(self.words, prefix)
+        hi = bisect_left(self.words, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _build_delete_index(self):
+        hashes, positions = [], []
+        for position, word in enumerate(self.words):
+            keys = deletes(word, self.max_distance)
+            hashes.extend(hash(key) for key in keys)
+            positions.extend([position] * len(keys))
+
+        hashes = np.array(hashes, dtype=np.int64)
+        order = np.argsort(hashes, kind="stable")
+        self._delete_positions = np.array(positions, dtype=np.int32)[order]
+        self._delete_hashes = hashes[order]
+
+    def fuzzy_matches(self, word: str, max_distance: int = None) -> dict:
+        """Vocabulary words within max_distance edits of word -> their distance."""
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        if self._delete_hashes is None:
+            self._build_delete_index()
+
+        keys = np.array([hash(key) for key in deletes(word, max_distance)], dtype=np.int64)
+        lo = np.searchsorted(self._delete_hashes, keys, side="left")
+        hi = np.searchsorted(self._delete_hashes, keys, side="right")
+        positions = set()
+        for start, end in zip(lo.tolist(), hi.tolist()):
+            positions.update(self._delete_positions[start:end].tolist())
+
+        matches = {}
+        for position in positions:
+            candidate = self.words[position]
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches[candidate] = distance
+        return matches
+
+
+def allowed_edits(text: str) -> int:
+    """Typos tolerated for a word of this length: none below 3 letters, one below 6."""
+    if len(text) < 3:
+        return 0
+    return 1 if len(text) < 6 else FUZZY_MAX_DISTANCE
+
+
+def top_prefix_matches(index: WordIndex, ranked_lists: list, prefix: str, limit: int) -> dict:
+    """Most frequent words starting with prefix under the filters behind ranked_lists."""
+    lo, hi = index.prefix_range(prefix)
+    if hi - lo <= PREFIX_LOOKUP_LIMIT:
+        totals = {}
+        for word in index.words[lo:hi]:
+            total = sum(r.count(word) for r in ranked_lists)
+            if total:
+                totals[word] = total
+        best = sorted(totals, key=lambda w: (-totals[w], w))[:limit]
+        return {w: totals[w] for w in best}
+
+    # Short prefixes match much of the vocabulary: merge the filtered ranked lists instead
+    views = [r.with_prefix(prefix) for r in ranked_lists]
+    return top_k_merge(views, limit, lambda word: (bisect_left(index.words, word),))
+
+
+def suggest_words(index: WordIndex, ranked_lists: list, text: str, limit: int = None) -> list:
+    """
+    Suggestions for partially typed text.
+
+    Prefix matches are returned most frequent first. When nothing starts
+    with text, it is treated as a misspelling and the closest words are
+    suggested instead, nearest and most frequent first. Only words present
+    under the current filters are suggested.
+
+    Returns a list of {"word", "count", "distance"} dicts.
+    """
+    if limit is None:
+        limit = SUGGEST_LIMIT
+    text = text.strip().lower()
+    if not text or limit <= 0:
+        return []
+
+    suggestions = [
+        {"word": word, "count": int(count), "distance": 0}
+        for word, count in top_prefix_matches(index, ranked_lists, text, limit).items()
+    ]
+    max_distance = allowed_edits(text)
+    if suggestions or not max_distance:
+        return suggestions
+
+    fuzzy = []
+    for word, distance in index.fuzzy_matches(text, max_distance).items():
+        count = sum(r.count(word) for r in ranked_lists)
+        if count:
+            fuzzy.append({"word": word, "count": int(count), "distance": distance})
+    fuzzy.sort(key=lambda s: (s["distance"], -s["count"], s["word"]))
+    return fuzzy[:limit]
@@ -3,28 +3,41 @@ Word cloud generation module - JavaScript-based with d3-cloud.
 
 Uses d3-cloud library for browser-native layout, ensuring no overlap
 since the same environment calculates and renders the word positions.
+Small clouds are drawn as SVG; large ones are laid out in a Web Worker
+and drawn on a canvas (see resolve_renderer).
 """
 import json
-from config import WORDCLOUD_CONFIG
+from config import WORDCLOUD_CONFIG, TELEMETRY_PATH
+from metrics import timed_stage
 
 
-def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
-    """
-    Generate an interactive word cloud using d3-cloud.
+# Stands in for the words JSON in wordcloud_html_template
+WORDS_PLACEHOLDER = "__WORDCLOUD_WORDS__"
 
-    Returns an HTML document with embedded JavaScript that renders
-    the word cloud client-side, ensuring accurate font metrics.
-    """
-    if not word_frequencies:
-        return generate_empty_html()
+D3_URL = "https://d3js.org/d3.v7.min.js"
+D3_CLOUD_URL = "https://cdn.jsdelivr.net/npm/d3-cloud@1.2.7/build/d3.layout.cloud.min.js"
+
+# Custom brand color palette
+CLOUD_COLORS = [
+    "#4F3D63",  # Purple (brand primary)
+    "#C17F47",  # Orange/brown
+    "#47A68C",  # Teal
+    "#8C4747",  # Red/maroon
+    "#8C7A47",  # Olive/gold
+    "#476B8C",  # Steel blue
+    "#8C4776",  # Magenta/pink
+    "#5C8C47",  # Green
+    "#8C5C47",  # Brown
+    "#478C67",  # Green-teal
+]
 
+
+def wordcloud_words_data(word_frequencies: dict, config: dict = None) -> list:
+    """Top words with their font sizes, as passed to d3-cloud."""
     cfg = {**WORDCLOUD_CONFIG, **(config or {})}
-    width = cfg["width"]
-    height = cfg["height"]
     max_words = cfg["max_words"]
     min_font_size = cfg["min_font_size"]
     max_font_size = cfg["max_font_size"]
-    bg_color = cfg["background_color"]
 
     # Get top N words by frequency
     sorted_words = sorted(
@@ -34,7 +47,7 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
     )[:max_words]
 
     if not sorted_words:
-        return generate_empty_html()
+        return []
 
     # Calculate font size scaling
     max_freq = sorted_words[0][1]
@@ -52,23 +65,50 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
             "size": round(font_size, 1),
             "freq": freq
         })
+    return words_data
+
+
+@timed_stage("html")
+def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
+    """
+    Generate an interactive word cloud using d3-cloud.
+
+    Returns an HTML document with embedded JavaScript that renders
+    the word cloud client-side, ensuring accurate font metrics.
+    """
+    words_data = wordcloud_words_data(word_frequencies or {}, config)
+    if not words_data:
+        return generate_empty_html()
+    return render_wordcloud_html(json.dumps(words_data), config)
+
+
+def wordcloud_html_template(config: dict = None) -> str:
+    """The word cloud document with WORDS_PLACEHOLDER where the words JSON goes."""
+    return render_wordcloud_html(WORDS_PLACEHOLDER, config)
+
+
+def resolve_renderer(config: dict = None) -> str:
+    """The renderer ("svg" or "canvas") for a config; "auto" picks by max_words."""
+    cfg = {**WORDCLOUD_CONFIG, **(config or {})}
+    if cfg["renderer"] == "auto":
+        return "canvas" if cfg["max_words"] > cfg["canvas_min_words"] else "svg"
+    return cfg["renderer"]
+
 
-    words_json = json.dumps(words_data)
-
-    # Custom brand color palette
-    colors = [
-        "#4F3D63",  # Purple (brand primary)
-        "#C17F47",  # Orange/brown
-        "#47A68C",  # Teal
-        "#8C4747",  # Red/maroon
-        "#8C7A47",  # Olive/gold
-        "#476B8C",  # Steel blue
-        "#8C4776",  # Magenta/pink
-        "#5C8C47",  # Green
-        "#8C5C47",  # Brown
-        "#478C67",  # Green-teal
-    ]
-    colors_json = json.dumps(colors)
+def render_wordcloud_html(words_json: str, config: dict = None) -> str:
+    """The word cloud document for a JSON list of words_data entries."""
+    if resolve_renderer(config) == "canvas":
+        return render_canvas_html(words_json, config)
+    return render_svg_html(words_json, config)
+
+
+def render_svg_html(words_json: str, config: dict = None) -> str:
+    """Word cloud laid out by d3-cloud on the page and drawn as SVG."""
+    cfg = {**WORDCLOUD_CONFIG, **(config or {})}
+    width = cfg["width"]
+    height = cfg["height"]
+    bg_color = cfg["background_color"]
+    colors_json = json.dumps(CLOUD_COLORS)
 
     html = f'''<!DOCTYPE html>
 <html>
@@ -99,14 +139,16 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
 <body>
     <svg id="wordcloud"></svg>
 
-    <script src="https://d3js.org/d3.v7.min.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/d3-cloud@1.2.7/build/d3.layout.cloud.min.js"></script>
+    <script src="{D3_URL}"></script>
+    <script src="{D3_CLOUD_URL}"></script>
     <script>
         const words = {words_json};
         const colors = {colors_json};
         const width = {width};
         const height = {height};
 
+{rendered_script("svg", cfg)}
+
         // Set up SVG
         const svg = d3.select("#wordcloud")
             .attr("viewBox", [0, 0, width, height])
@@ -133,9 +175,11 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
             .spiral("archimedean")
             .on("end", draw);
 
+        layoutStarted();
         layout.start();
 
         function draw(words) {{
+            layoutFinished();
             g.selectAll("text")
                 .data(words)
                 .enter()
@@ -151,6 +195,221 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
                 .on("click", function(event, d) {{
                     window.parent.postMessage({{type: 'wordcloud-click', word: d.text}}, '*');
                 }});
+            rendered(words.length);
+        }}
+    </script>
+</body>
+</html>'''
+
+    return html
+
+
+def render_canvas_html(words_json: str, config: dict = None) -> str:
+    """
+    Word cloud laid out by d3-cloud in a Web Worker and drawn on a canvas.
+
+    The page stays responsive however many words there are. Clicks are
+    hit-tested against each word's glyph box and posted to the parent as
+    with the SVG renderer. Without Web Worker or OffscreenCanvas support,
+    the layout runs on the page in short steps instead.
+    """
+    cfg = {**WORDCLOUD_CONFIG, **(config or {})}
+    width = cfg["width"]
+    height = cfg["height"]
+    bg_color = cfg["background_color"]
+    colors_json = json.dumps(CLOUD_COLORS)
+
+    html = f'''<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        html, body {{
+            width: 100%;
+            height: 100%;
+        }}
+        body {{
+            background: {bg_color};
+            overflow: hidden;
+        }}
+        canvas {{
+            display: block;
+            width: 100%;
+            height: 100%;
+        }}
+    </style>
+</head>
+<body>
+    <canvas id="wordcloud"></canvas>
+
+    <script id="layout-worker" type="text/js-worker">
+        // d3-cloud layout, run in a Web Worker (or on the page as a fallback)
+        function layoutWords(words, width, height, canvas, interval, done) {{
+            d3.layout.cloud()
+                .size([width, height])
+                .canvas(canvas)
+                .words(words)
+                .padding(5)
+                .rotate(() => Math.random() > 0.8 ? 90 : 0)
+                .font("Impact")
+                .fontSize(d => d.size)
+                .spiral("archimedean")
+                .timeInterval(interval)
+                .on("end", placed => done(placed.map(d => ({{
+                    text: d.text, size: d.size, freq: d.freq, x: d.x, y: d.y, rotate: d.rotate
+                }}))))
+                .start();
+        }}
+
+        if (typeof importScripts === "function") {{
+            importScripts("{D3_CLOUD_URL}");
+            onmessage = event => layoutWords(event.data.words, event.data.width, event.data.height,
+                () => new OffscreenCanvas(1, 1), Infinity, placed => postMessage(placed));
+        }}
+    </script>
+    <script>
+        const words = {words_json};
+        const colors = {colors_json};
+        const width = {width};
+        const height = {height};
+
+{rendered_script("canvas", cfg)}
+
+        const canvas = document.getElementById("wordcloud");
+        const context = canvas.getContext("2d");
+        let placed = [];  // Laid-out words, each with a glyph box in layout coordinates
+        let hovered = -1;
+        let view = {{scale: 1, x: 0, y: 0, ratio: 1}};  // Layout coordinates -> CSS pixels
+
+        function fit() {{
+            // Scale to fit and centre, like an SVG viewBox with xMidYMid meet
+            const rect = canvas.getBoundingClientRect();
+            const ratio = window.devicePixelRatio || 1;
+            canvas.width = Math.max(1, Math.round(rect.width * ratio));
+            canvas.height = Math.max(1, Math.round(rect.height * ratio));
+            view = {{
+                scale: Math.min(rect.width / width, rect.height / height),
+                x: rect.width / 2,
+                y: rect.height / 2,
+                ratio: ratio
+            }};
+        }}
+
+        function measure(d) {{
+            // Axis-aligned box of the rotated glyphs, for hit-testing
+            context.font = d.size + "px Impact, sans-serif";
+            const metrics = context.measureText(d.text);
+            const half = metrics.width / 2;
+            const angle = d.rotate * Math.PI / 180;
+            const cos = Math.cos(angle), sin = Math.sin(angle);
+            const xs = [], ys = [];
+            [[-half, -metrics.actualBoundingBoxAscent], [half, -metrics.actualBoundingBoxAscent],
+             [-half, metrics.actualBoundingBoxDescent], [half, metrics.actualBoundingBoxDescent]].forEach(p => {{
+                xs.push(d.x + p[0] * cos - p[1] * sin);
+                ys.push(d.y + p[0] * sin + p[1] * cos);
+            }});
+            d.box = [Math.min(...xs), Math.max(...xs), Math.min(...ys), Math.max(...ys)];
+        }}
+
+        function draw() {{
+            const scale = view.ratio * view.scale;
+            context.setTransform(1, 0, 0, 1, 0, 0);
+            context.clearRect(0, 0, canvas.width, canvas.height);
+            context.setTransform(scale, 0, 0, scale, view.ratio * view.x, view.ratio * view.y);
+            context.textAlign = "center";
+            placed.forEach((d, i) => {{
+                context.save();
+                context.translate(d.x, d.y);
+                context.rotate(d.rotate * Math.PI / 180);
+                context.font = d.size + "px Impact, sans-serif";
+                context.fillStyle = colors[i % colors.length];
+                context.globalAlpha = i === hovered ? 0.7 : 1;
+                context.fillText(d.text, 0, 0);
+                context.restore();
+            }});
+        }}
+
+        function wordAt(event) {{
+            // The smallest box under the pointer, so a small word inside a larger word's box wins
+            const x = (event.offsetX - view.x) / view.scale;
+            const y = (event.offsetY - view.y) / view.scale;
+            let found = -1, foundArea = Infinity;
+            placed.forEach((d, i) => {{
+                const b = d.box;
+                if (x >= b[0] && x <= b[1] && y >= b[2] && y <= b[3]) {{
+                    const area = (b[1] - b[0]) * (b[3] - b[2]);
+                    if (area < foundArea) {{
+                        found = i;
+                        foundArea = area;
+                    }}
+                }}
+            }});
+            return found;
+        }}
+
+        function hover(index) {{
+            if (index !== hovered) {{
+                hovered = index;
+                canvas.style.cursor = index >= 0 ? "pointer" : "default";
+                draw();
+            }}
+        }}
+
+        canvas.addEventListener("click", event => {{
+            const index = wordAt(event);
+            if (index >= 0) {{
+                window.parent.postMessage({{type: 'wordcloud-click', word: placed[index].text}}, '*');
+            }}
+        }});
+        canvas.addEventListener("mousemove", event => hover(wordAt(event)));
+        canvas.addEventListener("mouseleave", () => hover(-1));
+        window.addEventListener("resize", () => {{
+            fit();
+            draw();
+        }});
+
+        function show(result) {{
+            layoutFinished();
+            placed = result;
+            placed.forEach(measure);
+            fit();
+            draw();
+            rendered(placed.length);
+        }}
+
+        function layoutOnPage() {{
+            const library = document.createElement("script");
+            library.src = "{D3_CLOUD_URL}";
+            library.onload = () => {{
+                const source = document.createElement("script");
+                source.textContent = document.getElementById("layout-worker").textContent;
+                document.body.appendChild(source);
+                layoutStarted();
+                layoutWords(words, width, height, () => document.createElement("canvas"), 10, show);
+            }};
+            document.head.appendChild(library);
+        }}
+
+        try {{
+            if (typeof OffscreenCanvas === "undefined") {{
+                throw new Error("OffscreenCanvas is not supported");
+            }}
+            const source = new Blob([document.getElementById("layout-worker").textContent],
+                {{type: "text/javascript"}});
+            const worker = new Worker(URL.createObjectURL(source));
+            worker.onmessage = event => {{
+                worker.terminate();
+                show(event.data);
+            }};
+            worker.onerror = () => {{
+                worker.terminate();
+                layoutOnPage();
+            }};
+            layoutStarted();
+            worker.postMessage({{words: words, width: width, height: height}});
+        }} catch (e) {{
+            layoutOnPage();
         }}
     </script>
 </body>
@@ -159,6 +418,67 @@ def generate_wordcloud_html(word_frequencies: dict, config: dict = None) -> str:
     return html
 
 
+def rendered_script(renderer: str, cfg: dict) -> str:
+    """
+    JS render timing: layoutStarted(), layoutFinished() and rendered(count).
+
+    rendered(count) tells the parent page the cloud was drawn, after the next
+    frame; benchmarks/render_benchmark.py listens for it, the app only listens
+    for clicks. A telemetry_sample fraction of renders also sends its timings,
+    word counts and frequency distribution to TELEMETRY_PATH (see telemetry.py).
+    Included before the layout starts, since d3-cloud can finish synchronously.
+    """
+    return f'''        // Render timings, in ms since the document started loading
+        const renderTiming = {{layoutStart: null, layoutEnd: null}};
+
+        function layoutStarted() {{
+            renderTiming.layoutStart = performance.now();
+        }}
+
+        function layoutFinished() {{
+            renderTiming.layoutEnd = performance.now();
+        }}
+
+        function rendered(count) {{
+            requestAnimationFrame(() => {{
+                const now = performance.now();
+                window.parent.postMessage({{type: 'wordcloud-rendered', renderer: '{renderer}', words: count, ms: now}}, '*');
+                reportRender(count, now);
+            }});
+        }}
+
+        function headShare() {{
+            // Share of the total frequency held by the top tenth of the words
+            const total = words.reduce((sum, d) => sum + d.freq, 0);
+            const head = words.slice(0, Math.max(1, Math.ceil(words.length / 10)));
+            return total ? head.reduce((sum, d) => sum + d.freq, 0) / total : 0;
+        }}
+
+        function fetchMs() {{
+            // From requesting the first d3 script to receiving the last, if the page fetched any
+            const scripts = performance.getEntriesByType("resource")
+                .filter(e => e.name === "{D3_URL}" || e.name === "{D3_CLOUD_URL}");
+            if (!scripts.length) return null;
+            return Math.max(...scripts.map(e => e.responseEnd)) - Math.min(...scripts.map(e => e.startTime));
+        }}
+
+        function reportRender(count, now) {{
+            if (!(Math.random() < {cfg["telemetry_sample"]}) || !navigator.sendBeacon) return;
+            try {{
+                navigator.sendBeacon("{TELEMETRY_PATH}", JSON.stringify({{
+                    renderer: '{renderer}', max_words: {cfg["max_words"]}, words: words.length, placed: count,
+                    head_share: headShare(), fetch_ms: fetchMs(),
+                    load_ms: renderTiming.layoutStart,
+                    layout_ms: renderTiming.layoutEnd - renderTiming.layoutStart,
+                    paint_ms: now - renderTiming.layoutEnd,
+                    total_ms: now
+                }}));
+            }} catch (e) {{
+                // Not served over HTTP (e.g. the render benchmark page)
+            }}
+        }}'''
+
+
 def generate_empty_html() -> str:
     """Generate an empty/placeholder word cloud."""
     width = WORDCLOUD_CONFIG["width"]